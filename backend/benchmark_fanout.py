@@ -0,0 +1,118 @@
+"""
+Benchmark the CPU cost of fanning a task_update out to TaskConsumer groups.
+
+Compares the original consumer, which encoded each event with json.dumps and
+sent it straight to the socket (before), with TaskConsumer sending the frame
+encoded once at publish time through its send queue (after), for 10, 100 and
+1000 subscribers on the in-memory channel layer.
+Run with: python benchmark_fanout.py [--rounds N] [--changes N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+
+django.setup()
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+from tasks.consumers import TaskConsumer, task_update_message
+
+
+SUBSCRIBERS = [10, 100, 1000]
+
+
+class BaselineTaskConsumer(AsyncWebsocketConsumer):
+    """TaskConsumer's fan-out path before frames were encoded once per broadcast."""
+
+    async def connect(self):
+        await self.channel_layer.group_add('tasks_1', self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard('tasks_1', self.channel_name)
+
+    async def task_update(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'task_update',
+            'data': event['message']
+        }))
+
+
+def sample_message(changes):
+    return {
+        'type': 'task_update',
+        'projectId': '1',
+        'changes': [
+            {
+                'action': 'UPDATED',
+                'task': {
+                    'id': str(index),
+                    'projectId': '1',
+                    'title': f'Task {index}',
+                    'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 4,
+                    'status': 'IN_PROGRESS',
+                    'assigneeEmail': 'someone@example.com',
+                    'dueDate': '2026-01-01T00:00:00+00:00',
+                    'rank': '1z2x3',
+                    'version': 7,
+                    'updatedAt': '2025-12-01T12:00:00+00:00',
+                },
+            }
+            for index in range(changes)
+        ],
+    }
+
+
+async def fan_out(communicators, group_message, rounds):
+    """Get the CPU seconds spent delivering ``rounds`` group messages."""
+    channel_layer = get_channel_layer()
+    started = time.process_time()
+    for _ in range(rounds):
+        await channel_layer.group_send('tasks_1', group_message())
+        for communicator in communicators:
+            await communicator.receive_output(timeout=10)
+    return time.process_time() - started
+
+
+async def run(rounds, changes):
+    message = sample_message(changes)
+    strategies = {
+        # Each consumer runs json.dumps on the event and sends it directly.
+        'before': (BaselineTaskConsumer.as_asgi(), lambda: {'type': 'task_update', 'message': message}),
+        # The frame is encoded once and every consumer queues the same text.
+        'after': (TaskConsumer.as_asgi(), lambda: task_update_message(message)),
+    }
+    print(f"{'subscribers':>11} {'strategy':>8} {'ms/fan-out':>11} {'us/subscriber':>14}")
+    for count in SUBSCRIBERS:
+        for name, (application, group_message) in strategies.items():
+            communicators = [WebsocketCommunicator(application, '/ws/tasks/1/') for _ in range(count)]
+            for communicator in communicators:
+                communicator.scope['url_route'] = {'args': (), 'kwargs': {'project_id': '1'}}
+                connected, _subprotocol = await communicator.connect()
+                assert connected
+            await fan_out(communicators, group_message, 1)  # warm up
+            seconds = await fan_out(communicators, group_message, rounds) / rounds
+            print(f'{count:>11} {name:>8} {seconds * 1e3:>11.2f} {seconds / count * 1e6:>14.1f}')
+            await asyncio.gather(*(communicator.disconnect() for communicator in communicators))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--changes', type=int, default=20, help='task changes per message')
+    args = parser.parse_args()
+    layers = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer', 'CONFIG': {'capacity': 10000}}}
+    with override_settings(CHANNEL_LAYERS=layers):
+        asyncio.run(run(args.rounds, args.changes))
+
+
+if __name__ == '__main__':
+    main()
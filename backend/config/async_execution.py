@@ -0,0 +1,57 @@
+"""
+Support for executing the schema on the event loop.
+
+Resolvers may be coroutine functions that use the async ORM. Existing
+synchronous resolvers keep working through ``SyncResolverMiddleware``:
+
+* root fields run in one ``sync_to_async`` hop each, with querysets
+  materialized inside the hop. Hops are not thread sensitive, so independent
+  root fields run in parallel threads, each on its own database connection
+  that is closed when the hop ends;
+* nested fields run on the event loop, since they usually read prefetched or
+  annotated data, and only move to a thread when they touch the database.
+
+Since each hop has its own connection, resolvers only see committed data.
+"""
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import connections
+from django.db.models import Manager, QuerySet
+
+
+def materialize(result):
+    """Evaluate lazy querysets so nothing queries the database later."""
+    if isinstance(result, Manager):
+        result = result.all()
+    if isinstance(result, QuerySet):
+        result = list(result)
+    return result
+
+
+async def _resolve_in_thread(next_, root, info, args):
+    def resolve():
+        try:
+            result = next_(root, info, **args)
+            return result if isawaitable(result) else materialize(result)
+        finally:
+            # Executor threads are reused; do not leave their connections open.
+            connections.close_all()
+
+    result = await sync_to_async(resolve, thread_sensitive=False)()
+    if isawaitable(result):
+        result = await result
+    return result
+
+
+class SyncResolverMiddleware:
+    """Graphene middleware adapting synchronous resolvers to async execution."""
+
+    def resolve(self, next_, root, info, **args):
+        if info.path.prev is None:
+            return _resolve_in_thread(next_, root, info, args)
+        try:
+            result = next_(root, info, **args)
+            return result if isawaitable(result) else materialize(result)
+        except SynchronousOnlyOperation:
+            return _resolve_in_thread(next_, root, info, args)
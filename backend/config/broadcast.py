@@ -0,0 +1,85 @@
+"""
+Server-originated WebSocket broadcasts.
+
+Writes hand changes to a ``Coalescer`` after commit. The first change for a
+key opens a short window; changes arriving during it are merged by item, and
+the whole batch is flushed to the channel layer as one message when the
+window closes. Bursts such as drag-and-drop reordering or bulk edits become
+one frame per key instead of one per row.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def group_send(group, message):
+    """Send a message to a channel layer group, logging instead of raising."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(group, message)
+    except Exception:
+        # Broadcasts follow committed writes; a lost message must not fail them.
+        logger.exception("Could not send message to group %s", group)
+
+
+def get_window():
+    return getattr(settings, 'BROADCAST_COALESCE_WINDOW', 0.1)
+
+
+class Coalescer:
+    """
+    Buffer items per key and flush each key's batch after a window.
+
+    ``flush(key, items)`` receives the batched items in the order they were
+    last changed. ``merge(previous, item)`` combines two items with the same
+    item key; by default the latest one wins. ``window()`` returns the window
+    in seconds, ``BROADCAST_COALESCE_WINDOW`` by default; a window of 0
+    flushes every item immediately.
+    """
+
+    def __init__(self, flush, merge=None, window=get_window):
+        self._flush = flush
+        self._merge = merge or (lambda previous, item: item)
+        self._window = window
+        self._batches = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, item_key, item):
+        window = self._window()
+        with self._lock:
+            batch = self._batches.setdefault(key, OrderedDict())
+            previous = batch.pop(item_key, None)
+            batch[item_key] = item if previous is None else self._merge(previous, item)
+            schedule = window > 0 and key not in self._timers
+            if schedule:
+                timer = self._timers[key] = threading.Timer(window, self.flush, [key])
+                timer.daemon = True
+        if window <= 0:
+            self.flush(key)
+        elif schedule:
+            timer.start()
+
+    def flush(self, key):
+        """Send a key's pending batch now."""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            batch = self._batches.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        if batch:
+            self._flush(key, list(batch.values()))
+
+    def flush_all(self):
+        with self._lock:
+            keys = list(self._batches)
+        for key in keys:
+            self.flush(key)
@@ -0,0 +1,118 @@
+"""
+WebSocket consumer serving GraphQL subscriptions.
+"""
+import json
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from graphql import GraphQLError
+from .encoding import dumps
+from .schema import schema
+from .subscriptions import execute_subscription, payload_cache, prepare_subscription
+from .views import document_cache
+
+
+PROTOCOL = 'graphql-transport-ws'
+
+
+class GraphQLSubscriptionConsumer(AsyncWebsocketConsumer):
+    """
+    Serve subscriptions with the ``graphql-transport-ws`` protocol.
+
+    Every subscription joins the channel layer group of its root field; group
+    events are executed against the subscription's document and sent as
+    ``next`` messages.
+    """
+
+    async def connect(self):
+        self.initialized = False
+        self.subscriptions = {}
+        subprotocol = PROTOCOL if PROTOCOL in self.scope.get('subprotocols', ()) else None
+        await self.accept(subprotocol)
+
+    async def disconnect(self, close_code):
+        for group in {subscription.group for subscription in self.subscriptions.values()}:
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.subscriptions = {}
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or bytes_data)
+            message_type = message['type']
+        except (TypeError, ValueError, KeyError):
+            await self.close(code=4400)
+            return
+
+        if message_type == 'connection_init':
+            if self.initialized:
+                await self.close(code=4429)
+                return
+            self.initialized = True
+            await self.send_message({'type': 'connection_ack'})
+        elif message_type == 'ping':
+            await self.send_message({'type': 'pong'})
+        elif message_type == 'pong':
+            pass
+        elif not self.initialized:
+            await self.close(code=4401)
+        elif message_type == 'subscribe':
+            await self.subscribe(message.get('id'), message.get('payload') or {})
+        elif message_type == 'complete':
+            await self.unsubscribe(message.get('id'))
+        else:
+            await self.close(code=4400)
+
+    async def subscribe(self, subscription_id, payload):
+        if not isinstance(subscription_id, str):
+            await self.close(code=4400)
+            return
+        if subscription_id in self.subscriptions:
+            await self.close(code=4409)
+            return
+
+        try:
+            subscription = await database_sync_to_async(self.prepare)(payload)
+        except GraphQLError as error:
+            await self.send_message({'id': subscription_id, 'type': 'error', 'payload': [error.formatted]})
+            return
+
+        self.subscriptions[subscription_id] = subscription
+        await self.channel_layer.group_add(subscription.group, self.channel_name)
+
+    def prepare(self, payload):
+        query = payload.get('query')
+        if not isinstance(query, str):
+            raise GraphQLError("Must provide query string.")
+        document, errors = document_cache.get(schema.graphql_schema, query)
+        if errors:
+            raise errors[0]
+        return prepare_subscription(
+            schema.graphql_schema, query, document, payload.get('variables'), payload.get('operationName')
+        )
+
+    async def unsubscribe(self, subscription_id):
+        subscription = self.subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return
+        if not any(other.group == subscription.group for other in self.subscriptions.values()):
+            await self.channel_layer.group_discard(subscription.group, self.channel_name)
+
+    async def subscription_event(self, event):
+        for subscription_id, subscription in list(self.subscriptions.items()):
+            if subscription.group != event['group']:
+                continue
+            for index, root in enumerate(event['payloads']):
+                payload = await payload_cache.get(
+                    (event['id'], index, subscription.key),
+                    database_sync_to_async(
+                        lambda subscription=subscription, root=root: execute_subscription(
+                            schema.graphql_schema, subscription, root
+                        )
+                    ),
+                )
+                # The payload is already encoded, so only the envelope is built here.
+                await self.send(text_data=(
+                    f'{{"id":{dumps(subscription_id)},"type":"next","payload":{payload}}}'
+                ))
+
+    async def send_message(self, message):
+        await self.send(text_data=dumps(message))
@@ -0,0 +1,71 @@
+"""
+Request-scoped batch loaders for GraphQL resolvers.
+
+Resolvers run synchronously (in a worker thread under ``AsyncGraphQLView``),
+so instead of deferring work to an event loop the loaders batch by priming:
+list resolvers register every key they are about to hand to the executor, and
+the first ``load()`` resolves all pending keys with a single query.
+"""
+
+
+class DataLoader:
+    """
+    Base class for synchronous, per-request batch loaders.
+
+    Subclasses implement ``batch_load(keys)`` returning a dict that maps each
+    key to its value; keys missing from the dict resolve to ``default``.
+    """
+
+    default = None
+
+    def __init__(self):
+        self._cache = {}
+        self._pending = set()
+
+    @classmethod
+    def for_context(cls, context):
+        """Get the loader instance bound to the current request."""
+        if context is None:
+            return cls()
+        loaders = getattr(context, '_dataloaders', None)
+        if loaders is None:
+            loaders = {}
+            setattr(context, '_dataloaders', loaders)
+        if cls not in loaders:
+            loaders[cls] = cls()
+        return loaders[cls]
+
+    def batch_load(self, keys):
+        raise NotImplementedError
+
+    def prime(self, keys):
+        """Register keys that will be loaded later in this request."""
+        self._pending.update(key for key in keys if key not in self._cache)
+
+    def load(self, key):
+        """Get the value for a key, batching every pending key on a miss."""
+        if key not in self._cache:
+            self._pending.add(key)
+            self.dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        self.prime(keys)
+        return [self.load(key) for key in keys]
+
+    def dispatch(self):
+        """Resolve all pending keys with one call to ``batch_load``."""
+        keys = list(self._pending)
+        if not keys:
+            return
+        results = self.batch_load(keys)
+        # Keys stay pending until the batch succeeds, so a load retried after
+        # an error (e.g. SynchronousOnlyOperation under async execution) still
+        # batches them.
+        self._pending.difference_update(keys)
+        for key in keys:
+            self._cache[key] = results.get(key, self.default)
+
+    def clear(self, key):
+        """Drop a cached value so the next load refetches it."""
+        self._cache.pop(key, None)
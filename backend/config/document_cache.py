@@ -0,0 +1,83 @@
+"""
+LRU cache of parsed and validated GraphQL documents.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from graphql import GraphQLError, parse, validate
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def query_hash(query):
+    """Get the SHA-256 hex digest used to key a query string."""
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class DocumentCache:
+    """
+    Thread-safe LRU cache mapping query text to ``(document, errors)``.
+
+    Parsing and validation only depend on the query text and the schema, so
+    their results are shared by every request in the worker. Documents that
+    fail to parse or validate are cached with their errors as well.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema, query):
+        """Get the parsed document and validation errors for a query."""
+        key = (id(schema), query_hash(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._parse_and_validate(schema, query)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def get_by_hash(self, schema, sha256_hash):
+        """Get a cached entry by query hash, or None without counting a miss."""
+        key = (id(schema), sha256_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    @staticmethod
+    def _parse_and_validate(schema, query):
+        try:
+            document = parse(query)
+        except GraphQLError as error:
+            return None, [error]
+        errors = validate(schema, document)
+        if errors:
+            return None, errors
+        return document, []
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
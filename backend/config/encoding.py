@@ -0,0 +1,20 @@
+"""
+JSON encoding for WebSocket frames.
+
+Uses orjson when it is installed, which encodes several times faster than
+the standard library; otherwise falls back to ``json`` with compact
+separators. Both produce equivalent text for the values sent here.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(value):
+    """Encode a value as compact JSON text, stringifying unknown types."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, separators=(',', ':'), default=str)
@@ -0,0 +1,136 @@
+"""
+Selection-set aware queryset optimizer for Graphene resolvers.
+
+``optimize(queryset, info)`` walks the fields requested below the current
+resolver and applies ``only()``, ``select_related()`` and ``prefetch_related()``
+so nested relations are fetched up front instead of one row at a time.
+
+Object types can declare the model fields read by their computed fields::
+
+    class TaskType(DjangoObjectType):
+        optimizer_hints = {'is_overdue': ['due_date', 'status']}
+
+A selected field that is neither a model field nor hinted disables ``only()``
+for its level, so unknown properties never trigger deferred-field loads.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_camel_case
+from graphql import get_named_type
+from .selection import iter_field_nodes
+
+
+def _graphene_fields(graphene_type):
+    """Map GraphQL field names to the Python names declared on a Graphene type."""
+    return {
+        getattr(field, 'name', None) or to_camel_case(name): name
+        for name, field in graphene_type._meta.fields.items()
+    }
+
+
+def _merge_field_nodes(field_nodes, fragments):
+    """Group the sub-selections of several field nodes by GraphQL field name."""
+    grouped = {}
+    for field_node in field_nodes:
+        for node in iter_field_nodes(field_node.selection_set, fragments):
+            grouped.setdefault(node.name.value, []).append(node)
+    return grouped
+
+
+def _base_queryset(graphene_type, model, info):
+    queryset = model._default_manager.all()
+    get_queryset = getattr(graphene_type, 'get_queryset', None)
+    if get_queryset is not None:
+        queryset = get_queryset(queryset, info)
+    return queryset
+
+
+def _plan(object_type, field_nodes, info, prefix=''):
+    """
+    Work out the only/select_related/prefetch lookups for a selection.
+
+    Returns ``(only, select, prefetch)`` where ``only`` is None when the
+    selection reads attributes the optimizer cannot map to columns.
+    """
+    graphene_type = getattr(object_type, 'graphene_type', None)
+    model = getattr(getattr(graphene_type, '_meta', None), 'model', None)
+    if model is None:
+        return None, [], []
+
+    names = _graphene_fields(graphene_type)
+    hints = getattr(graphene_type, 'optimizer_hints', {})
+    only = {prefix + model._meta.pk.name}
+    select = []
+    prefetch = []
+    complete = True
+
+    for graphql_name, nodes in _merge_field_nodes(field_nodes, info.fragments).items():
+        if graphql_name.startswith('__'):
+            continue
+        name = names.get(graphql_name)
+        if name is None:
+            continue
+        if name in hints:
+            only.update(prefix + column for column in hints[name])
+            continue
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            complete = False
+            continue
+
+        graphql_field = object_type.fields[graphql_name]
+        related_type = get_named_type(graphql_field.type)
+
+        if not model_field.is_relation:
+            only.add(prefix + model_field.name)
+        elif model_field.many_to_one or (model_field.one_to_one and model_field.concrete):
+            lookup = prefix + model_field.name
+            only.add(lookup)
+            select.append(lookup)
+            nested_only, nested_select, nested_prefetch = _plan(
+                related_type, nodes, info, prefix=lookup + '__'
+            )
+            if nested_only is None:
+                complete = False
+            else:
+                only.update(nested_only)
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+        elif model_field.one_to_many or model_field.many_to_many:
+            related_graphene = getattr(related_type, 'graphene_type', None)
+            queryset = _base_queryset(related_graphene, model_field.related_model, info)
+            # Keep the reverse foreign key so rows can be matched to parents.
+            keep = [model_field.field.name] if model_field.one_to_many else []
+            queryset = _apply(queryset, related_type, nodes, info, keep=keep)
+            prefetch.append(Prefetch(prefix + model_field.name, queryset=queryset))
+        else:
+            complete = False
+
+    return (only if complete else None), select, prefetch
+
+
+def _apply(queryset, object_type, field_nodes, info, keep=()):
+    only, select, prefetch = _plan(object_type, field_nodes, info)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only is not None:
+        queryset = queryset.only(*only, *keep)
+    return queryset
+
+
+def optimize(queryset, info, field_nodes=None, object_type=None, keep=()):
+    """
+    Optimize a queryset for the fields selected on the current resolver.
+
+    ``field_nodes`` and ``object_type`` default to the resolver's own field
+    and return type; connection resolvers pass the ``node`` selection instead.
+    ``keep`` names extra columns the caller reads, such as ordering keys.
+    """
+    if field_nodes is None:
+        field_nodes = info.field_nodes
+    if object_type is None:
+        object_type = get_named_type(info.return_type)
+    return _apply(queryset, object_type, field_nodes, info, keep=keep)
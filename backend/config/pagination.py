@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination for Relay-style connections.
+
+Cursors encode the values of the ordering columns of the last row seen, and
+the next page is fetched by comparing the ordering columns against them instead
+of with an OFFSET, so a page deep into a large table costs the same as the
+first one.
+"""
+import base64
+import json
+from functools import reduce
+from operator import or_
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from graphene.relay import PageInfo
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError, get_named_type
+from .optimizer import optimize
+from .selection import iter_field_nodes
+
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def keyset_ordering(model):
+    """Get the model's default ordering with the primary key as a tiebreaker."""
+    ordering = list(model._meta.ordering)
+    descending = bool(ordering) and ordering[-1].startswith('-')
+    pk_name = model._meta.pk.name
+    if pk_name not in (field.lstrip('-') for field in ordering):
+        ordering.append(f'-{pk_name}' if descending else pk_name)
+    return ordering
+
+
+def encode_cursor(instance, ordering):
+    """Build an opaque cursor from an instance's ordering values."""
+    values = []
+    for field in ordering:
+        value = getattr(instance, field.lstrip('-'))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode a cursor into ordering values, validating it against the model."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        return [_to_python(model, field.lstrip('-'), value) for field, value in zip(ordering, values)]
+    except Exception:
+        raise GraphQLError(f"Invalid cursor '{cursor}'")
+
+
+def _to_python(model, name, value):
+    try:
+        return model._meta.get_field(name).to_python(value)
+    except FieldDoesNotExist:
+        # Annotations, such as search ranks, are kept as decoded.
+        return value
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the filter selecting rows after the given ordering values.
+
+    ``(a, -b)`` after ``(x, y)`` becomes
+    ``a >= x AND (a > x OR (a = x AND b < y))``. The redundant bound on the
+    leading column lets the database seek an index on the ordering instead of
+    scanning it from the start.
+    """
+    clauses = []
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        equal = {f.lstrip('-'): value for f, value in zip(ordering[:index], values)}
+        clauses.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+    condition = reduce(or_, clauses)
+    if len(ordering) > 1:
+        first = ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        condition = Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+    return condition
+
+
+def connection_node(info):
+    """Get the field nodes and GraphQL type of a connection's ``edges.node``."""
+    edges_type = get_named_type(get_named_type(info.return_type).fields['edges'].type)
+    node_type = get_named_type(edges_type.fields['node'].type)
+    node_fields = []
+    for field_node in info.field_nodes:
+        for edges in iter_field_nodes(field_node.selection_set, info.fragments):
+            if edges.name.value != 'edges':
+                continue
+            for node in iter_field_nodes(edges.selection_set, info.fragments):
+                if node.name.value == 'node':
+                    node_fields.append(node)
+    return node_fields, node_type
+
+
+def keyset_connection(connection_type, queryset, info, first=None, after=None,
+                      last=None, before=None, prepare=None, ordering=None):
+    """
+    Resolve one page of a connection using keyset pagination.
+
+    The queryset is optimized for the ``edges.node`` selection. ``prepare``
+    receives the page's rows before they are wrapped in edges, e.g. to prime
+    request-scoped loaders. ``ordering`` replaces the model's keyset ordering;
+    it may name annotations and must end with a unique column.
+    """
+    if last is not None or before is not None:
+        raise GraphQLError("Backward pagination with 'last' or 'before' is not supported")
+    max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+    if first is None:
+        first = DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise GraphQLError("Argument 'first' must be a non-negative integer")
+    if max_limit and first > max_limit:
+        raise GraphQLError(f"Argument 'first' cannot exceed {max_limit}")
+
+    model = queryset.model
+    ordering = ordering or keyset_ordering(model)
+    node_fields, node_type = connection_node(info)
+    queryset = optimize(
+        queryset, info, node_fields, node_type,
+        keep=[
+            field.lstrip('-') for field in ordering
+            if field.lstrip('-') not in queryset.query.annotations
+        ],
+    ).order_by(*ordering)
+    if after:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(after, model, ordering)))
+
+    rows = list(queryset[:first + 1])
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+    if prepare is not None:
+        rows = prepare(rows)
+
+    edges = [
+        connection_type.Edge(node=row, cursor=encode_cursor(row, ordering))
+        for row in rows
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
@@ -0,0 +1,87 @@
+"""
+Automatic persisted queries (APQ).
+
+Clients send ``extensions.persistedQuery.sha256Hash`` instead of the query
+text. Unknown hashes are answered with ``PersistedQueryNotFound``, after which
+the client retries once with both the query and the hash to register it.
+A query is only registered once it parses and validates against the schema.
+Registered queries live in a Django cache alias, so a Redis or database cache
+shares them across workers, and expire after
+``GRAPHQL_PERSISTED_QUERY_TIMEOUT`` seconds; clients then register them again.
+"""
+import json
+from django.conf import settings
+from django.core.cache import caches
+from graphql import GraphQLError
+from .document_cache import query_hash
+
+
+SUPPORTED_VERSION = 1
+
+
+def get_store():
+    return caches[getattr(settings, 'GRAPHQL_PERSISTED_QUERY_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'GRAPHQL_PERSISTED_QUERY_TIMEOUT', 7 * 24 * 60 * 60)
+
+
+def _cache_key(sha256_hash):
+    return f'graphql:apq:{sha256_hash}'
+
+
+def get_persisted_query_hash(request, data):
+    """
+    Get the persisted query hash sent with a request, if any.
+
+    Raises GraphQLError for malformed extensions or unsupported versions.
+    """
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if not extensions:
+        return None
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise GraphQLError("Extensions are invalid JSON.")
+    persisted_query = extensions.get('persistedQuery') if isinstance(extensions, dict) else None
+    if not persisted_query:
+        return None
+    if persisted_query.get('version') != SUPPORTED_VERSION:
+        raise GraphQLError(
+            "Unsupported persisted query version",
+            extensions={'code': 'PERSISTED_QUERY_VERSION_NOT_SUPPORTED'},
+        )
+    sha256_hash = persisted_query.get('sha256Hash')
+    if not isinstance(sha256_hash, str) or not sha256_hash:
+        raise GraphQLError("Persisted query hash is missing")
+    return sha256_hash.lower()
+
+
+def resolve_persisted_query(sha256_hash, query=None):
+    """
+    Get the query text for a hash, checking it against the hash when the
+    query is provided. Provided queries are not registered here; see
+    ``register_persisted_query``.
+    """
+    if query:
+        if query_hash(query) != sha256_hash:
+            raise GraphQLError(
+                "Provided sha does not match query",
+                extensions={'code': 'PERSISTED_QUERY_HASH_MISMATCH'},
+            )
+        return query
+
+    query = get_store().get(_cache_key(sha256_hash))
+    if query is None:
+        raise GraphQLError(
+            "PersistedQueryNotFound",
+            extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'},
+        )
+    return query
+
+
+def register_persisted_query(sha256_hash, query):
+    """Store a query that parsed and validated under its hash."""
+    get_store().set(_cache_key(sha256_hash), query, timeout=get_timeout())
@@ -0,0 +1,148 @@
+"""
+Query cost analysis and depth limiting.
+
+Every field that returns an object costs 1 and scalars cost 0 unless
+overridden in ``GRAPHQL_FIELD_COSTS`` (keyed by ``"TypeName.fieldName"``).
+The cost of a field's sub-selection is multiplied by the number of items it
+may return: the ``first`` argument for connections, or
+``GRAPHQL_DEFAULT_LIST_SIZE`` for unbounded lists. Operations above
+``GRAPHQL_MAX_QUERY_COST`` or nested deeper than ``GRAPHQL_MAX_QUERY_DEPTH``
+are rejected before execution.
+"""
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    InlineFragmentNode,
+    Undefined,
+    ValidationRule,
+    get_named_type,
+    is_composite_type,
+    value_from_ast,
+)
+from graphql.type import GraphQLNonNull
+from .pagination import DEFAULT_PAGE_SIZE
+
+
+def get_limits():
+    return {
+        'max_cost': getattr(settings, 'GRAPHQL_MAX_QUERY_COST', 5000),
+        'max_depth': getattr(settings, 'GRAPHQL_MAX_QUERY_DEPTH', 10),
+        'list_size': getattr(settings, 'GRAPHQL_DEFAULT_LIST_SIZE', 50),
+        'field_costs': getattr(settings, 'GRAPHQL_FIELD_COSTS', {}),
+    }
+
+
+def _is_list(type_):
+    if isinstance(type_, GraphQLNonNull):
+        type_ = type_.of_type
+    return isinstance(type_, GraphQLList)
+
+
+class CostAnalyzer:
+    """Compute the cost and depth of an operation."""
+
+    def __init__(self, schema, fragments, variables, limits):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.limits = limits
+
+    def _argument(self, field_def, node, name):
+        argument_def = field_def.args.get(name)
+        if argument_def is None:
+            return None
+        value = argument_def.default_value
+        for argument in node.arguments or ():
+            if argument.name.value == name:
+                value = value_from_ast(argument.value, argument_def.type, self.variables)
+        return None if value is Undefined else value
+
+    def _multiplier(self, field_def, node, paginated_parent):
+        if 'first' in field_def.args:
+            first = self._argument(field_def, node, 'first')
+            return (first if isinstance(first, int) and first >= 0 else DEFAULT_PAGE_SIZE), True
+        if _is_list(field_def.type):
+            # A connection's edges are already covered by its `first` argument.
+            return (1 if paginated_parent else self.limits['list_size']), False
+        return 1, False
+
+    def _fields(self, selection_set, visited):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self._fields(selection.selection_set, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is not None and name not in visited:
+                    yield from self._fields(fragment.selection_set, visited | {name})
+
+    def selection_cost(self, parent_type, selection_set, paginated_parent=False, visited=frozenset()):
+        """Return ``(cost, depth)`` for a selection set on ``parent_type``."""
+        cost = 0
+        depth = 0
+        fields = getattr(parent_type, 'fields', None) or {}
+        for node in self._fields(selection_set, visited):
+            name = node.name.value
+            field_def = fields.get(name)
+            if name.startswith('__') or field_def is None:
+                continue
+            field_type = get_named_type(field_def.type)
+            key = f'{parent_type.name}.{name}'
+            base = self.limits['field_costs'].get(key, 1 if is_composite_type(field_type) else 0)
+            child_cost, child_depth = 0, 0
+            if node.selection_set is not None:
+                multiplier, paginated = self._multiplier(field_def, node, paginated_parent)
+                child_cost, child_depth = self.selection_cost(
+                    field_type, node.selection_set, paginated, visited
+                )
+                child_cost *= multiplier
+            cost += base + child_cost
+            depth = max(depth, child_depth + 1)
+        return cost, depth
+
+    def operation_cost(self, operation):
+        root_type = self.schema.get_root_type(operation.operation)
+        return self.selection_cost(root_type, operation.selection_set)
+
+
+def query_cost_rule(variables, operation_name, report, limits=None):
+    """
+    Build a validation rule enforcing the cost and depth limits.
+
+    ``report`` is called with ``(cost, depth, limits)`` for the executed
+    operation so the view can expose it in the response extensions.
+    """
+    limits = limits or get_limits()
+
+    class QueryCostRule(ValidationRule):
+        def enter_operation_definition(self, node, *_args):
+            name = node.name.value if node.name else None
+            if operation_name and name != operation_name:
+                return
+            fragments = {
+                definition.name.value: definition
+                for definition in self.context.document.definitions
+                if definition.kind == 'fragment_definition'
+            }
+            analyzer = CostAnalyzer(self.context.schema, fragments, variables, limits)
+            cost, depth = analyzer.operation_cost(node)
+            report(cost, depth, limits)
+            if depth > limits['max_depth']:
+                self.report_error(GraphQLError(
+                    f"Query depth {depth} exceeds the maximum allowed depth of {limits['max_depth']}",
+                    node,
+                    extensions={'code': 'QUERY_TOO_DEEP'},
+                ))
+            if cost > limits['max_cost']:
+                self.report_error(GraphQLError(
+                    f"Query cost {cost} exceeds the maximum allowed cost of {limits['max_cost']}",
+                    node,
+                    extensions={'code': 'QUERY_TOO_COMPLEX'},
+                ))
+
+    return QueryCostRule
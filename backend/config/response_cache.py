@@ -0,0 +1,243 @@
+"""
+Tenant-scoped response cache for read queries.
+
+Results are cached under a key built from the query hash, operation name,
+variables and the current version of every organization and project the
+operation is scoped to. Writes bump those versions after commit, so stale
+entries are never read again and simply expire.
+
+Each root field is scoped by its ``organizationSlug``, ``projectId`` or
+``taskId`` argument, or by the lookup argument of ``organization``,
+``project`` and ``task``. The organization set on the request by
+``OrganizationMiddleware`` is part of the key too. Operations with an
+unscoped root field, such as the ``organizations`` list, are not cached.
+"""
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import value_from_ast_untyped
+from .selection import iter_field_nodes
+
+
+# Root fields that read across tenants and are never cached.
+GLOBAL_ROOT_FIELDS = {'organizations', 'organizationsConnection'}
+# Arguments that scope any root field to an organization or project.
+SCOPE_ARGUMENTS = {'organizationSlug': 'organization', 'projectId': 'project', 'taskId': 'task'}
+# Root fields whose lookup argument identifies their scope.
+ROOT_SCOPE_ARGUMENTS = {
+    'organization': {'slug': 'organization'},
+    'project': {'id': 'project'},
+    'task': {'id': 'task'},
+}
+# Fields of a nested organization read from its own row. Anything else, such
+# as its project counts, changes with every project of the organization.
+ORGANIZATION_RECORD_FIELDS = {
+    '__typename', 'id', 'name', 'slug', 'contactEmail', 'createdAt', 'updatedAt', 'version',
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'GRAPHQL_RESPONSE_CACHE', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'GRAPHQL_RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _version_key(kind, pk):
+    return f'graphql:version:{kind}:{pk}'
+
+
+def get_versions(kind, pks):
+    """Get the current versions for several objects, creating missing ones."""
+    cache = get_cache()
+    keys = {_version_key(kind, pk): pk for pk in pks}
+    versions = cache.get_many(list(keys))
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock so a version lost to eviction never reuses
+            # a value that older cache entries were stored under.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(kind, pk):
+    cache = get_cache()
+    key = _version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate(organization_id=None, project_id=None, organization_record=False):
+    """
+    Invalidate cached responses for an organization and/or project after commit.
+
+    Pass ``organization_record=True`` when the organization row itself changed,
+    so project-scoped responses embedding it are invalidated as well.
+    """
+    def bump():
+        if organization_id is not None:
+            bump_version('organization', organization_id)
+            if organization_record:
+                bump_version('organization-record', organization_id)
+        if project_id is not None:
+            bump_version('project', project_id)
+
+    transaction.on_commit(bump)
+
+
+def _slug_key(slug):
+    return f'graphql:organization-slug:{slug}'
+
+
+def invalidate_project(project_id):
+    """Invalidate cached responses for a project and its organization after commit."""
+    if project_id is None:
+        return
+    invalidate(organization_id=project_organization_id(project_id), project_id=project_id)
+
+
+def organization_ids_for_slugs(slugs):
+    """Map organization slugs to ids, memoizing the mapping in the cache."""
+    from organizations.models import Organization
+
+    cache = get_cache()
+    keys = {_slug_key(slug): slug for slug in slugs}
+    found = cache.get_many(list(keys))
+    ids = {keys[key]: pk for key, pk in found.items()}
+    missing = [slug for slug in slugs if slug not in ids]
+    if missing:
+        rows = dict(Organization.objects.filter(slug__in=missing).values_list('slug', 'pk'))
+        cache.set_many({_slug_key(slug): pk for slug, pk in rows.items()}, timeout=None)
+        ids.update(rows)
+    return ids
+
+
+def forget_organization_slug(slug):
+    """Drop a memoized slug mapping once its organization is deleted."""
+    get_cache().delete(_slug_key(slug))
+
+
+def _memoized_parent_id(model, field, pk, prefix):
+    cache = get_cache()
+    key = f'graphql:{prefix}:{pk}'
+    parent_id = cache.get(key)
+    if parent_id is None:
+        parent_id = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+        if parent_id is not None:
+            cache.set(key, parent_id, timeout=None)
+    return parent_id
+
+
+def project_organization_id(project_id):
+    """Get a project's organization id, memoizing the mapping in the cache."""
+    from projects.models import Project
+
+    return _memoized_parent_id(Project, 'organization_id', project_id, 'project-organization')
+
+
+def task_project_id(task_id):
+    """Get a task's project id, memoizing the mapping in the cache."""
+    from tasks.models import Task
+
+    return _memoized_parent_id(Task, 'project_id', task_id, 'task-project')
+
+
+def _root_scopes(operation, fragments, variables):
+    """
+    Get the organization slugs, project ids and task ids the root fields are
+    scoped to, or None if any root field cannot be scoped to a tenant.
+    """
+    scopes = {'organization': set(), 'project': set(), 'task': set()}
+    for node in iter_field_nodes(operation.selection_set, fragments):
+        name = node.name.value
+        if name.startswith('__'):
+            continue
+        if name in GLOBAL_ROOT_FIELDS:
+            return None
+        arguments = {
+            argument.name.value: value_from_ast_untyped(argument.value, variables)
+            for argument in node.arguments or ()
+        }
+        scoped = False
+        for argument, kind in {**SCOPE_ARGUMENTS, **ROOT_SCOPE_ARGUMENTS.get(name, {})}.items():
+            value = arguments.get(argument)
+            if value is not None:
+                scopes[kind].add(str(value))
+                scoped = True
+        if not scoped:
+            return None
+    return scopes
+
+
+def _normalized_ids(values):
+    """Get the canonical form of the integer ids among ``values``, e.g. '1' for '01'."""
+    ids = set()
+    for value in values:
+        try:
+            ids.add(str(int(value)))
+        except ValueError:
+            continue
+    return ids
+
+
+def _reads_organization_projects(selection_set, fragments):
+    """Check whether a selection reads an organization field derived from its projects."""
+    for node in iter_field_nodes(selection_set, fragments):
+        if node.name.value == 'organization' and any(
+            child.name.value not in ORGANIZATION_RECORD_FIELDS
+            for child in iter_field_nodes(node.selection_set, fragments)
+        ):
+            return True
+        if _reads_organization_projects(node.selection_set, fragments):
+            return True
+    return False
+
+
+def cache_key(request, query_key, operation, fragments, variables, operation_name):
+    """
+    Build the response cache key for an operation, or None if it is unscoped.
+    """
+    scopes = _root_scopes(operation, fragments, variables or {})
+    if scopes is None:
+        return None
+
+    # Normalized, so '01' reads the version that invalidating project 1 bumps.
+    task_ids = sorted(_normalized_ids(scopes['task']), key=int)
+    project_ids = _normalized_ids(scopes['project'])
+    project_ids.update(str(pk) for pk in map(task_project_id, task_ids) if pk is not None)
+    organization_ids = set(organization_ids_for_slugs(sorted(scopes['organization'])).values())
+    # Project-scoped results embed their organization, so renaming it must
+    # invalidate them without touching every other project in the tenant.
+    # Results reading its project counts change with any of its projects.
+    record_ids = {
+        pk for pk in map(project_organization_id, sorted(project_ids, key=int)) if pk is not None
+    }
+    record_kind = 'organization-record'
+    if _reads_organization_projects(operation.selection_set, fragments):
+        record_kind = 'organization'
+
+    request_organization = getattr(request, 'organization', None)
+    payload = json.dumps(
+        [
+            query_key,
+            operation_name,
+            variables or {},
+            request_organization.pk if request_organization is not None else None,
+            task_ids,
+            sorted(scopes['organization']),
+            sorted(get_versions('organization', sorted(organization_ids)).items()),
+            record_kind,
+            sorted(get_versions(record_kind, sorted(record_ids)).items()),
+            sorted(get_versions('project', sorted(project_ids, key=int)).items()),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return 'graphql:response:' + hashlib.sha256(payload.encode()).hexdigest()
@@ -2,9 +2,11 @@
 WebSocket routing configuration.
 """
 from django.urls import path
-from tasks.consumers import TaskConsumer
+from tasks.consumers import OrganizationTaskConsumer, TaskConsumer
+from .consumers import GraphQLSubscriptionConsumer
 
 websocket_urlpatterns = [
+    path('ws/graphql/', GraphQLSubscriptionConsumer.as_asgi()),
     path('ws/tasks/<str:project_id>/', TaskConsumer.as_asgi()),
+    path('ws/organizations/<slug:organization_slug>/tasks/', OrganizationTaskConsumer.as_asgi()),
 ]
-
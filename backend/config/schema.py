@@ -17,6 +17,7 @@ from projects.schema import (
 from tasks.schema import (
     TaskQuery,
     TaskMutation,
+    TaskSubscription,
 )
 
 class Query(
@@ -35,5 +36,11 @@ class Mutation(
 ):
     pass
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
+class Subscription(
+    TaskSubscription,
+    graphene.ObjectType
+):
+    pass
+
+schema = graphene.Schema(query=Query, mutation=Mutation, subscription=Subscription)
 
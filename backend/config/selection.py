@@ -0,0 +1,28 @@
+"""
+Helpers for inspecting the GraphQL selection set of a resolver.
+"""
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+def iter_field_nodes(selection_set, fragments):
+    """Yield the field nodes of a selection set, expanding fragments."""
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iter_field_nodes(selection.selection_set, fragments)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                yield from iter_field_nodes(fragment.selection_set, fragments)
+
+
+def selected_fields(info):
+    """Get the names of the fields selected on the current field's result."""
+    names = set()
+    for field_node in info.field_nodes:
+        for node in iter_field_nodes(field_node.selection_set, info.fragments):
+            names.add(node.name.value)
+    return names
@@ -0,0 +1,163 @@
+"""
+Bounded outbound queues for WebSocket connections.
+
+Consumers hand frames to a ``SendQueue`` instead of sending them from their
+channel layer handlers. A single task per connection sends queued frames in
+order, so a client that reads slowly (an ASGI server awaiting the socket
+buffer) no longer stalls the consumer; frames pile up in the queue instead,
+where stale ones are merged away.
+
+A mergeable frame arriving while the previous mergeable frame is still
+queued is merged into it, and the merged frame is only encoded again when it
+is sent. Clients that keep up always get the original, preserialized text.
+The queue is bounded by the number of pending updates: once full, ``put``
+waits up to ``timeout`` seconds for the client to catch up (backpressure)
+and then drops the backlog and calls ``on_overflow``.
+
+The bound relies on ``send`` waiting while the client is behind. That holds
+for ASGI servers whose ``websocket.send`` waits for the socket to drain, such
+as uvicorn. Daphne returns from ``websocket.send`` as soon as Twisted has
+buffered the frame, so under daphne frames rarely queue here and a slow
+client's backlog grows in the transport buffer instead, unmerged and
+unbounded.
+"""
+import asyncio
+import json
+from collections import deque, namedtuple
+from .encoding import dumps
+
+
+QueueInfo = namedtuple('QueueInfo', ['connections', 'depth', 'max_depth', 'sent', 'merged', 'dropped', 'overflows'])
+
+
+class SendQueueStats:
+    """Counters shared by the send queues of a worker."""
+
+    def __init__(self):
+        self.queues = set()
+        self.max_depth = 0
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.overflows = 0
+
+    def info(self):
+        return QueueInfo(
+            len(self.queues),
+            sum(queue.depth for queue in self.queues),
+            self.max_depth,
+            self.sent,
+            self.merged,
+            self.dropped,
+            self.overflows,
+        )
+
+    def reset(self):
+        self.max_depth = self.sent = self.merged = self.dropped = self.overflows = 0
+
+
+# Counters of every queue in this worker.
+send_queue_stats = SendQueueStats()
+
+
+class Frame:
+    """A queued text frame; ``data`` is decoded only when it gets merged."""
+
+    __slots__ = ('text', 'data', 'size', 'mergeable')
+
+    def __init__(self, text, size, mergeable):
+        self.text = text
+        self.data = None
+        self.size = size
+        self.mergeable = mergeable
+
+    def decoded(self):
+        if self.data is None:
+            self.data = json.loads(self.text)
+        return self.data
+
+
+class SendQueue:
+    """
+    Outbound frame queue of one connection.
+
+    ``merge(previous, data)`` combines two decoded mergeable frames and
+    returns ``(data, size)``, the merged frame and its number of updates, or
+    None when these two frames cannot be merged.
+    """
+
+    def __init__(self, send, merge, stats, maxsize=500, timeout=5, on_overflow=None):
+        self._send = send
+        self._merge = merge
+        self._stats = stats
+        self._frames = deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.on_overflow = on_overflow
+        self.depth = 0
+        self._task = None
+
+    def start(self):
+        self._stats.queues.add(self)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        self._stats.queues.discard(self)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def put(self, text, size=1, mergeable=False):
+        """Queue a frame of ``size`` updates, waiting while the queue is full."""
+        if self.depth >= self.maxsize:
+            self._space.clear()
+            try:
+                await asyncio.wait_for(self._space.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                await self._overflow(size)
+                return
+
+        tail = self._frames[-1] if self._frames else None
+        merged = None
+        if mergeable and tail is not None and tail.mergeable:
+            merged = self._merge(tail.decoded(), json.loads(text))
+        if merged is not None:
+            data, merged_size = merged
+            self._stats.merged += tail.size + size - merged_size
+            self.depth += merged_size - tail.size
+            tail.text, tail.data, tail.size = None, data, merged_size
+        else:
+            self._frames.append(Frame(text, size, mergeable))
+            self.depth += size
+        self._stats.max_depth = max(self._stats.max_depth, self.depth)
+        self._ready.set()
+
+    async def _overflow(self, size):
+        self._stats.overflows += 1
+        self._stats.dropped += self.depth + size
+        self._frames.clear()
+        self.depth = 0
+        self._space.set()
+        if self.on_overflow is not None:
+            await self.on_overflow()
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            while self._frames:
+                frame = self._frames.popleft()
+                self.depth -= frame.size
+                if self.depth < self.maxsize:
+                    self._space.set()
+                if frame.text is None:
+                    frame.text = dumps(frame.data)
+                await self._send(frame.text)
+                self._stats.sent += 1
+            self._ready.clear()
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -86,6 +87,14 @@ DATABASES = {
     )
 }
 
+# Cache. Response cache versions, stream replay buffers and persisted queries
+# live here, so every worker process must share it: CACHE_URL is required
+# unless DEBUG is on, where the per-process locmem fallback assumes a single
+# process (runserver).
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://') if DEBUG else env.cache('CACHE_URL'),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -146,6 +155,34 @@ GRAPHENE = {
     ],
 }
 
+# Serve /graphql/ with the async view; enable when running under ASGI (daphne/uvicorn)
+GRAPHQL_ASYNC_VIEW = env.bool('GRAPHQL_ASYNC_VIEW', default=False)
+
+# Parsed and validated GraphQL documents kept per worker
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int('GRAPHQL_DOCUMENT_CACHE_SIZE', default=256)
+
+# Automatic persisted queries: cache alias holding registered queries, how long
+# (seconds) a registered query is kept, and the max-age advertised to HTTP
+# caches for hash-only GET requests (0 disables it).
+GRAPHQL_PERSISTED_QUERY_CACHE = 'default'
+GRAPHQL_PERSISTED_QUERY_TIMEOUT = env.int('GRAPHQL_PERSISTED_QUERY_TIMEOUT', default=7 * 24 * 60 * 60)
+GRAPHQL_PERSISTED_QUERY_GET_MAX_AGE = env.int('GRAPHQL_PERSISTED_QUERY_GET_MAX_AGE', default=0)
+
+# Query cost limits, checked before execution (see config/query_cost.py)
+GRAPHQL_MAX_QUERY_COST = env.int('GRAPHQL_MAX_QUERY_COST', default=5000)
+GRAPHQL_MAX_QUERY_DEPTH = env.int('GRAPHQL_MAX_QUERY_DEPTH', default=10)
+GRAPHQL_DEFAULT_LIST_SIZE = env.int('GRAPHQL_DEFAULT_LIST_SIZE', default=50)
+GRAPHQL_FIELD_COSTS = {}
+
+# Tenant-scoped response cache for read queries (timeout in seconds, 0 disables it)
+GRAPHQL_RESPONSE_CACHE = 'default'
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = env.int('GRAPHQL_RESPONSE_CACHE_TIMEOUT', default=300)
+
+# projectChanges delta sync: seconds cursors are moved back to cover late
+# commits, and days deletion tombstones (and so cursors) stay valid
+SYNC_CURSOR_OVERLAP = env.int('SYNC_CURSOR_OVERLAP', default=5)
+SYNC_TOMBSTONE_RETENTION_DAYS = env.int('SYNC_TOMBSTONE_RETENTION_DAYS', default=30)
+
 # Authentication
 AUTHENTICATION_BACKENDS = [
     'graphql_jwt.backends.JSONWebTokenBackend',
@@ -174,6 +211,27 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Seconds server-originated task_update broadcasts are coalesced per project
+# before sending (0 sends every change immediately)
+BROADCAST_COALESCE_WINDOW = env.float('BROADCAST_COALESCE_WINDOW', default=0.1)
+
+# Seconds after a too-dense task rank is written before its project's ranks
+# are rebalanced in a background thread (0 rebalances right after commit)
+RANK_REBALANCE_DELAY = env.float('RANK_REBALANCE_DELAY', default=1)
+
+# Replay buffers for resuming WebSocket streams: cache alias, messages kept
+# per stream and how long they are kept (seconds)
+STREAM_REPLAY_CACHE = 'default'
+STREAM_REPLAY_SIZE = env.int('STREAM_REPLAY_SIZE', default=200)
+STREAM_REPLAY_TIMEOUT = env.int('STREAM_REPLAY_TIMEOUT', default=3600)
+
+# Per-connection WebSocket send queues: pending updates allowed, and seconds a
+# full queue waits for the client before disconnecting it. Only effective
+# under an ASGI server whose WebSocket sends wait for the socket (see
+# config/send_queue.py)
+WEBSOCKET_SEND_QUEUE_SIZE = env.int('WEBSOCKET_SEND_QUEUE_SIZE', default=500)
+WEBSOCKET_SEND_QUEUE_TIMEOUT = env.float('WEBSOCKET_SEND_QUEUE_TIMEOUT', default=5)
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,87 @@
+"""
+Sequenced, replayable broadcast streams.
+
+Every message appended to a stream gets the next sequence number of that
+stream and is kept in a bounded ring buffer in the cache, so a client that
+reconnects with the last sequence number it saw can be sent exactly the
+messages it missed. Gaps the buffer no longer covers, whether because they
+are too large or because entries were evicted, are reported so the client
+can resynchronize from scratch.
+
+Sequence numbers are seeded from the clock, so a counter lost to eviction
+restarts above every number already handed out instead of reusing them.
+"""
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+
+def get_cache():
+    return caches[getattr(settings, 'STREAM_REPLAY_CACHE', 'default')]
+
+
+def get_size():
+    return getattr(settings, 'STREAM_REPLAY_SIZE', 200)
+
+
+def get_timeout():
+    return getattr(settings, 'STREAM_REPLAY_TIMEOUT', 3600)
+
+
+class ReplayBuffer:
+    """Ring buffers of encoded messages for the streams under one prefix."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def _sequence_key(self, stream):
+        return f'stream:{self.prefix}:{stream}:sequence'
+
+    def _slot_key(self, stream, sequence):
+        return f'stream:{self.prefix}:{stream}:slot:{sequence % get_size()}'
+
+    def next_sequence(self, stream):
+        """Allocate the next sequence number of a stream."""
+        cache = get_cache()
+        key = self._sequence_key(stream)
+        cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr().
+            sequence = time.time_ns() // 1_000_000
+            cache.set(key, sequence, timeout=None)
+            return sequence
+
+    def current_sequence(self, stream):
+        """Get the last sequence number handed out, or None for a new stream."""
+        return get_cache().get(self._sequence_key(stream))
+
+    def store(self, stream, sequence, text):
+        """Keep the encoded message sent with a sequence number for replay."""
+        get_cache().set(self._slot_key(stream, sequence), (sequence, text), timeout=get_timeout())
+
+    def since(self, stream, sequence):
+        """
+        Get the texts of the messages after ``sequence``, oldest first, and
+        the current sequence number.
+
+        The texts are None when the buffer no longer holds every missed
+        message, or the sequence number is unknown to the stream.
+        """
+        current = self.current_sequence(stream)
+        if current is None or sequence > current or current - sequence > get_size():
+            return None, current
+        if sequence == current:
+            return [], current
+
+        wanted = range(sequence + 1, current + 1)
+        keys = {self._slot_key(stream, number): number for number in wanted}
+        entries = get_cache().get_many(list(keys))
+        texts = []
+        for key, number in keys.items():
+            entry = entries.get(key)
+            if entry is None or entry[0] != number:
+                return None, current
+            texts.append(entry[1])
+        return texts, current
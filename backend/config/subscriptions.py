@@ -0,0 +1,139 @@
+"""
+GraphQL subscriptions over the Channels layer.
+
+Subscription fields are registered with the channel layer group that carries
+their events. Writes publish events to those groups after commit, and each
+``GraphQLSubscriptionConsumer`` in the group executes its subscribers'
+documents with the event as the root value. Subscribers with the same
+document and variables share one execution per event in the worker, so a
+payload is produced once and only the subscription id differs per frame.
+"""
+import asyncio
+import json
+import uuid
+from collections import OrderedDict, namedtuple
+from types import SimpleNamespace
+from django.db import transaction
+from graphql import GraphQLError, OperationType, get_operation_ast, validate
+from graphql.execution import execute
+from graphql.execution.values import get_argument_values, get_variable_values
+from .broadcast import group_send
+from .document_cache import query_hash
+from .encoding import dumps
+from .query_cost import query_cost_rule
+from .selection import iter_field_nodes
+
+
+SubscriptionField = namedtuple('SubscriptionField', ['argument', 'model', 'group'])
+Subscription = namedtuple('Subscription', ['key', 'group', 'document', 'variables', 'operation_name'])
+
+# Subscription field name -> SubscriptionField.
+SUBSCRIPTION_FIELDS = {}
+
+
+def register_subscription(field_name, argument, model, group):
+    """
+    Register a subscription field.
+
+    ``argument`` names the field argument holding the primary key of
+    ``model`` that scopes the subscription, and ``group(pk)`` returns the
+    channel layer group its events are published to.
+    """
+    SUBSCRIPTION_FIELDS[field_name] = SubscriptionField(argument, model, group)
+
+
+def publish(group, *payloads):
+    """
+    Send events to a subscription group once the current transaction commits.
+
+    The payloads travel as one channel layer message; consumers execute each
+    subscription once per payload, in order.
+    """
+    event = {'type': 'subscription.event', 'id': uuid.uuid4().hex, 'group': group, 'payloads': list(payloads)}
+    transaction.on_commit(lambda: group_send(group, event))
+
+
+def prepare_subscription(schema, query, document, variables=None, operation_name=None):
+    """
+    Validate a parsed subscription document and find the group it listens to.
+
+    Returns a ``Subscription``; raises GraphQLError when the document is not
+    a valid subscription to a registered field.
+    """
+    errors = validate(schema, document, [query_cost_rule(variables, operation_name, lambda *args: None)])
+    if errors:
+        raise errors[0]
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        raise GraphQLError("Unknown operation.")
+    if operation.operation != OperationType.SUBSCRIPTION:
+        raise GraphQLError(f"Expected a subscription operation, got {operation.operation.value}.")
+
+    coerced = get_variable_values(schema, operation.variable_definitions or (), variables or {})
+    if isinstance(coerced, list):
+        raise coerced[0]
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if definition.kind == 'fragment_definition'
+    }
+    node = next(iter_field_nodes(operation.selection_set, fragments))
+    field_name = node.name.value
+    field = SUBSCRIPTION_FIELDS.get(field_name)
+    if field is None:
+        raise GraphQLError(f"Subscription '{field_name}' is not supported.")
+
+    arguments = get_argument_values(schema.subscription_type.fields[field_name], node, coerced)
+    pk = arguments[field.argument]
+    try:
+        exists = field.model._default_manager.filter(pk=pk).exists()
+    except ValueError:
+        exists = False
+    if not exists:
+        raise GraphQLError(f"{field.model._meta.verbose_name.capitalize()} with id '{pk}' not found")
+
+    key = json.dumps([query_hash(query), operation_name, variables or {}], sort_keys=True, default=str)
+    return Subscription(key, field.group(pk), document, variables, operation_name)
+
+
+def execute_subscription(schema, subscription, payload):
+    """Execute a subscription for one event and encode its result as JSON."""
+    result = execute(
+        schema,
+        subscription.document,
+        root_value=payload,
+        context_value=SimpleNamespace(),
+        variable_values=subscription.variables,
+        operation_name=subscription.operation_name,
+    )
+    return dumps(result.formatted)
+
+
+class PayloadCache:
+    """
+    Share subscription payloads for the same event between consumers.
+
+    Entries are futures keyed by event id and subscription key, so concurrent
+    consumers await the first execution instead of repeating it. Only the
+    most recent ``maxsize`` entries are kept; events are delivered to all of
+    a group's consumers at about the same time.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._futures = OrderedDict()
+
+    async def get(self, key, produce):
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.ensure_future(produce())
+            self._futures[key] = future
+            while len(self._futures) > self.maxsize:
+                self._futures.popitem(last=False)
+        return await asyncio.shield(future)
+
+    def clear(self):
+        self._futures.clear()
+
+
+payload_cache = PayloadCache()
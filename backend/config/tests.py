@@ -0,0 +1,690 @@
+"""
+Tests for the shared GraphQL infrastructure.
+"""
+import asyncio
+import json
+import socket
+import time
+from io import StringIO
+from unittest.mock import patch
+import graphene
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.views.decorators.csrf import csrf_exempt
+from graphql import graphql
+from organizations.models import Organization
+from projects.models import Project
+from tasks.models import Task, TaskComment
+from .document_cache import DocumentCache, query_hash
+from .persisted_queries import _cache_key, get_store, register_persisted_query
+from .response_cache import get_cache
+from .schema import schema
+from .send_queue import QueueInfo, SendQueue, SendQueueStats
+from . import streams
+from .async_execution import SyncResolverMiddleware
+from .views import AsyncGraphQLView, document_cache
+
+
+def execute(query, **kwargs):
+    return schema.execute(query, context_value=RequestFactory().get('/'), **kwargs)
+
+
+class QueryOptimizerTest(TestCase):
+    """Test the selection-set aware queryset optimizer."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        for index in range(3):
+            project = Project.objects.create(organization=self.org, name=f"Project {index}")
+            for number in range(3):
+                task = Task.objects.create(project=project, title=f"Task {number}")
+                TaskComment.objects.create(task=task, content="Comment", author_email="test@example.com")
+    
+    def test_nested_relations_are_prefetched(self):
+        """Test that nested relations cost one query per level, not per row."""
+        query = '''
+            query {
+                projects(organizationSlug: "test-organization") {
+                    name
+                    organization { name }
+                    tasks { title isOverdue comments { content } }
+                }
+            }
+        '''
+        # Organization lookup, projects joined to their organization,
+        # prefetched tasks, prefetched comments.
+        with self.assertNumQueries(4):
+            result = execute(query)
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['projects']), 3)
+        for project in result.data['projects']:
+            self.assertEqual(project['organization']['name'], "Test Organization")
+            self.assertEqual(len(project['tasks']), 3)
+            for task in project['tasks']:
+                self.assertEqual(task['comments'], [{'content': "Comment"}])
+    
+    def test_only_selected_columns_are_loaded(self):
+        """Test that unselected columns such as descriptions are deferred."""
+        query = '''
+            query {
+                tasks(projectId: "%s") { ...TaskTitle }
+            }
+            fragment TaskTitle on TaskType { title }
+        ''' % Project.objects.first().pk
+        with self.assertNumQueries(2) as context:
+            result = execute(query)
+        
+        self.assertIsNone(result.errors)
+        self.assertNotIn('"description"', context.captured_queries[-1]['sql'])
+    
+    def test_single_object_resolvers(self):
+        """Test that single-object resolvers apply the same optimizations."""
+        task = Task.objects.first()
+        query = 'query { task(id: "%s") { title project { name organization { slug } } } }' % task.pk
+        with self.assertNumQueries(1):
+            result = execute(query)
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['task']['project']['organization']['slug'], "test-organization")
+
+
+class DocumentCacheTest(TestCase):
+    """Test the parsed and validated document cache."""
+    
+    def setUp(self):
+        Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        document_cache.clear()
+    
+    def post(self, query):
+        return self.client.post('/graphql/', {'query': query}, content_type='application/json')
+    
+    def test_documents_are_reused_across_requests(self):
+        """Test that repeated queries hit the cache instead of re-parsing."""
+        query = 'query { organizations { name } }'
+        for _ in range(3):
+            response = self.post(query)
+            self.assertEqual(response.json()['data'], {'organizations': [{'name': "Test Organization"}]})
+        
+        info = document_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+    
+    def test_validation_errors_are_cached(self):
+        """Test that invalid documents report their errors from the cache."""
+        for _ in range(2):
+            response = self.post('query { organizations { missingField } }')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('missingField', response.json()['errors'][0]['message'])
+        
+        self.assertEqual(document_cache.info().hits, 1)
+    
+    def test_cache_is_bounded(self):
+        """Test that the least recently used documents are evicted."""
+        cache = DocumentCache(maxsize=2)
+        graphql_schema = schema.graphql_schema
+        for name in ('name', 'slug', 'contactEmail'):
+            cache.get(graphql_schema, f'query {{ organizations {{ {name} }} }}')
+        
+        self.assertEqual(cache.info().currsize, 2)
+        cache.get(graphql_schema, 'query { organizations { name } }')
+        self.assertEqual(cache.info().misses, 4)
+
+
+class PersistedQueryTest(TestCase):
+    """Test automatic persisted queries on the GraphQL endpoint."""
+    
+    query = 'query { organizations { name } }'
+    
+    def setUp(self):
+        Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        document_cache.clear()
+        get_store().clear()
+        self.extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(self.query)}}
+    
+    def post(self, data):
+        return self.client.post('/graphql/', data, content_type='application/json')
+    
+    def test_unknown_hash_then_registration(self):
+        """Test the miss, register, hit round trip."""
+        response = self.post({'extensions': self.extensions})
+        self.assertEqual(response.json()['errors'][0]['message'], "PersistedQueryNotFound")
+        self.assertEqual(
+            response.json()['errors'][0]['extensions']['code'], 'PERSISTED_QUERY_NOT_FOUND'
+        )
+        
+        response = self.post({'query': self.query, 'extensions': self.extensions})
+        self.assertEqual(response.json()['data']['organizations'], [{'name': "Test Organization"}])
+        
+        document_cache.clear()
+        response = self.post({'extensions': self.extensions})
+        self.assertEqual(response.json()['data']['organizations'], [{'name': "Test Organization"}])
+    
+    def test_hash_mismatch_is_rejected(self):
+        """Test that a query cannot be registered under another query's hash."""
+        response = self.post({'query': 'query { organizations { slug } }', 'extensions': self.extensions})
+        self.assertEqual(
+            response.json()['errors'][0]['extensions']['code'], 'PERSISTED_QUERY_HASH_MISMATCH'
+        )
+    
+    def test_invalid_queries_are_not_registered(self):
+        """Test that only queries that parse and validate are stored."""
+        for query in ['query { organizations {', 'query { nothing }']:
+            response = self.post({
+                'query': query,
+                'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(query)}},
+            })
+            self.assertIn('errors', response.json())
+            self.assertIsNone(get_store().get(_cache_key(query_hash(query))))
+    
+    @override_settings(GRAPHQL_PERSISTED_QUERY_TIMEOUT=60)
+    def test_registered_queries_expire(self):
+        """Test that registered queries are stored with a finite timeout."""
+        store = get_store()
+        with patch.object(store, 'set', wraps=store.set) as store_set:
+            self.post({'query': self.query, 'extensions': self.extensions})
+        
+        store_set.assert_called_once_with(_cache_key(query_hash(self.query)), self.query, timeout=60)
+    
+    @override_settings(GRAPHQL_PERSISTED_QUERY_GET_MAX_AGE=60)
+    def test_hash_only_get_is_cacheable(self):
+        """Test that GET requests carrying only a hash can be served by HTTP caches."""
+        self.post({'query': self.query, 'extensions': self.extensions})
+        response = self.client.get(
+            '/graphql/', {'extensions': json.dumps(self.extensions)}, HTTP_ACCEPT='application/json'
+        )
+        
+        self.assertEqual(response.json()['data']['organizations'], [{'name': "Test Organization"}])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('X-Organization-Slug', response['Vary'])
+    
+    def test_hash_only_get_rejects_mutations(self):
+        """Test that persisted mutations still require POST."""
+        mutation = 'mutation { createOrganization(name: "Other", contactEmail: "a@b.com") { success } }'
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(mutation)}}
+        register_persisted_query(query_hash(mutation), mutation)
+        response = self.client.get(
+            '/graphql/', {'extensions': json.dumps(extensions)}, HTTP_ACCEPT='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Organization.objects.filter(name="Other").exists())
+
+
+@override_settings(GRAPHQL_MAX_QUERY_COST=150, GRAPHQL_MAX_QUERY_DEPTH=5, GRAPHQL_DEFAULT_LIST_SIZE=10)
+class QueryCostTest(TestCase):
+    """Test query cost analysis and limits on the GraphQL endpoint."""
+    
+    def setUp(self):
+        Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+    
+    def post(self, query, variables=None):
+        return self.client.post(
+            '/graphql/', {'query': query, 'variables': variables}, content_type='application/json'
+        )
+    
+    def test_cost_is_reported_in_extensions(self):
+        """Test that lists multiply the cost of their sub-selection."""
+        # organizations (1) + 10 * (projects (1) + 10 * organization (1))
+        response = self.post('query { organizations { name projects { organization { name } } } }')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['extensions']['cost']['requested'], 111)
+        self.assertEqual(response.json()['extensions']['cost']['depth'], 4)
+    
+    def test_connection_cost_uses_first_argument(self):
+        """Test that connections are multiplied by first, including from variables."""
+        query = """
+            query Page($first: Int) {
+                organizationsConnection(first: $first) { edges { node { projects { name } } } }
+            }
+        """
+        response = self.post(query, {'first': 5})
+        
+        # connection (1) + 5 * (edges (1) + node (1) + projects (1))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['extensions']['cost']['requested'], 16)
+    
+    def test_expensive_query_is_rejected(self):
+        """Test that operations over budget are rejected before execution."""
+        query = """
+            query {
+                first: organizations { projects { tasks { title } } }
+                second: organizations { projects { tasks { title } } }
+            }
+        """
+        with self.assertNumQueries(0):
+            response = self.post(query)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['extensions']['code'], 'QUERY_TOO_COMPLEX')
+        self.assertNotIn('data', response.json())
+    
+    def test_deep_query_is_rejected(self):
+        """Test that circular relations cannot be nested past the depth limit."""
+        query = 'query { organizations { projects { organization { projects { organization { name } } } } } }'
+        response = self.post(query)
+        
+        codes = [error['extensions']['code'] for error in response.json()['errors']]
+        self.assertIn('QUERY_TOO_DEEP', codes)
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    BROADCAST_COALESCE_WINDOW=0,
+)
+class ResponseCacheTest(TestCase):
+    """Test the tenant-scoped response cache on the GraphQL endpoint."""
+    
+    tasks_query = 'query Tasks($projectId: ID!) { tasks(projectId: $projectId) { title } }'
+    
+    def setUp(self):
+        get_cache().clear()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Project")
+        self.other_project = Project.objects.create(organization=self.organization, name="Other")
+        self.task = Task.objects.create(project=self.project, title="Task")
+    
+    def post(self, query, variables=None):
+        return self.client.post(
+            '/graphql/', {'query': query, 'variables': variables}, content_type='application/json'
+        ).json()
+    
+    def tasks(self, project):
+        return self.post(self.tasks_query, {'projectId': str(project.id)})
+    
+    def test_repeated_query_is_served_from_cache(self):
+        """Test that a repeated scoped query skips execution."""
+        self.assertEqual(self.tasks(self.project)['extensions']['cache'], 'MISS')
+        
+        with self.assertNumQueries(0):
+            response = self.tasks(self.project)
+        
+        self.assertEqual(response['extensions']['cache'], 'HIT')
+        self.assertEqual(response['data']['tasks'], [{'title': "Task"}])
+    
+    def test_mutation_invalidates_only_its_project(self):
+        """Test that a task mutation invalidates its project but not its siblings."""
+        self.tasks(self.project)
+        self.tasks(self.other_project)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(f'mutation {{ updateTask(id: "{self.task.id}", title: "Renamed") {{ success }} }}')
+        
+        response = self.tasks(self.project)
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['tasks'], [{'title': "Renamed"}])
+        self.assertEqual(self.tasks(self.other_project)['extensions']['cache'], 'HIT')
+    
+    def test_ids_with_leading_zeros_are_invalidated(self):
+        """Test that ids spelled with leading zeros share their object's version."""
+        project_id = f'0{self.project.id}'
+        self.post(self.tasks_query, {'projectId': project_id})
+        task_query = f'{{ task(id: "00{self.task.id}") {{ title }} }}'
+        self.post(task_query)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(f'mutation {{ updateTask(id: "{self.task.id}", title: "Renamed") {{ success }} }}')
+        
+        response = self.post(self.tasks_query, {'projectId': project_id})
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['tasks'], [{'title': "Renamed"}])
+        response = self.post(task_query)
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['task'], {'title': "Renamed"})
+    
+    def test_model_save_invalidates_organization_queries(self):
+        """Test that saving a model outside GraphQL invalidates aggregate queries."""
+        query = '{ projectStats(organizationSlug: "test-organization") { totalTasks } }'
+        self.post(query)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(project=self.other_project, title="Another")
+        
+        response = self.post(query)
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['projectStats']['totalTasks'], 2)
+    
+    def test_organization_update_invalidates_project_queries(self):
+        """Test that project-scoped results embedding the organization are invalidated."""
+        query = f'{{ project(id: "{self.project.id}") {{ organization {{ name }} }} }}'
+        self.post(query)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(f'mutation {{ updateOrganization(id: "{self.organization.id}", name: "Renamed") {{ success }} }}')
+        
+        response = self.post(query)
+        self.assertEqual(response['data']['project']['organization']['name'], "Renamed")
+    
+    def test_sibling_project_invalidates_embedded_organization_counts(self):
+        """Test that project results reading organization counts follow its other projects."""
+        query = f'{{ project(id: "{self.project.id}") {{ organization {{ projectCount }} }} }}'
+        self.post(query)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(organization=self.organization, name="Sibling")
+        
+        response = self.post(query)
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['project']['organization']['projectCount'], 3)
+    
+    def test_reconcile_invalidates_repaired_projects(self):
+        """Test that repaired counters are not served from the cache."""
+        Project.objects.filter(pk=self.project.pk).update(task_count=5)
+        query = f'{{ project(id: "{self.project.id}") {{ taskCount }} }}'
+        self.assertEqual(self.post(query)['data']['project']['taskCount'], 5)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_counters', stdout=StringIO())
+        
+        response = self.post(query)
+        self.assertEqual(response['extensions']['cache'], 'MISS')
+        self.assertEqual(response['data']['project']['taskCount'], 1)
+    
+    def test_unscoped_queries_are_not_cached(self):
+        """Test that queries listing every organization bypass the cache."""
+        response = self.post('{ organizations { name } }')
+        
+        self.assertNotIn('cache', response['extensions'])
+    
+    def test_errors_are_not_cached(self):
+        """Test that failed queries are executed again."""
+        query = '{ projectStats(organizationSlug: "missing") { totalTasks } }'
+        self.post(query)
+        
+        self.assertEqual(self.post(query)['extensions']['cache'], 'MISS')
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    BROADCAST_COALESCE_WINDOW=0,
+)
+class AsyncGraphQLViewTest(TransactionTestCase):
+    """Test executing operations through the async view."""
+    
+    def setUp(self):
+        get_cache().clear()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Project")
+        for index in range(3):
+            task = Task.objects.create(project=self.project, title=f"Task {index}")
+            TaskComment.objects.create(task=task, content="Comment", author_email="test@example.com")
+        self.view = csrf_exempt(AsyncGraphQLView.as_view(schema=schema))
+    
+    async def post(self, query, variables=None):
+        request = AsyncRequestFactory().post(
+            '/graphql/', {'query': query, 'variables': variables}, content_type='application/json'
+        )
+        request.organization = None
+        response = await self.view(request)
+        return json.loads(response.content)
+    
+    async def test_root_fields_and_nested_loaders(self):
+        """Test that root fields and batched nested fields resolve off the event loop."""
+        query = f'''
+            query {{
+                projects(organizationSlug: "test-organization") {{ name taskCount organization {{ name }} }}
+                projectStats(organizationSlug: "test-organization") {{ totalTasks }}
+                tasks(projectId: "{self.project.pk}") {{ title commentCount }}
+            }}
+        '''
+        result = await self.post(query)
+        
+        self.assertNotIn('errors', result)
+        self.assertEqual(result['data']['projects'], [
+            {'name': "Project", 'taskCount': 3, 'organization': {'name': "Test Organization"}}
+        ])
+        self.assertEqual(result['data']['projectStats'], {'totalTasks': 3})
+        self.assertEqual([task['commentCount'] for task in result['data']['tasks']], [1, 1, 1])
+        self.assertEqual(result['extensions']['cache'], 'MISS')
+        
+        self.assertEqual((await self.post(query))['extensions']['cache'], 'HIT')
+    
+    async def test_mutations_run_synchronously(self):
+        """Test that mutations still execute and commit through the async view."""
+        result = await self.post(
+            'mutation Create($projectId: ID!) { createTask(projectId: $projectId, title: "Async task") { success } }',
+            {'projectId': str(self.project.pk)},
+        )
+        
+        self.assertTrue(result['data']['createTask']['success'])
+        self.assertTrue(await Task.objects.filter(title="Async task").aexists())
+    
+    def test_async_resolvers_are_awaited(self):
+        """Test that coroutine resolvers run alongside adapted sync resolvers."""
+        class Query(graphene.ObjectType):
+            task_total = graphene.Int()
+            project_names = graphene.List(graphene.String)
+            
+            async def resolve_task_total(self, info):
+                return await Task.objects.acount()
+            
+            def resolve_project_names(self, info):
+                return Project.objects.values_list('name', flat=True)
+        
+        async def run():
+            return await graphql(
+                graphene.Schema(query=Query).graphql_schema,
+                '{ taskTotal projectNames }',
+                middleware=[SyncResolverMiddleware()],
+            )
+        
+        result = async_to_sync(run)()
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, {'taskTotal': 3, 'projectNames': ["Project"]})
+    
+    def test_sync_root_fields_overlap(self):
+        """Test that synchronous root fields run in parallel threads."""
+        class Query(graphene.ObjectType):
+            first = graphene.List(graphene.String)
+            second = graphene.List(graphene.String)
+            
+            def resolve_first(self, info):
+                time.sleep(0.3)
+                return Project.objects.values_list('name', flat=True)
+            
+            def resolve_second(self, info):
+                time.sleep(0.3)
+                return Task.objects.values_list('title', flat=True)[:1]
+        
+        async def run():
+            return await graphql(
+                graphene.Schema(query=Query).graphql_schema,
+                '{ first second }',
+                middleware=[SyncResolverMiddleware()],
+            )
+        
+        started = time.monotonic()
+        result = async_to_sync(run)()
+        elapsed = time.monotonic() - started
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['first'], ["Project"])
+        self.assertLess(elapsed, 0.55)
+
+
+@override_settings(STREAM_REPLAY_SIZE=3)
+class ReplayBufferTest(TestCase):
+    """Test sequenced replay buffers."""
+    
+    def setUp(self):
+        streams.get_cache().clear()
+        self.buffer = streams.ReplayBuffer('test')
+    
+    def append(self, count):
+        for _ in range(count):
+            sequence = self.buffer.next_sequence('a')
+            self.buffer.store('a', sequence, f'message {sequence}')
+        return sequence
+    
+    def test_sequences_increase_per_stream(self):
+        """Test that each stream numbers its messages independently."""
+        first = self.buffer.next_sequence('a')
+        self.assertEqual(self.buffer.next_sequence('a'), first + 1)
+        self.assertEqual(self.buffer.current_sequence('a'), first + 1)
+        self.assertIsNone(self.buffer.current_sequence('b'))
+    
+    def test_replay_missed_messages(self):
+        """Test replaying the messages after a sequence number."""
+        last = self.append(3)
+        
+        self.assertEqual(self.buffer.since('a', last - 2), ([f'message {last - 1}', f'message {last}'], last))
+        self.assertEqual(self.buffer.since('a', last), ([], last))
+    
+    def test_gaps_beyond_the_buffer_need_resync(self):
+        """Test that overwritten, evicted or unknown positions cannot be replayed."""
+        last = self.append(5)
+        
+        self.assertEqual(self.buffer.since('a', last - 4), (None, last))
+        self.assertEqual(self.buffer.since('a', last + 1), (None, last))
+        self.assertEqual(self.buffer.since('b', 1), (None, None))
+        
+        streams.get_cache().delete(self.buffer._slot_key('a', last - 1))
+        self.assertEqual(self.buffer.since('a', last - 2), (None, last))
+
+
+class SendQueueTest(TestCase):
+    """Test bounded, merging WebSocket send queues."""
+    
+    @staticmethod
+    def merge(previous, data):
+        if 'items' not in previous or 'items' not in data:
+            return None
+        items = {**previous['items'], **data['items']}
+        return {'items': items}, len(items)
+    
+    def run_queue(self, scenario, maxsize=3, timeout=0.05):
+        """Run ``scenario(queue, release)`` against a client that only reads once released."""
+        async def run():
+            sent = []
+            overflows = []
+            gate = asyncio.Event()
+            
+            async def send(text):
+                await gate.wait()
+                sent.append(json.loads(text))
+            
+            async def on_overflow():
+                overflows.append(True)
+            
+            stats = SendQueueStats()
+            queue = SendQueue(send, self.merge, stats, maxsize=maxsize, timeout=timeout, on_overflow=on_overflow)
+            queue.start()
+            await scenario(queue, gate)
+            gate.set()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            await queue.stop()
+            return sent, overflows, stats.info()
+        
+        return async_to_sync(run)()
+    
+    def test_pending_frames_are_merged(self):
+        """Test that frames queued behind a slow send are merged, keeping the latest values."""
+        async def scenario(queue, gate):
+            await queue.put(json.dumps({'items': {'a': 1}}), mergeable=True)
+            await asyncio.sleep(0)  # the first frame is being sent
+            await queue.put(json.dumps({'items': {'a': 2, 'b': 1}}), size=2, mergeable=True)
+            await queue.put(json.dumps({'items': {'a': 3}}), mergeable=True)
+            await queue.put(json.dumps({'notice': True}))
+            await queue.put(json.dumps({'items': {'c': 1}}), mergeable=True)
+        
+        sent, overflows, info = self.run_queue(scenario, maxsize=10)
+        
+        self.assertEqual(sent, [
+            {'items': {'a': 1}}, {'items': {'a': 3, 'b': 1}}, {'notice': True}, {'items': {'c': 1}},
+        ])
+        self.assertEqual(overflows, [])
+        self.assertEqual(info.sent, 4)
+        self.assertEqual(info.merged, 1)
+        self.assertEqual(info.max_depth, 4)
+        self.assertEqual(info.depth, 0)
+    
+    async def fill(self, queue):
+        """Fill a queue of size 3 behind a frame that is being sent."""
+        await queue.put(json.dumps({'index': 0}))
+        await asyncio.sleep(0)
+        for index in range(1, 4):
+            await queue.put(json.dumps({'index': index}))
+        self.assertEqual(queue.depth, 3)
+    
+    def test_full_queue_waits_then_overflows(self):
+        """Test backpressure while the client catches up, and dropping the backlog when it does not."""
+        async def scenario(queue, gate):
+            await self.fill(queue)
+            waiting = asyncio.ensure_future(queue.put(json.dumps({'index': 4})))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiting.done())
+            await waiting
+        
+        sent, overflows, info = self.run_queue(scenario)
+        
+        self.assertEqual(sent, [{'index': 0}])
+        self.assertEqual(overflows, [True])
+        self.assertEqual((info.overflows, info.dropped, info.connections), (1, 4, 0))
+    
+    def test_backpressure_resumes_when_client_catches_up(self):
+        """Test that a full queue accepts frames again once the client reads."""
+        async def scenario(queue, gate):
+            await self.fill(queue)
+            waiting = asyncio.ensure_future(queue.put(json.dumps({'index': 4})))
+            await asyncio.sleep(0)
+            gate.set()
+            await waiting
+        
+        sent, overflows, info = self.run_queue(scenario, timeout=1)
+        
+        self.assertEqual(sent, [{'index': index} for index in range(5)])
+        self.assertEqual(overflows, [])
+    
+    def test_socket_send_that_blocks_overflows(self):
+        """Test the bound against a real socket whose peer never reads."""
+        async def run():
+            reading, writing = socket.socketpair()
+            for sock, option in ((reading, socket.SO_RCVBUF), (writing, socket.SO_SNDBUF)):
+                sock.setsockopt(socket.SOL_SOCKET, option, 4096)
+            _reader, writer = await asyncio.open_connection(sock=writing)
+            writer.transport.set_write_buffer_limits(high=4096)
+            
+            async def send(text):
+                writer.write(text.encode())
+                await writer.drain()
+            
+            overflows = []
+            
+            async def on_overflow():
+                overflows.append(True)
+            
+            stats = SendQueueStats()
+            queue = SendQueue(send, self.merge, stats, maxsize=3, timeout=0.05, on_overflow=on_overflow)
+            queue.start()
+            try:
+                for index in range(20):
+                    await queue.put(json.dumps({'index': index, 'padding': 'x' * 16384}))
+                    await asyncio.sleep(0)
+            finally:
+                await queue.stop()
+                writer.transport.abort()
+                reading.close()
+            return overflows, stats.info()
+        
+        overflows, info = async_to_sync(run)()
+        
+        self.assertTrue(overflows)
+        self.assertLess(info.sent, 20)
+        self.assertGreater(info.dropped, 0)
+    
+    def test_metrics_require_staff(self):
+        """Test that queue metrics are only reported to staff users."""
+        user = User.objects.create_user('staff', password='password', is_staff=True)
+        self.assertEqual(self.client.get('/metrics/websockets/').status_code, 302)
+        
+        self.client.force_login(user)
+        response = self.client.get('/metrics/websockets/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), set(QueueInfo._fields))
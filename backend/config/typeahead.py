@@ -0,0 +1,61 @@
+"""
+Prefix and fuzzy matching for autocomplete fields.
+
+On PostgreSQL, suggested columns carry a ``pg_trgm`` GIN index over
+``UPPER(column)``, created by migrations only: the ``--nomigrations`` test
+databases cannot build it. The same index serves both matches: prefix lookups
+(``UPPER(column) LIKE 'TEXT%'``) and fuzzy ones (``UPPER(column) %> 'TEXT'``,
+true when the text is similar enough to some word of the value), so the top
+suggestions come from an index scan instead of a full scan. Prefix matches
+rank first, then values by word similarity.
+
+Other databases (SQLite in development and tests) fall back to prefix and
+substring matching.
+"""
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, router
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length, Upper
+from graphql import GraphQLError
+
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+
+def has_trigram(model):
+    """Check whether the database of a model supports trigram indexes."""
+    return connections[router.db_for_read(model)].vendor == 'postgresql'
+
+
+def check_arguments(text, first):
+    """Validate the query text and number of suggestions of a suggest field."""
+    if not text.strip():
+        raise GraphQLError("Search query must not be empty")
+    if not 1 <= first <= MAX_SUGGESTIONS:
+        raise GraphQLError(f"Argument 'first' must be between 1 and {MAX_SUGGESTIONS}")
+
+
+def suggest(queryset, field, text):
+    """
+    Filter a queryset to values of ``field`` matching ``text`` and order them
+    best match first. Callers slice the result to the number of suggestions.
+    """
+    text = text.strip()
+    prefix = Q(**{f'{field}__istartswith': text})
+    is_prefix = Case(When(prefix, then=Value(0)), default=Value(1), output_field=IntegerField())
+
+    if has_trigram(queryset.model):
+        queryset = queryset.alias(_upper=Upper(field)).filter(
+            prefix | Q(_upper__trigram_word_similar=text.upper())
+        ).alias(
+            _is_prefix=is_prefix,
+            _similarity=TrigramWordSimilarity(text, field),
+        )
+        return queryset.order_by('_is_prefix', '-_similarity', field)
+
+    queryset = queryset.filter(prefix | Q(**{f'{field}__icontains': text})).alias(
+        _is_prefix=is_prefix,
+        _length=Length(field),
+    )
+    return queryset.order_by('_is_prefix', '_length', field)
@@ -0,0 +1,86 @@
+"""
+Single-statement partial updates.
+
+``update_returning`` writes only the given columns of one row and reads the
+updated row back in the same ``UPDATE ... RETURNING`` statement, instead of
+a ``SELECT`` followed by a full-row ``save()``. Models with a ``version``
+column get it incremented, and an expected version can be passed for
+optimistic concurrency control.
+
+The statement bypasses ``Model.save()``, so model signals are not sent.
+"""
+from django.db import connections, router
+from django.db.models import F
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from graphql import GraphQLError
+
+
+def counted_save_fields(instance, counters):
+    """
+    Get the fields a full ``save()`` of a loaded instance should write,
+    leaving out its ``counters``: columns only changed by ``F()`` increments,
+    which the instance's values would overwrite with stale counts.
+    """
+    deferred = instance.get_deferred_fields()
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.attname not in deferred and field.name not in counters
+    ]
+
+
+def update_returning(model, pk, changes, expected_version=None, condition=None):
+    """
+    Update fields of the row with primary key ``pk`` and return the updated
+    instance, or None if no row matched (missing, at another version, or not
+    matching the optional ``condition`` Q object).
+    """
+    changes = dict(changes)
+    field_names = {field.name for field in model._meta.concrete_fields}
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            changes.setdefault(field.name, timezone.now())
+    if 'version' in field_names:
+        changes['version'] = F('version') + 1
+
+    queryset = model._default_manager.filter(pk=pk)
+    if expected_version is not None:
+        queryset = queryset.filter(version=expected_version)
+    if condition is not None:
+        queryset = queryset.filter(condition)
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if not connection.features.can_return_columns_from_insert:
+        # Backends without RETURNING fall back to UPDATE then SELECT.
+        if not queryset.using(using).update(**changes):
+            return None
+        return model._default_manager.using(using).get(pk=pk)
+
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(changes)
+    sql, params = query.get_compiler(using).as_sql()
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in model._meta.concrete_fields
+    )
+    rows = list(model._default_manager.raw(f'{sql} RETURNING {columns}', params).using(using))
+    return rows[0] if rows else None
+
+
+def update_or_raise(model, pk, changes, expected_version=None):
+    """
+    Like ``update_returning``, but raise a GraphQLError when no row matched.
+
+    Rows that exist at another version raise with the ``VERSION_CONFLICT``
+    code; that check only costs a query once the update has failed.
+    """
+    instance = update_returning(model, pk, changes, expected_version)
+    if instance is None:
+        label = model._meta.verbose_name.capitalize()
+        if expected_version is not None and model._default_manager.filter(pk=pk).exists():
+            raise GraphQLError(
+                f"{label} with id '{pk}' was modified since version {expected_version}",
+                extensions={'code': 'VERSION_CONFLICT'},
+            )
+        raise GraphQLError(f"{label} with id '{pk}' not found")
+    return instance
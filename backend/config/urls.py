@@ -1,14 +1,18 @@
 """
 URL configuration for project management system.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 from config.schema import schema
+from config.views import AsyncGraphQLView, GraphQLView, websocket_metrics
+
+graphql_view = AsyncGraphQLView if settings.GRAPHQL_ASYNC_VIEW else GraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True, schema=schema))),
+    path('graphql/', csrf_exempt(graphql_view.as_view(graphiql=True, schema=schema))),
+    path('metrics/websockets/', websocket_metrics),
 ]
 
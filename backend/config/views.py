@@ -0,0 +1,356 @@
+"""
+GraphQL endpoint views.
+"""
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.http.response import HttpResponseBadRequest
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import GraphQLError, MiddlewareManager, OperationType, get_operation_ast, validate
+from graphql.execution import ExecutionResult, execute, execute_sync
+from . import response_cache
+from .async_execution import SyncResolverMiddleware
+from .document_cache import DocumentCache, query_hash
+from .persisted_queries import get_persisted_query_hash, register_persisted_query, resolve_persisted_query
+from .query_cost import query_cost_rule
+from .send_queue import send_queue_stats
+
+
+document_cache = DocumentCache(maxsize=getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 256))
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    GraphQL view that reuses parsed and validated documents across requests,
+    supports automatic persisted queries, enforces query cost limits and
+    caches tenant-scoped query responses.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        return self.add_cache_headers(request, response)
+
+    def add_cache_headers(self, request, response):
+        max_age = getattr(settings, 'GRAPHQL_PERSISTED_QUERY_GET_MAX_AGE', 0)
+        if (
+            max_age
+            and request.method == 'GET'
+            and response.status_code == 200
+            and getattr(request, '_persisted_query_hash', None)
+        ):
+            # Hash-only GETs are stable URLs that HTTP caches and CDNs can serve.
+            patch_cache_control(response, public=True, max_age=max_age)
+            patch_vary_headers(response, ['Authorization', 'X-Organization-Slug'])
+        return response
+
+    def get_document(self, request, data, query):
+        """
+        Get the cached ``(document, errors)`` pair for a request.
+
+        Returns ``(None, None)`` when the request carries no query at all.
+        """
+        graphql_schema = self.schema.graphql_schema
+        try:
+            sha256_hash = get_persisted_query_hash(request, data)
+        except GraphQLError as error:
+            return None, [error]
+        if sha256_hash is None:
+            if not query:
+                return None, None
+            return document_cache.get(graphql_schema, query)
+
+        request._persisted_query_hash = sha256_hash
+        if not query:
+            entry = document_cache.get_by_hash(graphql_schema, sha256_hash)
+            if entry is not None:
+                return entry
+        registering = bool(query)
+        try:
+            query = resolve_persisted_query(sha256_hash, query)
+        except GraphQLError as error:
+            return None, [error]
+        document, errors = document_cache.get(graphql_schema, query)
+        if registering and not errors:
+            # Only valid documents are shared with the other workers.
+            register_persisted_query(sha256_hash, query)
+        return document, errors
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        return self.build_response(request, execution_result, id, show_graphiql)
+
+    def build_response(self, request, execution_result, id=None, show_graphiql=False):
+        """Encode an execution result as ``(body, status_code)``."""
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            extensions = self.get_extensions(request)
+            if extensions:
+                response["extensions"] = extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def get_extensions(self, request):
+        """Get the ``extensions`` entry reported alongside the result."""
+        extensions = {}
+        cost = getattr(request, '_query_cost', None)
+        if cost is not None:
+            extensions['cost'] = cost
+        cache_status = getattr(request, '_response_cache_status', None)
+        if cache_status is not None:
+            extensions['cache'] = cache_status
+        return extensions
+
+    def get_response_cache_key(self, request, query, document, operation_ast, variables, operation_name):
+        """Get the response cache key for a query operation, or None if it is not cacheable."""
+        if not response_cache.get_timeout() or operation_ast is None:
+            return None
+        if operation_ast.operation != OperationType.QUERY:
+            return None
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if definition.kind == 'fragment_definition'
+        }
+        query_key = getattr(request, '_persisted_query_hash', None) or query_hash(query)
+        return response_cache.cache_key(
+            request, query_key, operation_ast, fragments, variables, operation_name
+        )
+
+    def check_query_cost(self, request, document, variables, operation_name):
+        """Validate the operation against the configured cost and depth limits."""
+        def report(cost, depth, limits):
+            request._query_cost = {
+                'requested': cost,
+                'maximum': limits['max_cost'],
+                'depth': depth,
+                'maximumDepth': limits['max_depth'],
+            }
+
+        rule = query_cost_rule(variables, operation_name, report)
+        return validate(self.schema.graphql_schema, document, [rule])
+
+    def prepare_execution(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        Run everything that happens before execution.
+
+        Returns ``(options, result)``. ``options`` holds the arguments for
+        ``graphql.execute`` or is None when the request was answered early,
+        in which case ``result`` is the final result (None renders nothing).
+        """
+        document, errors = self.get_document(request, data, query)
+        if errors:
+            return None, ExecutionResult(errors=errors)
+        if document is None:
+            if show_graphiql:
+                return None, None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        errors = self.check_query_cost(request, document, variables, operation_name)
+        if errors:
+            return None, ExecutionResult(errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if request.method.lower() == "get":
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None, None
+
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["POST"],
+                        "Can only perform a {} operation from a POST request.".format(
+                            operation_ast.operation.value
+                        ),
+                    )
+                )
+
+        try:
+            request._graphql_operation = operation_ast.operation if operation_ast else None
+            request._response_cache_key = self.get_response_cache_key(
+                request, query, document, operation_ast, variables, operation_name
+            )
+            if request._response_cache_key is not None:
+                data = response_cache.get_cache().get(request._response_cache_key)
+                if data is not None:
+                    request._response_cache_status = 'HIT'
+                    return None, ExecutionResult(data=data)
+                request._response_cache_status = 'MISS'
+
+            options = {
+                "schema": self.schema.graphql_schema,
+                "document": document,
+                "root_value": self.get_root_value(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "context_value": self.get_context(request),
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                options["execution_context_class"] = self.execution_context_class
+            return options, None
+        except Exception as e:
+            return None, ExecutionResult(errors=[e])
+
+    def store_result(self, request, result):
+        """Cache a successful result when the operation is cacheable."""
+        cache_key = getattr(request, '_response_cache_key', None)
+        if cache_key is not None and not result.errors:
+            response_cache.get_cache().set(cache_key, result.data, timeout=response_cache.get_timeout())
+
+    def run_execution(self, request, options):
+        """Execute a prepared operation synchronously."""
+        try:
+            if (
+                request._graphql_operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute_sync(**options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            result = execute_sync(**options)
+            self.store_result(request, result)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        options, result = self.prepare_execution(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if options is None:
+            return result
+        return self.run_execution(request, options)
+
+
+class AsyncGraphQLView(GraphQLView):
+    """
+    GraphQL view for ASGI deployments that executes queries on the event loop.
+
+    Parsing, persisted queries, cost checks and the response cache are
+    shared with ``GraphQLView`` and run in one thread hop before execution.
+    Query resolvers then run through ``SyncResolverMiddleware``, so root
+    fields resolve concurrently and coroutine resolvers can use the async
+    ORM. Mutations keep their transaction by executing synchronously.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                # Rendering GraphiQL does not execute anything.
+                return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.get_response_async(request, entry) for entry in data]
+                result = "[{}]".format(",".join([response[0] for response in responses]))
+                status_code = (
+                    responses
+                    and max(responses, key=lambda response: response[1])[1]
+                    or 200
+                )
+            else:
+                result, status_code = await self.get_response_async(request, data)
+
+            response = HttpResponse(
+                status=status_code, content=result, content_type="application/json"
+            )
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(
+                request, {"errors": [self.format_error(e)]}
+            )
+        return self.add_cache_headers(request, response)
+
+    async def get_response_async(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = await self.execute_graphql_request_async(
+            request, data, query, variables, operation_name
+        )
+        return self.build_response(request, execution_result, id)
+
+    async def execute_graphql_request_async(self, request, data, query, variables, operation_name):
+        options, result = await sync_to_async(self.prepare_execution)(
+            request, data, query, variables, operation_name
+        )
+        if options is None:
+            return result
+        if request._graphql_operation != OperationType.QUERY:
+            return await sync_to_async(self.run_execution)(request, options)
+
+        middleware = options["middleware"] or []
+        if isinstance(middleware, MiddlewareManager):
+            middleware = middleware.middlewares
+        # Last in the list wraps every other middleware as well.
+        options["middleware"] = [*middleware, SyncResolverMiddleware()]
+        try:
+            result = execute(**options)
+            if isawaitable(result):
+                result = await result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+        await sync_to_async(self.store_result)(request, result)
+        return result
+
+
+@staff_member_required
+def websocket_metrics(request):
+    """Report this worker's WebSocket send queue metrics."""
+    return JsonResponse(send_queue_stats.info()._asdict())
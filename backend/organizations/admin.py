@@ -8,4 +8,11 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['name', 'slug', 'contact_email']
     readonly_fields = ['created_at', 'updated_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_project_counts()
+    
+    @admin.display(description='Project count', ordering='_project_count')
+    def project_count(self, obj):
+        return obj.project_count
 
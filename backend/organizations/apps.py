@@ -5,3 +5,5 @@ class OrganizationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'organizations'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,34 @@
+"""
+Request-scoped loaders for organization data.
+"""
+from django.db.models import Count, Q
+from config.dataloaders import DataLoader
+from projects.models import Project
+
+
+class OrganizationProjectCountLoader(DataLoader):
+    """Load (total, active) project counts for many organizations in one query."""
+
+    default = (0, 0)
+
+    def batch_load(self, keys):
+        rows = (
+            Project.objects.filter(organization_id__in=keys)
+            .order_by()
+            .values('organization_id')
+            .annotate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status='ACTIVE')),
+            )
+        )
+        return {row['organization_id']: (row['total'], row['active']) for row in rows}
+
+
+def load_project_counts(organization, context):
+    """Attach batched project counts to an organization unless it already has them."""
+    if organization._project_count is None or organization._active_project_count is None:
+        loader = OrganizationProjectCountLoader.for_context(context)
+        organization._project_count, organization._active_project_count = loader.load(
+            organization.pk
+        )
+    return organization
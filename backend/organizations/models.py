@@ -2,10 +2,22 @@
 Organization models.
 """
 from django.db import models
+from django.db.models import Count, Q
 from django.core.validators import EmailValidator
 from django.utils.text import slugify
 
 
+class OrganizationQuerySet(models.QuerySet):
+    """Organization queryset."""
+    
+    def with_project_counts(self):
+        """Annotate project counts so the count properties skip their queries."""
+        return self.annotate(
+            _project_count=Count('projects'),
+            _active_project_count=Count('projects', filter=Q(projects__status='ACTIVE')),
+        )
+
+
 class Organization(models.Model):
     """Organization model for multi-tenancy."""
     
@@ -14,11 +26,21 @@ class Organization(models.Model):
     contact_email = models.EmailField(validators=[EmailValidator()])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every update")
+    
+    objects = OrganizationQuerySet.as_manager()
+    
+    # Filled in by annotated querysets or request-scoped loaders so the
+    # count properties can skip their own COUNT(*) queries.
+    _project_count = None
+    _active_project_count = None
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Organization'
         verbose_name_plural = 'Organizations'
+        # Name suggestions use a pg_trgm index on UPPER(name), created by
+        # migration 0003 on PostgreSQL only (see config/typeahead.py).
     
     def __str__(self):
         return self.name
@@ -26,15 +48,21 @@ class Organization(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        if not self._state.adding:
+            self.version += 1
         super().save(*args, **kwargs)
     
     @property
     def project_count(self):
         """Get total number of projects."""
+        if self._project_count is not None:
+            return self._project_count
         return self.projects.count()
     
     @property
     def active_project_count(self):
         """Get number of active projects."""
+        if self._active_project_count is not None:
+            return self._active_project_count
         return self.projects.filter(status='ACTIVE').count()
 
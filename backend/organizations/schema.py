@@ -5,7 +5,14 @@ import graphene
 from graphene_django import DjangoObjectType
 from graphql import GraphQLError
 from django.utils.text import slugify
+from config.optimizer import optimize
+from config.pagination import keyset_connection
+from config.response_cache import invalidate
+from config.typeahead import DEFAULT_SUGGESTIONS, check_arguments, suggest
+from config.updates import update_or_raise
+from .loaders import load_project_counts
 from .models import Organization
+from projects.loaders import prime_projects
 
 
 class OrganizationType(DjangoObjectType):
@@ -14,33 +21,67 @@ class OrganizationType(DjangoObjectType):
     project_count = graphene.Int()
     active_project_count = graphene.Int()
     
+    # Model fields read by computed fields, for the queryset optimizer.
+    optimizer_hints = {
+        'project_count': [],
+        'active_project_count': [],
+    }
+    
     class Meta:
         model = Organization
         fields = '__all__'
     
+    def resolve_projects(self, info):
+        return prime_projects(self.projects.all(), info.context)
+    
     def resolve_project_count(self, info):
-        return self.project_count
+        return load_project_counts(self, info.context).project_count
     
     def resolve_active_project_count(self, info):
-        return self.active_project_count
+        return load_project_counts(self, info.context).active_project_count
+
+
+class OrganizationConnection(graphene.relay.Connection):
+    """Keyset-paginated organization connection."""
+    
+    class Meta:
+        node = OrganizationType
 
 
 class OrganizationQuery(graphene.ObjectType):
     """Organization queries."""
     
     organizations = graphene.List(OrganizationType)
+    organizations_connection = graphene.relay.ConnectionField(OrganizationConnection)
     organization = graphene.Field(OrganizationType, slug=graphene.String(required=True))
+    suggest_organizations = graphene.List(
+        OrganizationType,
+        query=graphene.String(required=True),
+        first=graphene.Int(default_value=DEFAULT_SUGGESTIONS)
+    )
     
     def resolve_organizations(self, info):
         """Get all organizations."""
-        return Organization.objects.all()
+        return optimize(Organization.objects.with_project_counts(), info)
+    
+    def resolve_organizations_connection(self, info, **kwargs):
+        """Get a page of organizations."""
+        return keyset_connection(
+            OrganizationConnection, Organization.objects.with_project_counts(), info, **kwargs
+        )
     
     def resolve_organization(self, info, slug):
         """Get a single organization by slug."""
         try:
-            return Organization.objects.get(slug=slug)
+            return optimize(Organization.objects.with_project_counts(), info).get(slug=slug)
         except Organization.DoesNotExist:
             raise GraphQLError(f"Organization with slug '{slug}' not found")
+    
+    def resolve_suggest_organizations(self, info, query, first=DEFAULT_SUGGESTIONS):
+        """Get the organizations whose names best match a prefix or fuzzy query."""
+        check_arguments(query, first)
+        
+        return optimize(suggest(Organization.objects.with_project_counts(), 'name', query), info)[:first]
 
 
 class CreateOrganization(graphene.Mutation):
@@ -88,23 +129,21 @@ class UpdateOrganization(graphene.Mutation):
         id = graphene.ID(required=True)
         name = graphene.String()
         contact_email = graphene.String()
+        expected_version = graphene.Int()
     
     organization = graphene.Field(OrganizationType)
     success = graphene.Boolean()
     message = graphene.String()
     
-    def mutate(self, info, id, name=None, contact_email=None):
-        try:
-            organization = Organization.objects.get(pk=id)
-        except Organization.DoesNotExist:
-            raise GraphQLError(f"Organization with id '{id}' not found")
-        
+    def mutate(self, info, id, name=None, contact_email=None, expected_version=None):
+        changes = {}
         if name:
-            organization.name = name
+            changes['name'] = name
         if contact_email:
-            organization.contact_email = contact_email
+            changes['contact_email'] = contact_email
         
-        organization.save()
+        organization = update_or_raise(Organization, id, changes, expected_version)
+        invalidate(organization_id=organization.pk, organization_record=True)
         
         return UpdateOrganization(
             organization=organization,
@@ -0,0 +1,17 @@
+"""
+Response cache invalidation for organization changes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from config.response_cache import forget_organization_slug, invalidate
+from .models import Organization
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_organization(sender, instance, **kwargs):
+    invalidate(organization_id=instance.pk, organization_record=True)
+
+
+@receiver(post_delete, sender=Organization)
+def forget_deleted_organization(sender, instance, **kwargs):
+    forget_organization_slug(instance.slug)
@@ -1,7 +1,13 @@
 """
 Tests for organizations app.
 """
-from django.test import TestCase
+from django.contrib.admin.sites import AdminSite
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from config.schema import schema
+from projects.models import Project
+from .admin import OrganizationAdmin
 from .models import Organization
 
 
@@ -28,3 +34,66 @@ class OrganizationModelTest(TestCase):
         """Test project count property."""
         self.assertEqual(self.org.project_count, 0)
 
+
+
+class OrganizationProjectCountTest(TestCase):
+    """Test annotated and batched organization project counts."""
+    
+    def setUp(self):
+        for index in range(3):
+            org = Organization.objects.create(
+                name=f"Organization {index}",
+                contact_email="test@example.com"
+            )
+            Project.objects.create(organization=org, name="Active Project", status="ACTIVE")
+            Project.objects.create(organization=org, name="Held Project", status="ON_HOLD")
+    
+    def test_organizations_query_is_annotated(self):
+        """Test that the organizations list resolves counts in one query."""
+        query = 'query { organizations { projectCount activeProjectCount } }'
+        with self.assertNumQueries(1):
+            result = schema.execute(query, context_value=RequestFactory().get('/'))
+        
+        self.assertIsNone(result.errors)
+        for org in result.data['organizations']:
+            self.assertEqual(org['projectCount'], 2)
+            self.assertEqual(org['activeProjectCount'], 1)
+    
+    def test_suggest_organizations(self):
+        """Test that suggested organizations match by name and keep annotated counts."""
+        query = 'query { suggestOrganizations(query: "organization", first: 2) { name projectCount } }'
+        with self.assertNumQueries(1):
+            result = schema.execute(query, context_value=RequestFactory().get('/'))
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data['suggestOrganizations'],
+            [{'name': "Organization 0", 'projectCount': 2}, {'name': "Organization 1", 'projectCount': 2}],
+        )
+    
+    def test_nested_organizations_are_batched(self):
+        """Test that organizations reached through projects share one count query."""
+        query = """
+            query {
+                projects(organizationSlug: "organization-0") {
+                    organization { projectCount activeProjectCount }
+                }
+            }
+        """
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, context_value=RequestFactory().get('/'))
+        
+        self.assertIsNone(result.errors)
+        count_queries = [q for q in queries.captured_queries if 'COUNT(' in q['sql']]
+        self.assertEqual(len(count_queries), 1)
+        for project in result.data['projects']:
+            self.assertEqual(project['organization']['projectCount'], 2)
+            self.assertEqual(project['organization']['activeProjectCount'], 1)
+    
+    def test_admin_queryset_is_annotated(self):
+        """Test that the admin changelist reads annotated counts."""
+        model_admin = OrganizationAdmin(Organization, AdminSite())
+        organizations = list(model_admin.get_queryset(RequestFactory().get('/')))
+        
+        with self.assertNumQueries(0):
+            self.assertEqual([model_admin.project_count(org) for org in organizations], [2, 2, 2])
@@ -7,6 +7,6 @@ class ProjectAdmin(admin.ModelAdmin):
     list_display = ['name', 'organization', 'status', 'due_date', 'task_count', 'completion_rate', 'created_at']
     list_filter = ['status', 'organization', 'created_at', 'due_date']
     search_fields = ['name', 'description', 'organization__name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'task_count', 'done_count']
     date_hierarchy = 'created_at'
 
@@ -0,0 +1,92 @@
+"""
+Single-query aggregates for project statistics.
+"""
+from datetime import timedelta
+from django.db.models import Count, Q
+from django.utils import timezone
+from organizations.models import Organization
+from tasks.models import Task
+
+
+# Open tasks are bucketed by how soon they are due; DONE tasks are excluded.
+DUE_SOON_DAYS = 7
+DUE_DATE_BUCKETS = ['OVERDUE', 'DUE_SOON', 'DUE_LATER', 'NO_DUE_DATE']
+
+
+def _due_date_filters(now):
+    open_tasks = ~Q(projects__tasks__status='DONE')
+    soon = now + timedelta(days=DUE_SOON_DAYS)
+    return {
+        'OVERDUE': open_tasks & Q(projects__tasks__due_date__lt=now),
+        'DUE_SOON': open_tasks & Q(
+            projects__tasks__due_date__gte=now,
+            projects__tasks__due_date__lt=soon,
+        ),
+        'DUE_LATER': open_tasks & Q(projects__tasks__due_date__gte=soon),
+        'NO_DUE_DATE': open_tasks & Q(projects__tasks__due_date__isnull=True),
+    }
+
+
+def project_stats(organization_slug, by_status=False, by_due_date=False):
+    """
+    Compute project and task statistics for an organization.
+
+    Everything is computed by one grouped query that joins the organization
+    to its projects and their tasks; the optional breakdowns only add
+    conditional aggregates to that query. Returns None if the organization
+    does not exist.
+    """
+    aggregates = {
+        'total_projects': Count('projects', distinct=True),
+        'active_projects': Count(
+            'projects', filter=Q(projects__status='ACTIVE'), distinct=True
+        ),
+        'completed_projects': Count(
+            'projects', filter=Q(projects__status='COMPLETED'), distinct=True
+        ),
+        'total_tasks': Count('projects__tasks'),
+        'completed_tasks': Count(
+            'projects__tasks', filter=Q(projects__tasks__status='DONE')
+        ),
+    }
+    if by_status:
+        for status, _ in Task.STATUS_CHOICES:
+            aggregates[f'status_{status}'] = Count(
+                'projects__tasks', filter=Q(projects__tasks__status=status)
+            )
+    if by_due_date:
+        for bucket, condition in _due_date_filters(timezone.now()).items():
+            aggregates[f'due_{bucket}'] = Count('projects__tasks', filter=condition)
+
+    row = (
+        Organization.objects.filter(slug=organization_slug)
+        .order_by()
+        .annotate(**aggregates)
+        .values(*aggregates)
+        .first()
+    )
+    if row is None:
+        return None
+
+    total_tasks = row['total_tasks']
+    stats = {
+        'total_projects': row['total_projects'],
+        'active_projects': row['active_projects'],
+        'completed_projects': row['completed_projects'],
+        'total_tasks': total_tasks,
+        'completed_tasks': row['completed_tasks'],
+        'overall_completion_rate': round(
+            (row['completed_tasks'] / total_tasks * 100) if total_tasks > 0 else 0, 2
+        ),
+    }
+    if by_status:
+        stats['tasks_by_status'] = [
+            {'status': status, 'count': row[f'status_{status}']}
+            for status, _ in Task.STATUS_CHOICES
+        ]
+    if by_due_date:
+        stats['tasks_by_due_date'] = [
+            {'bucket': bucket, 'count': row[f'due_{bucket}']}
+            for bucket in DUE_DATE_BUCKETS
+        ]
+    return stats
@@ -0,0 +1,14 @@
+"""
+Request-scoped loaders for project data.
+"""
+from organizations.loaders import OrganizationProjectCountLoader
+
+
+def prime_projects(projects, context):
+    """Register projects with the request's loaders and return them as a list."""
+    projects = list(projects)
+    if projects and 'organization_id' not in projects[0].get_deferred_fields():
+        OrganizationProjectCountLoader.for_context(context).prime(
+            project.organization_id for project in projects
+        )
+    return projects
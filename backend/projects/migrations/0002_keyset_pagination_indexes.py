@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["organization", "-created_at", "-id"],
+                name="projects_pr_organiz_bd8e1b_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:04
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+NAME_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(
+        django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+    ),
+    name="projects_project_name_trgm",
+)
+
+
+def create_index(apps, schema_editor):
+    # Trigram indexes need PostgreSQL; suggestions fall back to LIKE elsewhere.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('projects', 'Project'), NAME_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('projects', 'Project'), NAME_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0003_trigram_indexes"),
+        ("projects", "0003_project_version"),
+    ]
+
+    operations = [
+        # Kept out of the model state, which --nomigrations test databases
+        # are built from on SQLite.
+        migrations.RunPython(create_index, drop_index),
+    ]
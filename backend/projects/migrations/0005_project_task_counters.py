@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="done_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="task_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -3,6 +3,7 @@ Project models.
 """
 from django.db import models
 from django.core.validators import MinLengthValidator
+from config.updates import counted_save_fields
 from organizations.models import Organization
 
 
@@ -28,26 +29,38 @@ class Project(models.Model):
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every update")
+    # Maintained by tasks/counters.py.
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    done_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    COUNTER_FIELDS = ['task_count', 'done_count']
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['organization', 'status']),
+            # Keyset pagination over the default ordering.
+            models.Index(fields=['organization', '-created_at', '-id']),
             models.Index(fields=['due_date']),
+            # Name suggestions use a pg_trgm index on UPPER(name), created
+            # by migration 0004 on PostgreSQL only (see config/typeahead.py).
         ]
     
     def __str__(self):
         return f"{self.name} ({self.organization.name})"
     
-    @property
-    def task_count(self):
-        """Get total number of tasks."""
-        return self.tasks.count()
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is None:
+                kwargs['update_fields'] = counted_save_fields(self, self.COUNTER_FIELDS)
+        super().save(*args, **kwargs)
     
     @property
     def completed_task_count(self):
         """Get number of completed tasks."""
-        return self.tasks.filter(status='DONE').count()
+        return self.done_count
     
     @property
     def completion_rate(self):
@@ -5,6 +5,14 @@ import graphene
 from graphene_django import DjangoObjectType
 from graphql import GraphQLError
 from datetime import datetime
+from config.optimizer import optimize
+from config.pagination import keyset_connection
+from config.response_cache import invalidate
+from config.selection import selected_fields
+from config.typeahead import DEFAULT_SUGGESTIONS, check_arguments, suggest
+from config.updates import update_or_raise
+from .aggregates import project_stats
+from .loaders import prime_projects
 from .models import Project
 from organizations.models import Organization
 
@@ -17,23 +25,47 @@ class ProjectType(DjangoObjectType):
     completion_rate = graphene.Float()
     is_overdue = graphene.Boolean()
     
+    # Model fields read by computed fields, for the queryset optimizer.
+    optimizer_hints = {
+        'completed_task_count': ['done_count'],
+        'completion_rate': ['task_count', 'done_count'],
+        'is_overdue': ['due_date', 'status'],
+    }
+    
     class Meta:
         model = Project
-        fields = '__all__'
-    
-    def resolve_task_count(self, info):
-        return self.task_count
-    
-    def resolve_completed_task_count(self, info):
-        return self.completed_task_count
+        exclude = ['done_count']
     
-    def resolve_completion_rate(self, info):
-        return self.completion_rate
+    def resolve_tasks(self, info):
+        # A list, so the optimizer's prefetched tasks are not queried again.
+        return list(self.tasks.all())
     
     def resolve_is_overdue(self, info):
         return self.is_overdue
 
 
+class ProjectConnection(graphene.relay.Connection):
+    """Keyset-paginated project connection."""
+    
+    class Meta:
+        node = ProjectType
+
+
+def filter_projects(organization_slug, status=None):
+    """Build the project queryset shared by the list and connection fields."""
+    try:
+        organization = Organization.objects.get(slug=organization_slug)
+    except Organization.DoesNotExist:
+        raise GraphQLError(f"Organization with slug '{organization_slug}' not found")
+    
+    queryset = Project.objects.filter(organization=organization)
+    
+    if status:
+        queryset = queryset.filter(status=status)
+    
+    return queryset
+
+
 class ProjectQuery(graphene.ObjectType):
     """Project queries."""
     
@@ -42,56 +74,76 @@ class ProjectQuery(graphene.ObjectType):
         organization_slug=graphene.String(required=True),
         status=graphene.String()
     )
+    projects_connection = graphene.relay.ConnectionField(
+        ProjectConnection,
+        organization_slug=graphene.String(required=True),
+        status=graphene.String()
+    )
     project = graphene.Field(ProjectType, id=graphene.ID(required=True))
     project_stats = graphene.Field(
         'projects.schema.ProjectStatsType',
         organization_slug=graphene.String(required=True)
     )
+    suggest_projects = graphene.List(
+        ProjectType,
+        organization_slug=graphene.String(required=True),
+        query=graphene.String(required=True),
+        first=graphene.Int(default_value=DEFAULT_SUGGESTIONS)
+    )
     
     def resolve_projects(self, info, organization_slug, status=None):
         """Get projects for an organization."""
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
-            raise GraphQLError(f"Organization with slug '{organization_slug}' not found")
-        
-        queryset = Project.objects.filter(organization=organization)
+        queryset = filter_projects(organization_slug, status)
         
-        if status:
-            queryset = queryset.filter(status=status)
+        return prime_projects(optimize(queryset, info), info.context)
+    
+    def resolve_projects_connection(self, info, organization_slug, status=None, **kwargs):
+        """Get a page of projects for an organization."""
+        queryset = filter_projects(organization_slug, status)
         
-        return queryset
+        return keyset_connection(
+            ProjectConnection, queryset, info,
+            prepare=lambda projects: prime_projects(projects, info.context), **kwargs
+        )
     
     def resolve_project(self, info, id):
         """Get a single project."""
         try:
-            return Project.objects.get(pk=id)
+            return optimize(Project.objects.all(), info).get(pk=id)
         except Project.DoesNotExist:
             raise GraphQLError(f"Project with id '{id}' not found")
     
     def resolve_project_stats(self, info, organization_slug):
         """Get project statistics for an organization."""
-        try:
-            organization = Organization.objects.get(slug=organization_slug)
-        except Organization.DoesNotExist:
+        requested = selected_fields(info)
+        stats = project_stats(
+            organization_slug,
+            by_status='tasksByStatus' in requested,
+            by_due_date='tasksByDueDate' in requested,
+        )
+        if stats is None:
             raise GraphQLError(f"Organization with slug '{organization_slug}' not found")
         
-        projects = Project.objects.filter(organization=organization)
-        total_projects = projects.count()
-        active_projects = projects.filter(status='ACTIVE').count()
-        completed_projects = projects.filter(status='COMPLETED').count()
-        
-        total_tasks = sum(p.task_count for p in projects)
-        completed_tasks = sum(p.completed_task_count for p in projects)
+        return ProjectStatsType(**stats)
+    
+    def resolve_suggest_projects(self, info, organization_slug, query, first=DEFAULT_SUGGESTIONS):
+        """Get the projects of an organization whose names best match a prefix or fuzzy query."""
+        check_arguments(query, first)
+        queryset = suggest(filter_projects(organization_slug), 'name', query)
         
-        return ProjectStatsType(
-            total_projects=total_projects,
-            active_projects=active_projects,
-            completed_projects=completed_projects,
-            total_tasks=total_tasks,
-            completed_tasks=completed_tasks,
-            overall_completion_rate=round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2)
-        )
+        return prime_projects(optimize(queryset, info)[:first], info.context)
+
+
+class StatusCountType(graphene.ObjectType):
+    """Number of tasks in a status."""
+    status = graphene.String()
+    count = graphene.Int()
+
+
+class DueDateBucketType(graphene.ObjectType):
+    """Number of open tasks in a due-date bucket."""
+    bucket = graphene.String()
+    count = graphene.Int()
 
 
 class ProjectStatsType(graphene.ObjectType):
@@ -102,6 +154,8 @@ class ProjectStatsType(graphene.ObjectType):
     total_tasks = graphene.Int()
     completed_tasks = graphene.Int()
     overall_completion_rate = graphene.Float()
+    tasks_by_status = graphene.List(StatusCountType)
+    tasks_by_due_date = graphene.List(DueDateBucketType)
 
 
 class CreateProject(graphene.Mutation):
@@ -151,29 +205,27 @@ class UpdateProject(graphene.Mutation):
         description = graphene.String()
         status = graphene.String()
         due_date = graphene.Date()
+        expected_version = graphene.Int()
     
     project = graphene.Field(ProjectType)
     success = graphene.Boolean()
     message = graphene.String()
     
-    def mutate(self, info, id, name=None, description=None, status=None, due_date=None):
-        try:
-            project = Project.objects.get(pk=id)
-        except Project.DoesNotExist:
-            raise GraphQLError(f"Project with id '{id}' not found")
-        
+    def mutate(self, info, id, name=None, description=None, status=None, due_date=None, expected_version=None):
+        changes = {}
         if name:
-            project.name = name
+            changes['name'] = name
         if description is not None:
-            project.description = description
+            changes['description'] = description
         if status:
             if status not in dict(Project.STATUS_CHOICES):
                 raise GraphQLError(f"Invalid status. Must be one of: {', '.join(dict(Project.STATUS_CHOICES).keys())}")
-            project.status = status
+            changes['status'] = status
         if due_date is not None:
-            project.due_date = due_date
+            changes['due_date'] = due_date
         
-        project.save()
+        project = update_or_raise(Project, id, changes, expected_version)
+        invalidate(organization_id=project.organization_id, project_id=project.pk)
         
         return UpdateProject(
             project=project,
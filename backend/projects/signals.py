@@ -0,0 +1,12 @@
+"""
+Response cache invalidation for project changes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from config.response_cache import invalidate
+from .models import Project
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project(sender, instance, **kwargs):
+    invalidate(organization_id=instance.organization_id, project_id=instance.pk)
@@ -1,8 +1,12 @@
 """
 Tests for projects app.
 """
-from django.test import TestCase
+from datetime import timedelta
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from config.schema import schema
 from organizations.models import Organization
+from tasks.models import Task
 from .models import Project
 
 
@@ -34,4 +38,182 @@ class ProjectModelTest(TestCase):
     def test_completion_rate(self):
         """Test completion rate calculation."""
         self.assertEqual(self.project.completion_rate, 0)
+    
+    def test_update_mutation_writes_changed_fields(self):
+        """Test that updateProject issues a single UPDATE ... RETURNING."""
+        query = f'''
+            mutation {{
+                updateProject(id: "{self.project.pk}", status: "ON_HOLD") {{
+                    project {{ name description status version }}
+                }}
+            }}
+        '''
+        with self.assertNumQueries(1):
+            result = schema.execute(query, context_value=RequestFactory().post('/'))
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['updateProject']['project'], {
+            'name': "Test Project",
+            'description': "Test Description",
+            'status': "ON_HOLD",
+            'version': 2,
+        })
+
+
+
+class ProjectTaskCounterTest(TestCase):
+    """Test stored task counts on the projects query."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        for index in range(3):
+            project = Project.objects.create(
+                organization=self.org,
+                name=f"Project {index}",
+                status="ACTIVE"
+            )
+            Task.objects.create(project=project, title="Open task", status="TODO")
+            Task.objects.create(project=project, title="Done task", status="DONE")
+    
+    def test_counts_are_read_with_the_projects(self):
+        """Test that counts are read from the project rows."""
+        query = '''
+            query {
+                projects(organizationSlug: "test-organization") {
+                    taskCount
+                    completedTaskCount
+                    completionRate
+                }
+            }
+        '''
+        # Organization lookup, projects.
+        with self.assertNumQueries(2):
+            result = schema.execute(query, context_value=RequestFactory().get('/'))
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(result.data['projects']), 3)
+        for project in result.data['projects']:
+            self.assertEqual(project['taskCount'], 2)
+            self.assertEqual(project['completedTaskCount'], 1)
+            self.assertEqual(project['completionRate'], 50.0)
+    
+    def test_properties_read_stored_counts(self):
+        """Test that model properties never count tasks."""
+        project = Project.objects.first()
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(project.task_count, 2)
+            self.assertEqual(project.completed_task_count, 1)
+            self.assertEqual(project.completion_rate, 50.0)
+    
+    def test_save_keeps_concurrent_increments(self):
+        """Test that saving a stale project instance does not overwrite its counters."""
+        project = Project.objects.first()
+        Task.objects.create(project=project, title="Added meanwhile", status="DONE")
+        
+        project.name = "Renamed"
+        project.save()
+        
+        project.refresh_from_db()
+        self.assertEqual((project.name, project.task_count, project.done_count), ("Renamed", 3, 2))
+
+
+class ProjectStatsTest(TestCase):
+    """Test the projectStats aggregate query."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        active = Project.objects.create(organization=self.org, name="Active Project", status="ACTIVE")
+        completed = Project.objects.create(organization=self.org, name="Completed Project", status="COMPLETED")
+        Project.objects.create(organization=self.org, name="Empty Project", status="ON_HOLD")
+        now = timezone.now()
+        Task.objects.create(project=active, title="Overdue task", status="TODO", due_date=now - timedelta(days=1))
+        Task.objects.create(project=active, title="Soon task", status="IN_PROGRESS", due_date=now + timedelta(days=2))
+        Task.objects.create(project=completed, title="Done task", status="DONE", due_date=now - timedelta(days=1))
+        Task.objects.create(project=completed, title="Undated task", status="BLOCKED")
+    
+    def test_stats_in_one_query(self):
+        """Test that stats and breakdowns come from a single query."""
+        query = '''
+            query {
+                projectStats(organizationSlug: "test-organization") {
+                    totalProjects
+                    activeProjects
+                    completedProjects
+                    totalTasks
+                    completedTasks
+                    overallCompletionRate
+                    tasksByStatus { status count }
+                    tasksByDueDate { bucket count }
+                }
+            }
+        '''
+        with self.assertNumQueries(1):
+            result = schema.execute(query, context_value=RequestFactory().get('/'))
+        
+        self.assertIsNone(result.errors)
+        stats = result.data['projectStats']
+        self.assertEqual(stats['totalProjects'], 3)
+        self.assertEqual(stats['activeProjects'], 1)
+        self.assertEqual(stats['completedProjects'], 1)
+        self.assertEqual(stats['totalTasks'], 4)
+        self.assertEqual(stats['completedTasks'], 1)
+        self.assertEqual(stats['overallCompletionRate'], 25.0)
+        self.assertEqual(
+            {row['status']: row['count'] for row in stats['tasksByStatus']},
+            {'TODO': 1, 'IN_PROGRESS': 1, 'DONE': 1, 'BLOCKED': 1}
+        )
+        self.assertEqual(
+            {row['bucket']: row['count'] for row in stats['tasksByDueDate']},
+            {'OVERDUE': 1, 'DUE_SOON': 1, 'DUE_LATER': 0, 'NO_DUE_DATE': 1}
+        )
+    
+    def test_unknown_organization(self):
+        """Test that an unknown organization is reported as an error."""
+        result = schema.execute(
+            'query { projectStats(organizationSlug: "missing") { totalProjects } }',
+            context_value=RequestFactory().get('/')
+        )
+        self.assertIsNotNone(result.errors)
+
 
+class SuggestProjectsTest(TestCase):
+    """Test project name suggestions (substring fallback outside PostgreSQL)."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        for name in ["Website redesign", "Mobile app", "Web API", "Internal webhooks"]:
+            Project.objects.create(organization=self.org, name=name, status="ACTIVE")
+        other_org = Organization.objects.create(name="Other", contact_email="other@example.com")
+        Project.objects.create(organization=other_org, name="Web portal", status="ACTIVE")
+    
+    def suggest(self, query, first=10):
+        return schema.execute(
+            f'query {{ suggestProjects(organizationSlug: "{self.org.slug}", query: "{query}", first: {first}) {{ name }} }}',
+            context_value=RequestFactory().get('/'),
+        )
+    
+    def test_prefix_matches_first(self):
+        """Test that prefix matches rank above other matches, shortest first."""
+        result = self.suggest("web")
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            [project['name'] for project in result.data['suggestProjects']],
+            ["Web API", "Website redesign", "Internal webhooks"],
+        )
+        self.assertEqual(len(self.suggest("web", first=1).data['suggestProjects']), 1)
+    
+    def test_invalid_arguments(self):
+        """Test that empty queries and out-of-range limits are rejected."""
+        self.assertEqual(self.suggest(" ").errors[0].message, "Search query must not be empty")
+        self.assertEqual(self.suggest("web", first=0).errors[0].message, "Argument 'first' must be between 1 and 50")
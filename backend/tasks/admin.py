@@ -1,20 +1,61 @@
 from django.contrib import admin
+from django.db.models import Q
 from .models import Task, TaskComment
+from .search import has_full_text, search_comments, search_query
+
+
+class FullTextSearchMixin:
+    """
+    Admin search matching ``full_text_fields`` through the full-text index on
+    PostgreSQL, or-ed with the usual lookups on the other ``search_fields``.
+    """
+    
+    full_text_fields = []
+    
+    def full_text_search(self, queryset, search_term):
+        raise NotImplementedError
+    
+    def get_search_fields(self, request):
+        search_fields = super().get_search_fields(request)
+        if getattr(request, '_full_text_search', False):
+            return [field for field in search_fields if field not in self.full_text_fields]
+        return search_fields
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not has_full_text(self.model):
+            return super().get_search_results(request, queryset, search_term)
+        matches = Q(pk__in=self.full_text_search(queryset, search_term).values('pk'))
+        request._full_text_search = True
+        try:
+            if self.get_search_fields(request):
+                others, _ = super().get_search_results(request, queryset, search_term)
+                matches |= Q(pk__in=others.values('pk'))
+        finally:
+            del request._full_text_search
+        return queryset.filter(matches), False
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'project', 'status', 'assignee_email', 'due_date', 'comment_count', 'created_at']
     list_filter = ['status', 'project', 'created_at', 'due_date']
     search_fields = ['title', 'description', 'assignee_email', 'project__name']
-    readonly_fields = ['created_at', 'updated_at']
+    full_text_fields = ['title', 'description']
+    readonly_fields = ['created_at', 'updated_at', 'comment_count']
     date_hierarchy = 'created_at'
+    
+    def full_text_search(self, queryset, search_term):
+        # Comment text is part of the task's search vector too.
+        return queryset.filter(search_vector=search_query(search_term))
 
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['task', 'author_email', 'created_at']
     list_filter = ['created_at']
     search_fields = ['content', 'author_email', 'task__title']
+    full_text_fields = ['content']
     readonly_fields = ['created_at', 'updated_at']
-
+    
+    def full_text_search(self, queryset, search_term):
+        return search_comments(queryset, search_term)
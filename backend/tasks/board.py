@@ -0,0 +1,50 @@
+"""
+Kanban board queries.
+
+The board shows one column per ``Task.STATUS_CHOICES`` entry. Each column's
+first tasks and its total count come from a single windowed query over the
+``(project, status)`` index instead of loading every task of the project.
+"""
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from config.pagination import keyset_ordering
+from .models import Task
+
+
+def column_ordering():
+    """Get the board order within a column as ORDER BY expressions."""
+    return [
+        F(field[1:]).desc() if field.startswith('-') else F(field).asc()
+        for field in keyset_ordering(Task)
+    ]
+
+
+def board_queryset(project_id, per_column_limit):
+    """
+    Get the first ``per_column_limit`` tasks of every status column.
+
+    Rows are annotated with ``_column_count``, the total number of tasks in
+    their column.
+    """
+    partition = [F('status')]
+    return (
+        Task.objects.filter(project_id=project_id)
+        .with_overdue()
+        .annotate(
+            _row_number=Window(RowNumber(), partition_by=partition, order_by=column_ordering()),
+            _column_count=Window(Count('id'), partition_by=partition),
+        )
+        .filter(_row_number__lte=per_column_limit)
+        .order_by('status', '_row_number')
+    )
+
+
+def column_counts(project_id):
+    """Count the tasks of every status column, for boards without task rows."""
+    return dict(
+        Task.objects.filter(project_id=project_id)
+        .order_by()
+        .values('status')
+        .annotate(total=Count('id'))
+        .values_list('status', 'total')
+    )
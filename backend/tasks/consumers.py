@@ -2,17 +2,75 @@
 WebSocket consumers for real-time task updates.
 """
 import json
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import Task
+from django.conf import settings
+from config.encoding import dumps
+from config.send_queue import SendQueue, send_queue_stats
+from organizations.models import Organization
+from projects.models import Project
+from .events import merge_task_updates, project_group, task_stream, task_update_message
 
 
-class TaskConsumer(AsyncWebsocketConsumer):
-    """WebSocket consumer for task updates."""
+class QueuedSendMixin:
+    """
+    Send frames through a bounded per-connection ``SendQueue`` that merges
+    pending ``task_update`` frames by task id.
+    
+    A client that stays behind for longer than the queue's timeout is
+    disconnected with code 1013 (try again later) and can reconnect with
+    ``resume_from``.
+    """
+    
+    send_queue = None
+    
+    def start_send_queue(self):
+        self.send_queue = SendQueue(
+            self.send_frame,
+            merge_task_updates,
+            send_queue_stats,
+            maxsize=getattr(settings, 'WEBSOCKET_SEND_QUEUE_SIZE', 500),
+            timeout=getattr(settings, 'WEBSOCKET_SEND_QUEUE_TIMEOUT', 5),
+            on_overflow=self.send_queue_overflow,
+        )
+        self.send_queue.start()
+    
+    async def stop_send_queue(self):
+        if self.send_queue is not None:
+            await self.send_queue.stop()
+    
+    async def send_frame(self, text):
+        await self.send(text_data=text)
+    
+    async def send_queue_overflow(self):
+        await self.close(code=1013)
+    
+    async def queue_task_update(self, event):
+        """Queue a ``task_update`` group message; server-originated ones are mergeable."""
+        text = event.get('text')
+        if text is None:
+            # Messages without a preserialized frame, e.g. from older workers
+            text = dumps({'type': 'task_update', 'data': event['message']})
+        await self.send_queue.put(text, event.get('size', 1), mergeable=event.get('seq') is not None)
+
+
+class TaskConsumer(QueuedSendMixin, AsyncWebsocketConsumer):
+    """
+    WebSocket consumer for task updates.
+    
+    Server-originated updates carry a ``seq`` number that increases along the
+    project's stream. Clients reconnecting with ``?resume_from=<seq>`` are
+    sent the updates they missed, or a ``resync_required`` message when the
+    replay buffer no longer covers the gap. Outgoing frames go through a
+    bounded queue (see ``QueuedSendMixin``).
+    """
     
     async def connect(self):
         self.project_id = self.scope['url_route']['kwargs']['project_id']
         self.room_group_name = f'tasks_{self.project_id}'
+        self.replayed_until = None
         
         # Join room group
         await self.channel_layer.group_add(
@@ -21,8 +79,32 @@ class TaskConsumer(AsyncWebsocketConsumer):
         )
         
         await self.accept()
+        self.start_send_queue()
+        
+        # Replay after joining the group so nothing is lost in between;
+        # live updates already replayed are skipped in task_update().
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        if 'resume_from' in query:
+            await self.resume(query['resume_from'][-1])
+    
+    async def resume(self, resume_from):
+        try:
+            sequence = int(resume_from)
+        except ValueError:
+            texts, current = None, await sync_to_async(task_stream.current_sequence)(self.project_id)
+        else:
+            texts, current = await sync_to_async(task_stream.since)(self.project_id, sequence)
+        
+        if texts is None:
+            await self.send_queue.put(dumps({'type': 'resync_required', 'seq': current}))
+        else:
+            for text in texts:
+                await self.send_queue.put(text, mergeable=True)
+        self.replayed_until = current
     
     async def disconnect(self, close_code):
+        await self.stop_send_queue()
+        
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -35,22 +117,97 @@ class TaskConsumer(AsyncWebsocketConsumer):
         message_type = text_data_json.get('type')
         
         if message_type == 'task_update':
-            # Broadcast to room group
+            # Broadcast to room group, encoded once for every member
             await self.channel_layer.group_send(
                 self.room_group_name,
-                {
-                    'type': 'task_update',
-                    'message': text_data_json
-                }
+                task_update_message(text_data_json)
             )
     
     # Receive message from room group
     async def task_update(self, event):
-        message = event['message']
+        sequence = event.get('seq')
+        if sequence is not None and self.replayed_until is not None and sequence <= self.replayed_until:
+            return
         
         # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'task_update',
-            'data': message
-        }))
+        await self.queue_task_update(event)
+
 
+class OrganizationTaskConsumer(QueuedSendMixin, AsyncWebsocketConsumer):
+    """
+    WebSocket consumer multiplexing task updates for many projects of one
+    organization.
+    
+    Clients watch projects with control messages instead of opening a socket
+    per project::
+    
+        {"type": "subscribe", "projectIds": ["1", "2"]}
+        {"type": "unsubscribe", "projectIds": ["2"]}
+    
+    The connection joins the project group of each watched project, the same
+    groups ``TaskConsumer`` joins, so it only receives the updates it
+    forwards and one socket serves any number of projects. Frames go through
+    a bounded queue (see ``QueuedSendMixin``).
+    """
+    
+    async def connect(self):
+        self.project_ids = set()
+        slug = self.scope['url_route']['kwargs']['organization_slug']
+        self.organization_id = await database_sync_to_async(
+            lambda: Organization.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        )()
+        if self.organization_id is None:
+            await self.close(code=4404)
+            return
+        
+        await self.accept()
+        self.start_send_queue()
+    
+    async def disconnect(self, close_code):
+        await self.stop_send_queue()
+        for pk in getattr(self, 'project_ids', ()):
+            await self.channel_layer.group_discard(project_group(pk), self.channel_name)
+    
+    async def receive(self, text_data):
+        try:
+            message = json.loads(text_data)
+            message_type = message.get('type')
+            project_ids = [str(pk) for pk in message.get('projectIds') or ()]
+        except (AttributeError, TypeError, ValueError):
+            await self.send_error("Invalid message")
+            return
+        
+        if message_type == 'subscribe':
+            found = await database_sync_to_async(self.find_projects)(project_ids)
+            for pk in project_ids:
+                if pk not in found:
+                    await self.send_error(f"Project with id '{pk}' not found", projectId=pk)
+            for pk in found - self.project_ids:
+                await self.channel_layer.group_add(project_group(pk), self.channel_name)
+            self.project_ids.update(found)
+            await self.send_queue.put(dumps({'type': 'subscribed', 'projectIds': sorted(found, key=int)}))
+        elif message_type == 'unsubscribe':
+            for pk in self.project_ids.intersection(project_ids):
+                await self.channel_layer.group_discard(project_group(pk), self.channel_name)
+            self.project_ids.difference_update(project_ids)
+            await self.send_queue.put(dumps({'type': 'unsubscribed', 'projectIds': project_ids}))
+        else:
+            await self.send_error(f"Unknown message type '{message_type}'")
+    
+    def find_projects(self, project_ids):
+        """Get the ids, among ``project_ids``, of this organization's projects."""
+        pks = [pk for pk in project_ids if pk.isdigit()]
+        return {
+            str(pk) for pk in Project.objects.filter(
+                organization_id=self.organization_id, pk__in=pks
+            ).values_list('pk', flat=True)
+        }
+    
+    async def send_error(self, message, **extra):
+        await self.send_queue.put(dumps({'type': 'error', 'message': message, **extra}))
+    
+    # Receive message from a watched project's group; updates already in
+    # flight when the project was unwatched are dropped.
+    async def task_update(self, event):
+        if event.get('project_id') in self.project_ids:
+            await self.queue_task_update(event)
@@ -0,0 +1,124 @@
+"""
+Denormalized task and comment counters.
+
+``Project.task_count``, ``Project.done_count`` and ``Task.comment_count`` are
+stored columns, so reads never count rows. They are only ever written with
+``F()`` increments issued in the same transaction as the change they count:
+
+- ``Task.save()`` and ``TaskComment.save()`` count creations and status or
+  parent changes;
+- ``post_delete`` receivers count deletions, except cascades from a deleted
+  parent, whose counters are deleted with it;
+- paths that bypass model methods (``bulk_create``, ``bulk_update`` and
+  ``update_returning``) call ``adjust_project_counts`` themselves.
+
+``python manage.py reconcile_counters`` recounts and repairs any drift.
+"""
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_changes(before=(), after=()):
+    """
+    Get the ``{project_id: (tasks, done)}`` deltas between two collections of
+    ``(project_id, status)`` pairs: tasks as they were, and as they are now.
+    """
+    tasks = Counter()
+    done = Counter()
+    for sign, rows in ((-1, before), (1, after)):
+        for project_id, status in rows:
+            tasks[project_id] += sign
+            done[project_id] += sign * (status == 'DONE')
+    return {
+        project_id: (tasks[project_id], done[project_id])
+        for project_id in tasks.keys() | done.keys()
+        if tasks[project_id] or done[project_id]
+    }
+
+
+def adjust_project_counts(deltas):
+    """Apply ``{project_id: (tasks, done)}`` deltas to the project counters."""
+    from projects.models import Project
+
+    for project_id, (tasks, done) in sorted(deltas.items()):
+        Project.objects.filter(pk=project_id).update(
+            task_count=F('task_count') + tasks,
+            done_count=F('done_count') + done,
+        )
+
+
+def adjust_comment_count(task_id, delta):
+    from .models import Task
+
+    Task.objects.filter(pk=task_id).update(comment_count=F('comment_count') + delta)
+
+
+def _repair(queryset, counters, project_field, batch_size):
+    """
+    Recount ``counters`` (``{field: subquery}``) for a queryset in primary key
+    batches and rewrite the rows that drifted, invalidating the cached
+    responses of their projects (``project_field`` of each row). Returns the
+    number repaired.
+    """
+    from config.response_cache import invalidate_project
+
+    annotations = {f'_actual_{name}': Coalesce(subquery, Value(0)) for name, subquery in counters.items()}
+    drifted = Q()
+    for name in counters:
+        drifted |= ~Q(**{name: F(f'_actual_{name}')})
+
+    repaired = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # Lock the batch before counting: increments committed after the
+            # count wait for the lock and apply on top of the repaired value.
+            pks = list(
+                queryset.select_for_update().filter(pk__gt=last_pk)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                return repaired
+            last_pk = pks[-1]
+            rows = queryset.filter(pk__in=pks).annotate(**annotations).filter(drifted)
+            project_ids = set()
+            for row in list(rows.values('pk', project_field, *annotations)):
+                queryset.filter(pk=row['pk']).update(
+                    **{name: row[f'_actual_{name}'] for name in counters}
+                )
+                project_ids.add(row[project_field])
+                repaired += 1
+            for project_id in sorted(project_ids):
+                invalidate_project(project_id)
+
+
+def _count(queryset, outer_field):
+    return Subquery(
+        queryset.filter(**{outer_field: OuterRef('pk')})
+        .order_by()
+        .values(outer_field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+
+
+def reconcile_project_counts(batch_size=1000):
+    """Repair drifted project task counters. Returns the number of projects fixed."""
+    from projects.models import Project
+    from .models import Task
+
+    return _repair(Project.objects.all(), {
+        'task_count': _count(Task.objects.all(), 'project'),
+        'done_count': _count(Task.objects.filter(status='DONE'), 'project'),
+    }, 'pk', batch_size)
+
+
+def reconcile_comment_counts(batch_size=1000):
+    """Repair drifted task comment counters. Returns the number of tasks fixed."""
+    from .models import Task, TaskComment
+
+    return _repair(Task.objects.all(), {
+        'comment_count': _count(TaskComment.objects.all(), 'task'),
+    }, 'project_id', batch_size)
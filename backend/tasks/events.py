@@ -0,0 +1,166 @@
+"""
+Change events for task subscriptions and board broadcasts.
+
+Every task write publishes its changes after commit, both as ``taskChanged``
+subscription events and as coalesced ``task_update`` messages to the
+``tasks_{project_id}`` groups, joined by ``TaskConsumer`` and, for each
+watched project, by ``OrganizationTaskConsumer``.
+"""
+from django.db import transaction
+from config.broadcast import Coalescer, group_send
+from config.encoding import dumps
+from config.streams import ReplayBuffer
+from config.subscriptions import publish, register_subscription
+from projects.models import Project
+from .models import Task
+
+
+TASK_CREATED = 'CREATED'
+TASK_UPDATED = 'UPDATED'
+TASK_DELETED = 'DELETED'
+# Every task of a project was re-ranked; clients refetch the board.
+TASKS_REBALANCED = 'REBALANCED'
+
+
+def project_group(project_id):
+    """Get the group ``TaskConsumer`` and watching ``OrganizationTaskConsumer`` join for a project."""
+    return f'tasks_{project_id}'
+
+
+# Replay buffers of the task_update frames broadcast for each project.
+task_stream = ReplayBuffer('tasks')
+
+
+def task_update_message(message, project_id=None, sequence=None):
+    """
+    Build the group message for a ``task_update``.
+
+    The frame sent to clients is encoded here, once per broadcast, instead of
+    by every consumer in the group. ``project_id`` lets organization-wide
+    consumers drop updates still in flight after they stop watching a
+    project, and ``sequence`` is the frame's position in the project's stream.
+    """
+    return {
+        'type': 'task_update',
+        'project_id': str(project_id) if project_id is not None else None,
+        'seq': sequence,
+        'size': len(message.get('changes') or ()) or 1,
+        'text': dumps({'type': 'task_update', 'data': message}),
+    }
+
+
+def task_changed_group(project_id):
+    return f'subscription_task_changed_{project_id}'
+
+
+def comment_added_group(task_id):
+    return f'subscription_comment_added_{task_id}'
+
+
+register_subscription('taskChanged', 'project_id', Project, task_changed_group)
+register_subscription('commentAdded', 'task_id', Task, comment_added_group)
+
+
+def serialize_task(task):
+    """Get the fields of a task sent in broadcasts, named as in the GraphQL API."""
+    return {
+        'id': str(task.pk),
+        'projectId': str(task.project_id),
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'assigneeEmail': task.assignee_email,
+        'dueDate': task.due_date.isoformat() if task.due_date else None,
+        'rank': task.rank,
+        'version': task.version,
+        'updatedAt': task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+def merge_changes(previous, change):
+    """Merge two changes to one task, keeping the latest state."""
+    if previous['action'] == TASK_CREATED and change['action'] == TASK_UPDATED:
+        return {**change, 'action': TASK_CREATED}
+    return change
+
+
+def merge_task_updates(previous, frame):
+    """
+    Merge two decoded ``task_update`` frames of one project into the latest
+    state of each task, or return None if they cannot be merged.
+
+    Returns ``(frame, size)`` with the number of changes in the merged frame.
+    """
+    old, new = previous.get('data') or {}, frame.get('data') or {}
+    if 'changes' not in old or 'changes' not in new or old.get('projectId') != new.get('projectId'):
+        return None
+    changes = {change['task']['id']: change for change in old['changes']}
+    for change in new['changes']:
+        task_id = change['task']['id']
+        previous_change = changes.pop(task_id, None)
+        changes[task_id] = change if previous_change is None else merge_changes(previous_change, change)
+    return {**frame, 'data': {**new, 'changes': list(changes.values())}}, len(changes)
+
+
+def send_to_stream(project_id, frame_type, **fields):
+    """Number a server-originated frame in its project's stream, store it for replay and send it."""
+    sequence = task_stream.next_sequence(project_id)
+    message = task_update_message(
+        {'type': frame_type, 'projectId': str(project_id), 'seq': sequence, **fields},
+        project_id,
+        sequence,
+    )
+    task_stream.store(project_id, sequence, message['text'])
+    group_send(project_group(project_id), message)
+
+
+def send_task_update(project_id, changes):
+    send_to_stream(project_id, 'task_update', changes=changes)
+
+
+broadcaster = Coalescer(send_task_update, merge_changes)
+
+
+def publish_task_changes(project_id, tasks, action):
+    """
+    Publish changes to tasks of one project after commit: one message carrying
+    a ``taskChanged`` event per task and one coalesced ``task_update``
+    broadcast.
+    """
+    events = []
+    changes = []
+    for task in tasks:
+        events.append({'action': action, 'task_id': task.pk})
+        if action == TASK_DELETED:
+            changes.append({'action': action, 'task': {'id': str(task.pk)}})
+        else:
+            changes.append({'action': action, 'task': serialize_task(task)})
+    if not events:
+        return
+    publish(task_changed_group(project_id), *events)
+
+    def broadcast():
+        for change in changes:
+            broadcaster.add(project_id, change['task']['id'], change)
+
+    transaction.on_commit(broadcast)
+
+
+def publish_ranks_rebalanced(project_id):
+    """
+    Tell a project's clients after commit that all of its ranks changed: a
+    ``taskChanged`` event without a task and a ``resync_required`` frame in
+    the project's stream.
+    """
+    publish(task_changed_group(project_id), {'action': TASKS_REBALANCED, 'task_id': None})
+    def broadcast():
+        # Changes still being coalesced go out before the resync.
+        broadcaster.flush(project_id)
+        send_to_stream(project_id, 'resync_required', reason='ranks_rebalanced')
+
+    transaction.on_commit(broadcast)
+
+
+def publish_comment_added(comment):
+    """Publish a ``commentAdded`` event after commit."""
+    publish(comment_added_group(comment.task_id), {'comment_id': comment.pk})
@@ -0,0 +1,16 @@
+"""
+Delete deletion tombstones older than the delta sync retention period.
+"""
+from django.core.management.base import BaseCommand
+from tasks.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete deletion tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, batch_size, **options):
+        deleted = prune_tombstones(batch_size)
+        self.stdout.write(f'Deleted {deleted} tombstones')
@@ -0,0 +1,17 @@
+"""
+Recount the denormalized task and comment counters and repair any drift.
+"""
+from django.core.management.base import BaseCommand
+from tasks.counters import reconcile_comment_counts, reconcile_project_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount Project.task_count/done_count and Task.comment_count, fixing rows that drifted.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, batch_size, **options):
+        projects = reconcile_project_counts(batch_size)
+        tasks = reconcile_comment_counts(batch_size)
+        self.stdout.write(f'Repaired {projects} projects and {tasks} tasks')
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "order", "-created_at", "-id"],
+                name="tasks_task_project_50506f_idx",
+            ),
+        ),
+    ]
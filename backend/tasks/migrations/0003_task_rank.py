@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+def backfill_ranks(apps, schema_editor):
+    """Rank existing tasks in their previous order within each project."""
+    from tasks.ranking import ranks_after
+
+    Task = apps.get_model("tasks", "Task")
+    project_ids = Task.objects.values_list("project_id", flat=True).distinct()
+    for project_id in project_ids:
+        tasks = list(
+            Task.objects.filter(project_id=project_id).order_by("order", "-created_at", "id")
+        )
+        for task, rank in zip(tasks, ranks_after(None, len(tasks))):
+            task.rank = rank
+        Task.objects.bulk_update(tasks, ["rank"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="task",
+            options={"ordering": ["rank", "-created_at"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="task",
+            name="tasks_task_project_50506f_idx",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="rank",
+            field=models.CharField(
+                blank=True,
+                help_text="Lexicographic position within the project (see tasks/ranking.py)",
+                max_length=64,
+            ),
+        ),
+        migrations.RunPython(backfill_ranks, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="task",
+            name="order",
+            field=models.IntegerField(
+                default=0, help_text="Legacy manual order, superseded by rank"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["project", "rank", "-created_at", "-id"],
+                name="tasks_task_project_04cf28_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_rank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Incremented on every update"
+            ),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["search_vector"], name="tasks_task_search_gin"
+)
+
+# The task document: title (weight A), description (B) and comment text (C).
+CREATE_TRIGGERS = """
+CREATE FUNCTION tasks_task_document(task_id bigint, title text, description text)
+RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(
+            (SELECT string_agg(content, ' ') FROM tasks_taskcomment WHERE tasks_taskcomment.task_id = $1), ''
+        )), 'C')
+$$;
+
+CREATE FUNCTION tasks_task_search_vector_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := tasks_task_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER tasks_task_search_vector
+BEFORE INSERT OR UPDATE OF title, description ON tasks_task
+FOR EACH ROW EXECUTE FUNCTION tasks_task_search_vector_update();
+
+CREATE FUNCTION tasks_taskcomment_search_vector_update() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE tasks_task SET search_vector = tasks_task_document(id, title, description)
+        WHERE id = OLD.task_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.task_id <> OLD.task_id) THEN
+        UPDATE tasks_task SET search_vector = tasks_task_document(id, title, description)
+        WHERE id = NEW.task_id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER tasks_taskcomment_search_vector
+AFTER INSERT OR DELETE OR UPDATE OF content, task_id ON tasks_taskcomment
+FOR EACH ROW EXECUTE FUNCTION tasks_taskcomment_search_vector_update();
+
+UPDATE tasks_task SET search_vector = tasks_task_document(id, title, description);
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER tasks_taskcomment_search_vector ON tasks_taskcomment;
+DROP FUNCTION tasks_taskcomment_search_vector_update();
+DROP TRIGGER tasks_task_search_vector ON tasks_task;
+DROP FUNCTION tasks_task_search_vector_update();
+DROP FUNCTION tasks_task_document(bigint, text, text);
+"""
+
+
+def create_search(apps, schema_editor):
+    # Full-text search needs PostgreSQL; other databases keep the column NULL
+    # and search falls back to substring matching.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TRIGGERS)
+    schema_editor.add_index(apps.get_model('tasks', 'Task'), SEARCH_INDEX)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('tasks', 'Task'), SEARCH_INDEX)
+    schema_editor.execute(DROP_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_tombstones_and_sync_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="task", index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search, drop_search),
+            ],
+        ),
+    ]
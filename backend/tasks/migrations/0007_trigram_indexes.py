@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:04
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+ASSIGNEE_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(
+        django.db.models.functions.text.Upper("assignee_email"), name="gin_trgm_ops"
+    ),
+    name="tasks_task_assignee_trgm",
+)
+
+
+def create_index(apps, schema_editor):
+    # Trigram indexes need PostgreSQL; suggestions fall back to LIKE elsewhere.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('tasks', 'Task'), ASSIGNEE_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('tasks', 'Task'), ASSIGNEE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0003_trigram_indexes"),
+        ("tasks", "0006_task_search_vector"),
+    ]
+
+    operations = [
+        # Kept out of the model state, which --nomigrations test databases
+        # are built from on SQLite.
+        migrations.RunPython(create_index, drop_index),
+    ]
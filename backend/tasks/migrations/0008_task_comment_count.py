@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, outer_field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{outer_field: OuterRef("pk")})
+            .order_by()
+            .values(outer_field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    """Count the existing tasks of every project and comments of every task."""
+    Project = apps.get_model("projects", "Project")
+    Task = apps.get_model("tasks", "Task")
+    TaskComment = apps.get_model("tasks", "TaskComment")
+    Project.objects.update(
+        task_count=count(Task.objects.all(), "project"),
+        done_count=count(Task.objects.filter(status="DONE"), "project"),
+    )
+    Task.objects.update(comment_count=count(TaskComment.objects.all(), "task"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0005_project_task_counters"),
+        ("tasks", "0007_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
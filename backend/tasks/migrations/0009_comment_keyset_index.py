@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_comment_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskcomment",
+            index=models.Index(
+                fields=["task", "-created_at", "-id"],
+                name="tasks_taskc_task_id_f150ee_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="taskcomment",
+            name="tasks_taskc_task_id_3f97e8_idx",
+        ),
+    ]
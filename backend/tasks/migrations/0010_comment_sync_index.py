@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_comment_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskcomment",
+            index=models.Index(
+                fields=["task", "updated_at"], name="tasks_taskc_task_id_76e595_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="taskcomment",
+            name="tasks_taskc_updated_7a5374_idx",
+        ),
+    ]
@@ -1,9 +1,31 @@
 """
 Task models.
 """
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.db.models.functions import Now
 from django.core.validators import EmailValidator, MinLengthValidator
+from django.utils import timezone
+from config.updates import counted_save_fields
 from projects.models import Project
+from .counters import adjust_comment_count, adjust_project_counts, count_changes
+from .ranking import lock_projects, ranks_after
+
+
+class TaskQuerySet(models.QuerySet):
+    """Task queryset."""
+    
+    def with_overdue(self):
+        """Annotate whether each task is overdue, evaluated by the database."""
+        return self.annotate(
+            _is_overdue=Case(
+                When(Q(due_date__lt=Now()) & ~Q(status='DONE'), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
 
 
 class Task(models.Model):
@@ -29,29 +51,98 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    order = models.IntegerField(default=0, help_text="Order for drag-and-drop")
+    order = models.IntegerField(default=0, help_text="Legacy manual order, superseded by rank")
+    rank = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Lexicographic position within the project (see tasks/ranking.py)"
+    )
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every update")
+    # Maintained by tasks/counters.py.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted title, description and comment text, maintained by PostgreSQL
+    # triggers (see tasks/search.py); always NULL on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = TaskQuerySet.as_manager()
+    
+    # Filled in by annotated querysets so is_overdue can skip its own check.
+    _is_overdue = None
+    # The project and status as stored, which the project counters include.
+    _counted = None
+    
+    COUNTER_FIELDS = ['comment_count']
     
     class Meta:
-        ordering = ['order', '-created_at']
+        ordering = ['rank', '-created_at']
         indexes = [
             models.Index(fields=['project', 'status']),
+            # Keyset pagination over the default ordering.
+            models.Index(fields=['project', 'rank', '-created_at', '-id']),
             models.Index(fields=['assignee_email']),
             models.Index(fields=['due_date']),
+            # Delta sync reads the tasks changed since a cursor.
+            models.Index(fields=['project', 'updated_at']),
+            # Full-text search; created on PostgreSQL only.
+            GinIndex(fields=['search_vector'], name='tasks_task_search_gin'),
+            # Assignee suggestions use a pg_trgm index on UPPER(assignee_email),
+            # created by migration 0007 on PostgreSQL only (see config/typeahead.py).
         ]
     
     def __str__(self):
         return f"{self.title} ({self.project.name})"
     
-    @property
-    def comment_count(self):
-        """Get total number of comments."""
-        return self.comments.count()
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if not adding:
+            self.version += 1
+            if kwargs.get('update_fields') is None:
+                kwargs['update_fields'] = counted_save_fields(self, self.COUNTER_FIELDS)
+        # New tasks and status or project changes move the project counters.
+        counted = adding or bool({'project', 'project_id', 'status'} & set(kwargs['update_fields']))
+        with transaction.atomic():
+            if counted or not self.rank:
+                # Held until commit, so concurrent appends get distinct ranks.
+                lock_projects([self.project_id])
+            if not self.rank:
+                last = (
+                    Task.objects.filter(project_id=self.project_id)
+                    .order_by('-rank')
+                    .values_list('rank', flat=True)
+                    .first()
+                )
+                self.rank = ranks_after(last or None)[0]
+            before = [self._stored_counted()] if counted and not adding else []
+            super().save(*args, **kwargs)
+            if counted:
+                self._counted = (self.project_id, self.status)
+                adjust_project_counts(count_changes([row for row in before if row], [self._counted]))
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            # Before the task row, as in save(): post_delete moves the counters.
+            lock_projects([self.project_id])
+            return super().delete(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'project_id' in instance.__dict__ and 'status' in instance.__dict__:
+            instance._counted = (instance.project_id, instance.status)
+        return instance
+    
+    def _stored_counted(self):
+        """Get the stored ``(project_id, status)`` the project counters include."""
+        if self._counted is None:
+            return Task.objects.filter(pk=self.pk).values_list('project_id', 'status').first()
+        return self._counted
     
     @property
     def is_overdue(self):
         """Check if task is overdue."""
+        if self._is_overdue is not None:
+            return self._is_overdue
         if self.due_date:
-            from django.utils import timezone
             return timezone.now() > self.due_date and self.status != 'DONE'
         return False
 
@@ -73,9 +164,63 @@ class TaskComment(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['task', 'created_at']),
+            # Keyset pagination over the default ordering, within a task.
+            models.Index(fields=['task', '-created_at', '-id']),
+            # Delta sync reads the comments changed since a cursor, per task.
+            models.Index(fields=['task', 'updated_at']),
         ]
     
+    # The task as stored, whose comment counter includes this comment.
+    _counted_task_id = None
+    
     def __str__(self):
         return f"Comment on {self.task.title} by {self.author_email}"
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.task_id != self._counted_task_id:
+                if self._counted_task_id is not None:
+                    adjust_comment_count(self._counted_task_id, -1)
+                adjust_comment_count(self.task_id, 1)
+                self._counted_task_id = self.task_id
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_task_id = instance.__dict__.get('task_id')
+        return instance
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted task or comment, so delta sync can report deletions
+    of rows that no longer exist (see tasks/sync.py).
+    """
+    
+    KIND_TASK = 'task'
+    KIND_COMMENT = 'comment'
+    KIND_CHOICES = [
+        (KIND_TASK, 'Task'),
+        (KIND_COMMENT, 'Comment'),
+    ]
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='tombstones'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['project', 'deleted_at']),
+            models.Index(fields=['deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
 
@@ -0,0 +1,167 @@
+"""
+Lexicographic ranks for ordering tasks.
+
+A rank is a string of base-36 digits read as a fraction in [0, 1), so a new
+rank can always be found between two others without touching siblings.
+Ranks never end in ``0``, which keeps lexicographic and numeric order the
+same and leaves room below every rank. Appended ranks are spaced
+``APPEND_STEP`` apart at ``RANK_LENGTH`` digits; ranks longer than
+``RANK_MAX_LENGTH`` mean a project's ranks are too dense and should be
+rebalanced.
+
+Rebalances run after commit in a background thread, at most once per
+project per ``RANK_REBALANCE_DELAY``, and rewrite ranks in batches.
+"""
+import logging
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from config.broadcast import Coalescer
+
+
+logger = logging.getLogger(__name__)
+
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+RANK_LENGTH = 6
+RANK_MAX_LENGTH = 12
+APPEND_STEP = BASE ** 3
+REBALANCE_BATCH_SIZE = 1000
+
+
+def _to_int(rank, length):
+    """Read the first ``length`` digits of a rank as an integer, padding with zeros."""
+    value = 0
+    for char in rank[:length].ljust(length, '0'):
+        value = value * BASE + DIGITS.index(char)
+    return value
+
+
+def _to_rank(value, length):
+    digits = []
+    for _ in range(length):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return ''.join(reversed(digits)).rstrip('0')
+
+
+def spread_ranks(before=None, after=None, count=1):
+    """
+    Get ``count`` evenly spaced ranks strictly between two ranks.
+
+    ``None`` stands for the start or end of the range. Uses the shortest
+    length that leaves room for every rank.
+    """
+    if before is not None and after is not None and not before < after:
+        raise ValueError(f"Rank {before!r} must sort before {after!r}")
+    length = 1
+    while True:
+        low = _to_int(before, length) if before else 0
+        high = _to_int(after, length) if after is not None else BASE ** length
+        if high - low - 1 >= count:
+            step = (high - low) / (count + 1)
+            return [_to_rank(low + max(1, round(step * (index + 1))), length) for index in range(count)]
+        length += 1
+
+
+def rank_between(before=None, after=None):
+    """Get the rank halfway between two ranks."""
+    return spread_ranks(before, after, 1)[0]
+
+
+def ranks_after(last=None, count=1):
+    """
+    Get ``count`` ascending ranks after ``last``, spaced to leave room for
+    later insertions between them.
+    """
+    if last is None or len(last) <= RANK_LENGTH:
+        low = _to_int(last, RANK_LENGTH) if last else 0
+        if low + APPEND_STEP * count < BASE ** RANK_LENGTH:
+            return [_to_rank(low + APPEND_STEP * (index + 1), RANK_LENGTH) for index in range(count)]
+    return spread_ranks(last, None, count)
+
+
+def is_dense(rank):
+    """Check whether a rank is long enough that its project needs rebalancing."""
+    return len(rank) > RANK_MAX_LENGTH
+
+
+def rebalance_ranks(project_id, exclude=None, batch_size=REBALANCE_BATCH_SIZE):
+    """
+    Reassign evenly spaced ranks to the tasks of a project, keeping their order.
+
+    Only primary keys are loaded, and rows are rewritten ``batch_size`` at a
+    time. Every rewritten task's ``version`` is bumped, so writes based on an
+    old rank conflict. ``exclude`` is a task left as is, such as one about to
+    be moved. Clients are told to refetch the board instead of being sent
+    every task.
+    """
+    from config.response_cache import invalidate_project
+    from .events import publish_ranks_rebalanced
+    from .models import Task
+
+    with transaction.atomic():
+        lock_projects([project_id])
+        pks = list(
+            Task.objects.filter(project_id=project_id)
+            .exclude(pk=exclude)
+            .order_by(*Task._meta.ordering, 'id')
+            .values_list('pk', flat=True)
+        )
+        ranks = ranks_after(None, len(pks))
+        now = timezone.now()
+        for start in range(0, len(pks), batch_size):
+            batch = zip(pks[start:start + batch_size], ranks[start:start + batch_size])
+            # bulk_update() skips auto_now, and delta syncs need the new ranks too.
+            Task.objects.bulk_update(
+                [Task(pk=pk, rank=rank, updated_at=now, version=F('version') + 1) for pk, rank in batch],
+                ['rank', 'updated_at', 'version'],
+            )
+        invalidate_project(project_id)
+        publish_ranks_rebalanced(project_id)
+    return len(pks)
+
+
+def lock_projects(project_ids):
+    """
+    Lock project rows, in primary key order, until the end of the transaction.
+
+    ``project_ids`` is an iterable or a ``project_id`` values queryset. Task
+    writes that pick ranks or move the project counters take these locks
+    before any task row lock: appends, moves and rebalances in one project
+    run one at a time, and concurrent writers never lock in opposite orders.
+    """
+    from projects.models import Project
+
+    list(
+        Project.objects.select_for_update()
+        .filter(pk__in=project_ids)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def get_rebalance_delay():
+    return getattr(settings, 'RANK_REBALANCE_DELAY', 1)
+
+
+def _rebalance(project_id, items):
+    try:
+        rebalance_ranks(project_id)
+    except Exception:
+        # Dense ranks still sort correctly; the next dense write retries.
+        logger.exception("Could not rebalance the ranks of project %s", project_id)
+    finally:
+        if isinstance(threading.current_thread(), threading.Timer):
+            connection.close()
+
+
+rebalancer = Coalescer(_rebalance, window=get_rebalance_delay)
+
+
+def schedule_rebalance(project_id):
+    """Rebalance a project's ranks in the background once the current transaction commits."""
+    transaction.on_commit(lambda: rebalancer.add(project_id, project_id, project_id))
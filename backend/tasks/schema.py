@@ -2,11 +2,28 @@
 GraphQL schema for tasks.
 """
 import graphene
+from collections import Counter
 from graphene_django import DjangoObjectType
-from graphql import GraphQLError
+from graphql import GraphQLError, get_named_type
 from datetime import datetime
-from django.db import models
-from .models import Task, TaskComment
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from graphene_django.settings import graphene_settings
+from config.optimizer import optimize
+from config.pagination import DEFAULT_PAGE_SIZE, keyset_connection
+from config.response_cache import invalidate, invalidate_project
+from config.selection import iter_field_nodes
+from config.typeahead import DEFAULT_SUGGESTIONS, check_arguments, suggest
+from config.updates import update_or_raise, update_returning
+from .board import board_queryset, column_counts
+from .events import TASK_CREATED, TASK_DELETED, TASK_UPDATED, publish_task_changes
+from .counters import adjust_project_counts, count_changes
+from .models import Task, TaskComment, Tombstone
+from .ranking import is_dense, lock_projects, rank_between, ranks_after, rebalance_ranks, schedule_rebalance
+from .search import SEARCH_ORDERING, search_tasks
+from .sync import ProjectChanges, decode_sync_cursor
+from organizations.models import Organization
 from projects.models import Project
 
 
@@ -24,17 +41,101 @@ class TaskType(DjangoObjectType):
     comment_count = graphene.Int()
     is_overdue = graphene.Boolean()
     
+    # Model fields read by computed fields, for the queryset optimizer.
+    optimizer_hints = {
+        'is_overdue': ['due_date', 'status'],
+    }
+    
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ['search_vector']
     
-    def resolve_comment_count(self, info):
-        return self.comment_count
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        return queryset.with_overdue()
     
     def resolve_is_overdue(self, info):
         return self.is_overdue
 
 
+class TaskConnection(graphene.relay.Connection):
+    """Keyset-paginated task connection."""
+    
+    class Meta:
+        node = TaskType
+
+
+class TaskCommentConnection(graphene.relay.Connection):
+    """Keyset-paginated task comment connection."""
+    
+    class Meta:
+        node = TaskCommentType
+
+
+def filter_tasks(project_id, status=None, assignee_email=None, is_overdue=None):
+    """Build the task queryset shared by the list and connection fields."""
+    try:
+        project = Project.objects.get(pk=project_id)
+    except Project.DoesNotExist:
+        raise GraphQLError(f"Project with id '{project_id}' not found")
+    
+    queryset = Task.objects.filter(project=project).with_overdue()
+    
+    if status:
+        queryset = queryset.filter(status=status)
+    if assignee_email:
+        queryset = queryset.filter(assignee_email=assignee_email)
+    if is_overdue is not None:
+        queryset = queryset.filter(_is_overdue=is_overdue)
+    
+    return queryset
+
+
+class BoardColumnType(graphene.ObjectType):
+    """One status column of a project's board."""
+    
+    status = graphene.String()
+    label = graphene.String()
+    total_count = graphene.Int()
+    has_more = graphene.Boolean()
+    tasks = graphene.List(TaskType)
+
+
+class TaskChangedType(graphene.ObjectType):
+    """A task created, updated or deleted in a project."""
+    
+    action = graphene.String()
+    task_id = graphene.ID()
+    task = graphene.Field(TaskType)
+    
+    def resolve_task(self, info):
+        if self['task_id'] is None or self['action'] == TASK_DELETED:
+            return None
+        return optimize(Task.objects.with_overdue(), info).filter(pk=self['task_id']).first()
+
+
+class ProjectChangesType(graphene.ObjectType):
+    """Tasks and comments of a project changed since a sync cursor."""
+    
+    tasks = graphene.List(TaskType)
+    comments = graphene.List(TaskCommentType)
+    deleted_task_ids = graphene.List(graphene.ID)
+    deleted_comment_ids = graphene.List(graphene.ID)
+    cursor = graphene.String(description="Pass as 'since' to get the changes after this sync.")
+    
+    def resolve_tasks(self, info):
+        return optimize(self.tasks().with_overdue(), info)
+    
+    def resolve_comments(self, info):
+        return optimize(self.comments(), info)
+    
+    def resolve_deleted_task_ids(self, info):
+        return self.deleted_ids(Tombstone.KIND_TASK)
+    
+    def resolve_deleted_comment_ids(self, info):
+        return self.deleted_ids(Tombstone.KIND_COMMENT)
+
+
 class TaskQuery(graphene.ObjectType):
     """Task queries."""
     
@@ -42,45 +143,196 @@ class TaskQuery(graphene.ObjectType):
         TaskType,
         project_id=graphene.ID(required=True),
         status=graphene.String(),
-        assignee_email=graphene.String()
+        assignee_email=graphene.String(),
+        is_overdue=graphene.Boolean(),
+        overdue_first=graphene.Boolean()
+    )
+    tasks_connection = graphene.relay.ConnectionField(
+        TaskConnection,
+        project_id=graphene.ID(required=True),
+        status=graphene.String(),
+        assignee_email=graphene.String(),
+        is_overdue=graphene.Boolean()
     )
     task = graphene.Field(TaskType, id=graphene.ID(required=True))
     task_comments = graphene.List(
         TaskCommentType,
         task_id=graphene.ID(required=True)
     )
+    task_comments_connection = graphene.relay.ConnectionField(
+        TaskCommentConnection,
+        task_id=graphene.ID(required=True)
+    )
+    board = graphene.List(
+        BoardColumnType,
+        project_id=graphene.ID(required=True),
+        per_column_limit=graphene.Int(default_value=DEFAULT_PAGE_SIZE)
+    )
+    project_changes = graphene.Field(
+        ProjectChangesType,
+        project_id=graphene.ID(required=True),
+        since=graphene.String()
+    )
+    search_tasks = graphene.relay.ConnectionField(
+        TaskConnection,
+        organization_slug=graphene.String(required=True),
+        query=graphene.String(required=True)
+    )
+    suggest_assignees = graphene.List(
+        graphene.String,
+        organization_slug=graphene.String(required=True),
+        query=graphene.String(required=True),
+        first=graphene.Int(default_value=DEFAULT_SUGGESTIONS)
+    )
     
-    def resolve_tasks(self, info, project_id, status=None, assignee_email=None):
+    def resolve_tasks(self, info, project_id, status=None, assignee_email=None, is_overdue=None, overdue_first=False):
         """Get tasks for a project."""
-        try:
-            project = Project.objects.get(pk=project_id)
-        except Project.DoesNotExist:
-            raise GraphQLError(f"Project with id '{project_id}' not found")
+        queryset = filter_tasks(project_id, status, assignee_email, is_overdue)
         
-        queryset = Task.objects.filter(project=project)
+        if overdue_first:
+            queryset = queryset.order_by('-_is_overdue', *Task._meta.ordering)
         
-        if status:
-            queryset = queryset.filter(status=status)
-        if assignee_email:
-            queryset = queryset.filter(assignee_email=assignee_email)
+        return optimize(queryset, info)
+    
+    def resolve_tasks_connection(self, info, project_id, status=None, assignee_email=None, is_overdue=None, **kwargs):
+        """Get a page of tasks for a project."""
+        queryset = filter_tasks(project_id, status, assignee_email, is_overdue)
         
-        return queryset
+        return keyset_connection(TaskConnection, queryset, info, **kwargs)
     
     def resolve_task(self, info, id):
         """Get a single task."""
         try:
-            return Task.objects.get(pk=id)
+            return optimize(Task.objects.with_overdue(), info).get(pk=id)
         except Task.DoesNotExist:
             raise GraphQLError(f"Task with id '{id}' not found")
     
     def resolve_task_comments(self, info, task_id):
         """Get comments for a task."""
-        try:
-            task = Task.objects.get(pk=task_id)
-        except Task.DoesNotExist:
+        if not Task.objects.filter(pk=task_id).exists():
+            raise GraphQLError(f"Task with id '{task_id}' not found")
+        
+        return optimize(TaskComment.objects.filter(task_id=task_id), info)
+    
+    def resolve_task_comments_connection(self, info, task_id, **kwargs):
+        """Get a page of comments for a task."""
+        if not Task.objects.filter(pk=task_id).exists():
             raise GraphQLError(f"Task with id '{task_id}' not found")
         
-        return task.comments.all()
+        return keyset_connection(
+            TaskCommentConnection, TaskComment.objects.filter(task_id=task_id), info, **kwargs
+        )
+    
+    def resolve_board(self, info, project_id, per_column_limit=DEFAULT_PAGE_SIZE):
+        """Get the first tasks and total count of every status column."""
+        max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        if per_column_limit < 0 or (max_limit and per_column_limit > max_limit):
+            raise GraphQLError(f"Argument 'perColumnLimit' must be between 0 and {max_limit}")
+        
+        task_nodes = [
+            node
+            for field_node in info.field_nodes
+            for node in iter_field_nodes(field_node.selection_set, info.fragments)
+            if node.name.value == 'tasks'
+        ]
+        columns = {status: [] for status, _label in Task.STATUS_CHOICES}
+        if task_nodes and per_column_limit:
+            task_type = get_named_type(get_named_type(info.return_type).fields['tasks'].type)
+            queryset = optimize(board_queryset(project_id, per_column_limit), info, task_nodes, task_type, keep=['status'])
+            counts = {}
+            for task in queryset:
+                columns.setdefault(task.status, []).append(task)
+                counts[task.status] = task._column_count
+        else:
+            counts = column_counts(project_id)
+        
+        if not counts and not Project.objects.filter(pk=project_id).exists():
+            raise GraphQLError(f"Project with id '{project_id}' not found")
+        
+        labels = dict(Task.STATUS_CHOICES)
+        return [
+            BoardColumnType(
+                status=status,
+                label=labels.get(status, status),
+                total_count=counts.get(status, 0),
+                has_more=counts.get(status, 0) > len(tasks),
+                tasks=tasks,
+            )
+            for status, tasks in columns.items()
+        ]
+    
+    def resolve_project_changes(self, info, project_id, since=None):
+        """Get what changed in a project since a sync, or everything without a cursor."""
+        since = decode_sync_cursor(since, project_id) if since is not None else None
+        if not Project.objects.filter(pk=project_id).exists():
+            raise GraphQLError(f"Project with id '{project_id}' not found")
+        
+        return ProjectChanges(project_id, since)
+    
+    def resolve_search_tasks(self, info, organization_slug, query, **kwargs):
+        """Get a page of an organization's tasks matching a search, best match first."""
+        if not query.strip():
+            raise GraphQLError("Search query must not be empty")
+        try:
+            organization = Organization.objects.get(slug=organization_slug)
+        except Organization.DoesNotExist:
+            raise GraphQLError(f"Organization with slug '{organization_slug}' not found")
+        
+        queryset = search_tasks(Task.objects.filter(project__organization=organization).with_overdue(), query)
+        return keyset_connection(TaskConnection, queryset, info, ordering=SEARCH_ORDERING, **kwargs)
+    
+    def resolve_suggest_assignees(self, info, organization_slug, query, first=DEFAULT_SUGGESTIONS):
+        """Get the assignee emails of an organization's tasks that best match a prefix or fuzzy query."""
+        check_arguments(query, first)
+        if not Organization.objects.filter(slug=organization_slug).exists():
+            raise GraphQLError(f"Organization with slug '{organization_slug}' not found")
+        
+        queryset = Task.objects.filter(project__organization__slug=organization_slug).exclude(assignee_email='')
+        return list(suggest(queryset, 'assignee_email', query).values_list('assignee_email', flat=True).distinct()[:first])
+
+
+class TaskSubscription(graphene.ObjectType):
+    """
+    Task subscriptions.
+    
+    Each field is executed once per change event, with the event published
+    by ``tasks.events`` as the root value.
+    """
+    
+    task_changed = graphene.Field(TaskChangedType, project_id=graphene.ID(required=True))
+    comment_added = graphene.Field(TaskCommentType, task_id=graphene.ID(required=True))
+    
+    def resolve_task_changed(self, info, project_id):
+        """Get the changed task's event."""
+        return self
+    
+    def resolve_comment_added(self, info, task_id):
+        """Get the added comment."""
+        return optimize(TaskComment.objects.all(), info).filter(pk=self['comment_id']).first()
+
+
+def update_task(pk, changes, expected_version=None):
+    """
+    ``update_or_raise`` for tasks, keeping the project counters in step with
+    status changes.
+    
+    A change to a status other than DONE is first tried as one statement that
+    only matches tasks that are not done, which leaves the counters as they
+    are. Only changes into or out of DONE lock the project and read the
+    previous status.
+    """
+    if 'status' not in changes:
+        return update_or_raise(Task, pk, changes, expected_version)
+    if changes['status'] != 'DONE':
+        task = update_returning(Task, pk, changes, expected_version, condition=~models.Q(status='DONE'))
+        if task is not None:
+            return task
+    with transaction.atomic():
+        lock_projects(Task.objects.filter(pk=pk).values('project_id'))
+        before = list(Task.objects.select_for_update().filter(pk=pk).values_list('project_id', 'status'))
+        task = update_or_raise(Task, pk, changes, expected_version)
+        adjust_project_counts(count_changes(before, [(task.project_id, task.status)]))
+    return task
 
 
 class CreateTask(graphene.Mutation):
@@ -107,19 +359,14 @@ class CreateTask(graphene.Mutation):
         if status not in dict(Task.STATUS_CHOICES):
             raise GraphQLError(f"Invalid status. Must be one of: {', '.join(dict(Task.STATUS_CHOICES).keys())}")
         
-        # Get max order for this project
-        max_order = Task.objects.filter(project=project).aggregate(
-            max_order=models.Max('order')
-        )['max_order'] or 0
-        
+        # Task.save() ranks the new task after the project's last task.
         task = Task.objects.create(
             project=project,
             title=title,
             description=description or '',
             status=status,
             assignee_email=assignee_email or '',
-            due_date=due_date,
-            order=max_order + 1
+            due_date=due_date
         )
         
         return CreateTask(
@@ -140,33 +387,32 @@ class UpdateTask(graphene.Mutation):
         assignee_email = graphene.String()
         due_date = graphene.DateTime()
         order = graphene.Int()
+        expected_version = graphene.Int()
     
     task = graphene.Field(TaskType)
     success = graphene.Boolean()
     message = graphene.String()
     
-    def mutate(self, info, id, title=None, description=None, status=None, assignee_email=None, due_date=None, order=None):
-        try:
-            task = Task.objects.get(pk=id)
-        except Task.DoesNotExist:
-            raise GraphQLError(f"Task with id '{id}' not found")
-        
+    def mutate(self, info, id, title=None, description=None, status=None, assignee_email=None, due_date=None, order=None, expected_version=None):
+        changes = {}
         if title:
-            task.title = title
+            changes['title'] = title
         if description is not None:
-            task.description = description
+            changes['description'] = description
         if status:
             if status not in dict(Task.STATUS_CHOICES):
                 raise GraphQLError(f"Invalid status. Must be one of: {', '.join(dict(Task.STATUS_CHOICES).keys())}")
-            task.status = status
+            changes['status'] = status
         if assignee_email is not None:
-            task.assignee_email = assignee_email
+            changes['assignee_email'] = assignee_email
         if due_date is not None:
-            task.due_date = due_date
+            changes['due_date'] = due_date
         if order is not None:
-            task.order = order
+            changes['order'] = order
         
-        task.save()
+        task = update_task(id, changes, expected_version)
+        invalidate_project(task.project_id)
+        publish_task_changes(task.project_id, [task], TASK_UPDATED)
         
         return UpdateTask(
             task=task,
@@ -234,24 +480,23 @@ class UpdateTaskStatus(graphene.Mutation):
         id = graphene.ID(required=True)
         status = graphene.String(required=True)
         order = graphene.Int()
+        expected_version = graphene.Int()
     
     task = graphene.Field(TaskType)
     success = graphene.Boolean()
     message = graphene.String()
     
-    def mutate(self, info, id, status, order=None):
-        try:
-            task = Task.objects.get(pk=id)
-        except Task.DoesNotExist:
-            raise GraphQLError(f"Task with id '{id}' not found")
-        
+    def mutate(self, info, id, status, order=None, expected_version=None):
         if status not in dict(Task.STATUS_CHOICES):
             raise GraphQLError(f"Invalid status. Must be one of: {', '.join(dict(Task.STATUS_CHOICES).keys())}")
         
-        task.status = status
+        changes = {'status': status}
         if order is not None:
-            task.order = order
-        task.save()
+            changes['order'] = order
+        
+        task = update_task(id, changes, expected_version)
+        invalidate_project(task.project_id)
+        publish_task_changes(task.project_id, [task], TASK_UPDATED)
         
         return UpdateTaskStatus(
             task=task,
@@ -260,6 +505,375 @@ class UpdateTaskStatus(graphene.Mutation):
         )
 
 
+class MoveTask(graphene.Mutation):
+    """
+    Move a task between two neighbours, optionally changing its status.
+    
+    ``beforeId`` is the task that should end up directly before the moved
+    task and ``afterId`` the one directly after it; either may be omitted.
+    Without both, the task moves to the end of the project. Only the moved
+    task's row is updated.
+    """
+    
+    class Arguments:
+        id = graphene.ID(required=True)
+        before_id = graphene.ID()
+        after_id = graphene.ID()
+        status = graphene.String()
+        expected_version = graphene.Int()
+    
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, id, before_id=None, after_id=None, status=None, expected_version=None):
+        try:
+            task = Task.objects.only('project_id').get(pk=id)
+        except Task.DoesNotExist:
+            raise GraphQLError(f"Task with id '{id}' not found")
+        
+        if status is not None and status not in dict(Task.STATUS_CHOICES):
+            raise GraphQLError(f"Invalid status. Must be one of: {', '.join(dict(Task.STATUS_CHOICES).keys())}")
+        
+        with transaction.atomic():
+            # Ranks are read and written under the project lock, so
+            # concurrent moves into one gap never get the same rank.
+            lock_projects([task.project_id])
+            siblings = Task.objects.filter(project_id=task.project_id).exclude(pk=task.pk)
+            neighbour_ranks = dict(
+                siblings.filter(pk__in=[pk for pk in (before_id, after_id) if pk is not None])
+                .values_list('pk', 'rank')
+            )
+            for neighbour_id in (before_id, after_id):
+                if neighbour_id is not None and int(neighbour_id) not in neighbour_ranks:
+                    raise GraphQLError(f"Task with id '{neighbour_id}' not found in this project")
+            
+            def find_bounds():
+                lower = neighbour_ranks.get(int(before_id)) if before_id is not None else None
+                upper = neighbour_ranks.get(int(after_id)) if after_id is not None else None
+                if before_id is not None and after_id is None:
+                    upper = siblings.filter(rank__gt=lower).order_by('rank').values_list('rank', flat=True).first()
+                elif after_id is not None and before_id is None:
+                    lower = siblings.filter(rank__lt=upper).order_by('-rank').values_list('rank', flat=True).first()
+                elif before_id is None:
+                    lower = siblings.order_by('-rank').values_list('rank', flat=True).first()
+                return lower, upper
+            
+            lower, upper = find_bounds()
+            if lower is not None and upper is not None and lower == upper:
+                # Neighbours share a rank, so spread the other ranks out
+                # before placing the task.
+                rebalance_ranks(task.project_id, exclude=task.pk)
+                neighbour_ranks = dict(siblings.filter(pk__in=neighbour_ranks).values_list('pk', 'rank'))
+                lower, upper = find_bounds()
+            if lower is not None and upper is not None and not lower < upper:
+                raise GraphQLError("beforeId must come before afterId")
+            
+            changes = {'rank': rank_between(lower, upper) if upper is not None else ranks_after(lower)[0]}
+            if status is not None:
+                changes['status'] = status
+            
+            task = update_task(task.pk, changes, expected_version)
+            invalidate_project(task.project_id)
+            publish_task_changes(task.project_id, [task], TASK_UPDATED)
+            if is_dense(task.rank):
+                schedule_rebalance(task.project_id)
+        
+        return MoveTask(
+            task=task,
+            success=True,
+            message="Task moved successfully"
+        )
+
+
+# Maximum number of items accepted by a single bulk mutation.
+BULK_TASK_LIMIT = 1000
+
+# Fields that bulk inputs may set, validated with the model field validators.
+BULK_TASK_FIELDS = ['title', 'description', 'status', 'assignee_email', 'due_date']
+
+
+class BulkTaskError(graphene.ObjectType):
+    """Validation error for one item of a bulk mutation."""
+    
+    index = graphene.Int(description="Position of the item in the input list")
+    field = graphene.String()
+    message = graphene.String()
+
+
+class BulkCreateTaskInput(graphene.InputObjectType):
+    """Task to create in a bulk mutation."""
+    
+    project_id = graphene.ID(required=True)
+    title = graphene.String(required=True)
+    description = graphene.String()
+    status = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+
+
+class BulkUpdateTaskInput(graphene.InputObjectType):
+    """Task changes in a bulk mutation; omitted fields are left unchanged."""
+    
+    id = graphene.ID(required=True)
+    title = graphene.String()
+    description = graphene.String()
+    status = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+    order = graphene.Int()
+
+
+def clean_task_fields(values, index, errors):
+    """
+    Validate task field values without touching the database.
+    
+    Appends a BulkTaskError to ``errors`` for every invalid field and returns
+    the cleaned values.
+    """
+    cleaned = {}
+    for name in BULK_TASK_FIELDS:
+        if name not in values:
+            continue
+        value = values[name]
+        if value is None and name != 'due_date':
+            value = ''
+        try:
+            cleaned[name] = Task._meta.get_field(name).clean(value, None)
+        except ValidationError as error:
+            errors.append(BulkTaskError(index=index, field=name, message=' '.join(error.messages)))
+    return cleaned
+
+
+def check_bulk_size(items):
+    if not items:
+        raise GraphQLError("At least one item is required")
+    if len(items) > BULK_TASK_LIMIT:
+        raise GraphQLError(f"Bulk mutations accept at most {BULK_TASK_LIMIT} items")
+
+
+def parse_ids(values, index_errors, field='id'):
+    """Convert IDs to integers, recording an error for malformed ones."""
+    ids = []
+    for index, value in enumerate(values):
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            ids.append(None)
+            index_errors.append(BulkTaskError(index=index, field=field, message=f"Invalid id '{value}'"))
+    return ids
+
+
+def invalidate_projects(projects):
+    """Invalidate cached responses for projects written without model signals."""
+    for project in projects:
+        invalidate(organization_id=project.organization_id, project_id=project.pk)
+
+
+def publish_bulk_changes(tasks, action):
+    """Publish change events for tasks written without model signals."""
+    by_project = {}
+    for task in tasks:
+        by_project.setdefault(task.project_id, []).append(task)
+    for project_id, project_tasks in by_project.items():
+        publish_task_changes(project_id, project_tasks, action)
+
+
+class BulkCreateTasks(graphene.Mutation):
+    """
+    Create many tasks at once, ranked after each project's last task in
+    input order.
+    
+    Every item is validated before anything is written; if any item is
+    invalid, nothing is created and the per-item errors are returned.
+    """
+    
+    class Arguments:
+        tasks = graphene.List(graphene.NonNull(BulkCreateTaskInput), required=True)
+    
+    tasks = graphene.List(TaskType)
+    errors = graphene.List(BulkTaskError)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, tasks):
+        check_bulk_size(tasks)
+        errors = []
+        project_ids = parse_ids([item.project_id for item in tasks], errors, 'projectId')
+        
+        with transaction.atomic():
+            # Lock the projects so concurrent imports get contiguous orders.
+            found = {pk for pk in project_ids if pk is not None}
+            lock_projects(found)
+            projects = Project.objects.in_bulk(found)
+            
+            values = []
+            for index, (item, project_id) in enumerate(zip(tasks, project_ids)):
+                if project_id is not None and project_id not in projects:
+                    errors.append(BulkTaskError(
+                        index=index, field='projectId',
+                        message=f"Project with id '{item.project_id}' not found",
+                    ))
+                values.append(clean_task_fields({'status': 'TODO', **item}, index, errors))
+            
+            if errors:
+                return BulkCreateTasks(tasks=[], errors=errors, success=False, message="No tasks were created")
+            
+            last_ranks = dict(
+                Task.objects.filter(project_id__in=projects)
+                .order_by()
+                .values('project_id')
+                .annotate(last_rank=models.Max('rank'))
+                .values_list('project_id', 'last_rank')
+            )
+            counts = Counter(project_ids)
+            new_ranks = {
+                pk: iter(ranks_after(last_ranks.get(pk) or None, counts[pk])) for pk in projects
+            }
+            
+            created = [
+                Task(project=projects[project_id], rank=next(new_ranks[project_id]), **fields)
+                for project_id, fields in zip(project_ids, values)
+            ]
+            Task.objects.bulk_create(created, batch_size=500)
+            adjust_project_counts(count_changes(after=[(task.project_id, task.status) for task in created]))
+            
+            invalidate_projects(projects.values())
+            publish_bulk_changes(created, TASK_CREATED)
+        
+        return BulkCreateTasks(
+            tasks=created,
+            errors=[],
+            success=True,
+            message=f"{len(created)} tasks created successfully"
+        )
+
+
+class BulkUpdateTasks(graphene.Mutation):
+    """
+    Update many tasks at once.
+    
+    Every item is validated before anything is written; if any item is
+    invalid, or repeats the id of an earlier item, nothing is updated and the
+    per-item errors are returned.
+    """
+    
+    class Arguments:
+        tasks = graphene.List(graphene.NonNull(BulkUpdateTaskInput), required=True)
+    
+    tasks = graphene.List(TaskType)
+    errors = graphene.List(BulkTaskError)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, tasks):
+        check_bulk_size(tasks)
+        errors = []
+        ids = parse_ids([item.id for item in tasks], errors)
+        
+        with transaction.atomic():
+            found = {pk for pk in ids if pk is not None}
+            lock_projects(Task.objects.filter(pk__in=found).values('project_id'))
+            existing = Task.objects.select_for_update().in_bulk(found)
+            
+            changes = []
+            seen = set()
+            for index, (item, pk) in enumerate(zip(tasks, ids)):
+                if pk is not None and pk not in existing:
+                    errors.append(BulkTaskError(
+                        index=index, field='id', message=f"Task with id '{item.id}' not found"
+                    ))
+                elif pk in seen:
+                    errors.append(BulkTaskError(
+                        index=index, field='id', message=f"Task with id '{item.id}' is repeated"
+                    ))
+                seen.add(pk)
+                fields = clean_task_fields(
+                    {name: value for name, value in item.items() if value is not None}, index, errors
+                )
+                if item.get('order') is not None:
+                    fields['order'] = item.order
+                changes.append(fields)
+            
+            if errors:
+                return BulkUpdateTasks(tasks=[], errors=errors, success=False, message="No tasks were updated")
+            
+            before = [(task.project_id, task.status) for task in existing.values()]
+            now = timezone.now()
+            updated = []
+            update_fields = {'updated_at', 'version'}
+            for pk, fields in zip(ids, changes):
+                task = existing[pk]
+                for name, value in fields.items():
+                    setattr(task, name, value)
+                task.updated_at = now
+                task.version += 1
+                update_fields.update(fields)
+                updated.append(task)
+            Task.objects.bulk_update(list(existing.values()), sorted(update_fields), batch_size=500)
+            adjust_project_counts(count_changes(before, [(task.project_id, task.status) for task in existing.values()]))
+            
+            invalidate_projects(
+                Project.objects.filter(pk__in={task.project_id for task in updated}).only('organization_id')
+            )
+            publish_bulk_changes(updated, TASK_UPDATED)
+        
+        return BulkUpdateTasks(
+            tasks=updated,
+            errors=[],
+            success=True,
+            message=f"{len(existing)} tasks updated successfully"
+        )
+
+
+class BulkDeleteTasks(graphene.Mutation):
+    """
+    Delete many tasks at once.
+    
+    If any id is unknown, nothing is deleted and the per-item errors are
+    returned.
+    """
+    
+    class Arguments:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    
+    deleted_count = graphene.Int()
+    errors = graphene.List(BulkTaskError)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, ids):
+        check_bulk_size(ids)
+        errors = []
+        pks = parse_ids(ids, errors)
+        
+        with transaction.atomic():
+            found = {pk for pk in pks if pk is not None}
+            lock_projects(Task.objects.filter(pk__in=found).values('project_id'))
+            existing = set(
+                Task.objects.select_for_update()
+                .filter(pk__in=found)
+                .values_list('pk', flat=True)
+            )
+            for index, (value, pk) in enumerate(zip(ids, pks)):
+                if pk is not None and pk not in existing:
+                    errors.append(BulkTaskError(index=index, field='id', message=f"Task with id '{value}' not found"))
+            
+            if errors:
+                return BulkDeleteTasks(deleted_count=0, errors=errors, success=False, message="No tasks were deleted")
+            
+            # Deleting a queryset still sends post_delete, which invalidates
+            # the cached responses of the affected projects.
+            Task.objects.filter(pk__in=existing).delete()
+        
+        return BulkDeleteTasks(
+            deleted_count=len(existing),
+            errors=[],
+            success=True,
+            message=f"{len(existing)} tasks deleted successfully"
+        )
+
+
 class TaskMutation(graphene.ObjectType):
     """Task mutations."""
     
@@ -268,4 +882,8 @@ class TaskMutation(graphene.ObjectType):
     delete_task = DeleteTask.Field()
     add_task_comment = AddTaskComment.Field()
     update_task_status = UpdateTaskStatus.Field()
+    move_task = MoveTask.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
+    bulk_update_tasks = BulkUpdateTasks.Field()
+    bulk_delete_tasks = BulkDeleteTasks.Field()
 
@@ -0,0 +1,64 @@
+"""
+Full-text search over tasks and their comments.
+
+On PostgreSQL every task carries a ``search_vector`` of its title (weight A),
+description (B) and comment text (C). Triggers installed by migration 0006
+keep it current on every write path, including raw updates and comment
+changes, and a GIN index serves ``websearch_to_tsquery`` matches. Results are
+ordered by ``ts_rank``.
+
+Other databases (SQLite in development and tests) fall back to
+case-insensitive substring matching, with title matches ranked first.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Q, Value, When
+from django.db.models.functions import Cast
+from .models import Task, TaskComment
+
+
+# Text search configuration used by the triggers in migration 0006.
+SEARCH_CONFIG = 'english'
+
+# Keyset ordering of search results: best rank first, newest task first.
+SEARCH_ORDERING = ['-_search_rank', '-id']
+
+
+def has_full_text(model=Task):
+    """Check whether the database of a model supports the full-text index."""
+    return connections[router.db_for_read(model)].vendor == 'postgresql'
+
+
+def search_query(text):
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_tasks(queryset, text):
+    """Filter tasks matching a search and annotate their ``_search_rank``."""
+    if has_full_text():
+        query = search_query(text)
+        return queryset.filter(search_vector=query).annotate(
+            # Double precision, so ranks round-trip through keyset cursors.
+            _search_rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+        )
+
+    comments = TaskComment.objects.filter(task_id=OuterRef('pk'), content__icontains=text)
+    return queryset.filter(
+        Q(title__icontains=text) | Q(description__icontains=text) | Exists(comments)
+    ).annotate(
+        _search_rank=Case(
+            When(title__icontains=text, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def search_comments(queryset, text):
+    """Filter comments matching a search, narrowed through their tasks' index."""
+    if has_full_text(TaskComment):
+        query = search_query(text)
+        return queryset.filter(task__search_vector=query).annotate(
+            _search_vector=SearchVector('content', config=SEARCH_CONFIG),
+        ).filter(_search_vector=query)
+    return queryset.filter(content__icontains=text)
@@ -0,0 +1,73 @@
+"""
+Response cache invalidation, change events, deletion tombstones and counter
+updates for task and comment changes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from config.response_cache import invalidate_project, task_project_id
+from .events import (
+    TASK_CREATED, TASK_DELETED, TASK_UPDATED, publish_comment_added, publish_task_changes,
+)
+from .counters import adjust_comment_count, adjust_project_counts, count_changes
+from .models import Task, TaskComment, Tombstone
+from .sync import deleted_model
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task(sender, instance, **kwargs):
+    invalidate_project(instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=TaskComment)
+def invalidate_task_comment(sender, instance, **kwargs):
+    invalidate_project(task_project_id(instance.task_id))
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, **kwargs):
+    publish_task_changes(instance.project_id, [instance], TASK_CREATED if created else TASK_UPDATED)
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    publish_task_changes(instance.project_id, [instance], TASK_DELETED)
+
+
+@receiver(post_save, sender=TaskComment)
+def publish_task_comment_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_comment_added(instance)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, origin=None, **kwargs):
+    # Tasks deleted along with their project or organization take the
+    # project's tombstones with them, so there is nothing to record.
+    if deleted_model(origin) is not Task:
+        return
+    Tombstone.objects.create(project_id=instance.project_id, kind=Tombstone.KIND_TASK, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=TaskComment)
+def record_task_comment_tombstone(sender, instance, origin=None, **kwargs):
+    # Comments deleted along with their task are covered by the task's tombstone.
+    if deleted_model(origin) is not TaskComment:
+        return
+    project_id = task_project_id(instance.task_id)
+    if project_id is not None:
+        Tombstone.objects.create(project_id=project_id, kind=Tombstone.KIND_COMMENT, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def count_task_deleted(sender, instance, origin=None, **kwargs):
+    # Counters of a deleted project are deleted with it.
+    if deleted_model(origin) is not Task:
+        return
+    adjust_project_counts(count_changes(before=[instance._counted or (instance.project_id, instance.status)]))
+
+
+@receiver(post_delete, sender=TaskComment)
+def count_task_comment_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_model(origin) is not TaskComment:
+        return
+    adjust_comment_count(instance.task_id, -1)
@@ -1,10 +1,41 @@
 """
 Tests for tasks app.
 """
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from config.encoding import dumps
+from config.response_cache import get_cache, get_versions
+from config.routing import websocket_urlpatterns
+from config.schema import schema
+from config.subscriptions import execute_subscription, payload_cache
 from organizations.models import Organization
 from projects.models import Project
-from .models import Task, TaskComment
+from .admin import TaskAdmin, TaskCommentAdmin
+from .events import broadcaster, merge_task_updates, project_group
+from .models import Task, TaskComment, Tombstone
+from .ranking import RANK_MAX_LENGTH, rank_between, ranks_after, rebalance_ranks
+from .sync import encode_sync_cursor, prune_tombstones
+
+
+# For tests whose writes run their on_commit callbacks: an in-process channel
+# layer, and broadcasts flushed synchronously instead of by a timer thread.
+BROADCAST_SETTINGS = {
+    'CHANNEL_LAYERS': {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    'BROADCAST_COALESCE_WINDOW': 0,
+}
 
 
 class TaskModelTest(TestCase):
@@ -34,7 +65,7 @@ class TaskModelTest(TestCase):
         self.assertEqual(self.task.status, "TODO")
     
     def test_comment_count(self):
-        """Test comment count property."""
+        """Test the stored comment counter."""
         self.assertEqual(self.task.comment_count, 0)
         
         TaskComment.objects.create(
@@ -43,5 +74,1321 @@ class TaskModelTest(TestCase):
             author_email="test@example.com"
         )
         
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.comment_count, 1)
+
+
+
+class TaskListQueryTest(TestCase):
+    """Test stored comment counts and overdue annotations on the tasks query."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        now = timezone.now()
+        self.overdue = Task.objects.create(
+            project=self.project, title="Overdue task", status="TODO",
+            due_date=now - timedelta(days=1), rank="3"
+        )
+        self.done = Task.objects.create(
+            project=self.project, title="Done task", status="DONE",
+            due_date=now - timedelta(days=1), rank="2"
+        )
+        self.upcoming = Task.objects.create(
+            project=self.project, title="Upcoming task", status="TODO",
+            due_date=now + timedelta(days=1), rank="1"
+        )
+        for task in (self.overdue, self.done):
+            TaskComment.objects.create(task=task, content="Comment", author_email="test@example.com")
+    
+    def execute(self, query):
+        result = schema.execute(query, context_value=RequestFactory().get('/'))
+        self.assertIsNone(result.errors)
+        return result.data
+    
+    def test_comment_counts_are_read_with_the_tasks(self):
+        """Test that comment counts are read from the task rows."""
+        query = f'query {{ tasks(projectId: "{self.project.pk}") {{ id commentCount isOverdue }} }}'
+        # Project lookup, annotated tasks.
+        with self.assertNumQueries(2):
+            data = self.execute(query)
+        
+        counts = {int(task['id']): task['commentCount'] for task in data['tasks']}
+        self.assertEqual(counts, {self.overdue.pk: 1, self.done.pk: 1, self.upcoming.pk: 0})
+    
+    def test_filter_by_overdue(self):
+        """Test filtering on the database-computed overdue flag."""
+        data = self.execute(
+            f'query {{ tasks(projectId: "{self.project.pk}", isOverdue: true) {{ id isOverdue }} }}'
+        )
+        self.assertEqual(data['tasks'], [{'id': str(self.overdue.pk), 'isOverdue': True}])
+    
+    def test_overdue_first_ordering(self):
+        """Test sorting overdue tasks ahead of the board order."""
+        data = self.execute(
+            f'query {{ tasks(projectId: "{self.project.pk}", overdueFirst: true) {{ id }} }}'
+        )
+        self.assertEqual(
+            [int(task['id']) for task in data['tasks']],
+            [self.overdue.pk, self.upcoming.pk, self.done.pk]
+        )
+
+
+class TaskConnectionTest(TestCase):
+    """Test keyset pagination on the tasks connection."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        # Duplicate ranks exercise the created_at/id tiebreakers.
+        for index in range(7):
+            Task.objects.create(project=self.project, title=f"Task {index}", rank=str(index % 3 + 1))
+    
+    def fetch_page(self, first, after=None):
+        after_arg = f', after: "{after}"' if after else ''
+        query = f'''
+            query {{
+                tasksConnection(projectId: "{self.project.pk}", first: {first}{after_arg}) {{
+                    edges {{ cursor node {{ id title }} }}
+                    pageInfo {{ hasNextPage endCursor }}
+                }}
+            }}
+        '''
+        result = schema.execute(query, context_value=RequestFactory().get('/'))
+        self.assertIsNone(result.errors)
+        return result.data['tasksConnection']
+    
+    def test_pages_follow_default_ordering(self):
+        """Test that walking every page yields the list ordering exactly once."""
+        expected = [str(pk) for pk in Task.objects.order_by('rank', '-created_at', '-id').values_list('pk', flat=True)]
+        seen = []
+        after = None
+        while True:
+            page = self.fetch_page(3, after)
+            seen.extend(edge['node']['id'] for edge in page['edges'])
+            if not page['pageInfo']['hasNextPage']:
+                break
+            after = page['pageInfo']['endCursor']
+        
+        self.assertEqual(seen, expected)
+    
+    def test_pages_use_keyset_not_offset(self):
+        """Test that later pages filter on the cursor instead of using OFFSET."""
+        after = self.fetch_page(3)['pageInfo']['endCursor']
+        with CaptureQueriesContext(connection) as queries:
+            self.fetch_page(3, after)
+        
+        self.assertFalse(any('OFFSET' in q['sql'] for q in queries.captured_queries))
+    
+    def test_cursor_bounds_the_leading_column(self):
+        """Test that the cursor filter bounds rank, so the ordering index can be seeked."""
+        after = self.fetch_page(3)['pageInfo']['endCursor']
+        with CaptureQueriesContext(connection) as queries:
+            self.fetch_page(3, after)
+        
+        sql = next(q['sql'] for q in queries.captured_queries if 'tasks_task"."rank" >' in q['sql'])
+        self.assertIn('"tasks_task"."rank" >= ', sql)
+    
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is reported as an error."""
+        query = f'query {{ tasksConnection(projectId: "{self.project.pk}", after: "bogus") {{ edges {{ cursor }} }} }}'
+        result = schema.execute(query, context_value=RequestFactory().get('/'))
+        self.assertIsNotNone(result.errors)
+
+
+@override_settings(**BROADCAST_SETTINGS)
+class BulkTaskMutationTest(TestCase):
+    """Test the bulk task mutations."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        self.existing = Task.objects.create(project=self.project, title="Existing task")
+    
+    def execute(self, query, variables):
+        result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/'))
+        self.assertIsNone(result.errors)
+        return result.data
+    
+    def bulk_create(self, tasks):
+        query = '''
+            mutation BulkCreate($tasks: [BulkCreateTaskInput!]!) {
+                bulkCreateTasks(tasks: $tasks) {
+                    success tasks { title rank commentCount } errors { index field message }
+                }
+            }
+        '''
+        return self.execute(query, {'tasks': tasks})['bulkCreateTasks']
+    
+    def test_bulk_create_ranks_after_last_task(self):
+        """Test that created tasks follow the project's last task in input order."""
+        tasks = [{'projectId': str(self.project.pk), 'title': f"Task {i}"} for i in range(100)]
+        with CaptureQueriesContext(connection) as queries:
+            result = self.bulk_create(tasks)
+        
+        self.assertTrue(result['success'])
+        ranks = [self.existing.rank] + [task['rank'] for task in result['tasks']]
+        self.assertEqual(ranks, sorted(set(ranks)))
+        self.assertEqual(result['tasks'][0]['commentCount'], 0)
+        self.assertEqual(self.project.tasks.count(), 101)
+        self.assertLess(len(queries.captured_queries), 10)
+    
+    def test_bulk_create_publishes_one_subscription_message(self):
+        """Test that the taskChanged events of a batch share one channel layer message."""
+        tasks = [{'projectId': str(self.project.pk), 'title': f"Task {i}"} for i in range(3)]
+        with patch('config.subscriptions.group_send') as send, self.captureOnCommitCallbacks(execute=True):
+            result = self.bulk_create(tasks)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(send.call_count, 1)
+        group, event = send.call_args.args
+        self.assertEqual(group, f'subscription_task_changed_{self.project.pk}')
+        self.assertEqual([payload['action'] for payload in event['payloads']], ['CREATED'] * 3)
+    
+    def test_bulk_create_reports_every_invalid_item(self):
+        """Test that one invalid item rejects the whole batch with per-item errors."""
+        result = self.bulk_create([
+            {'projectId': str(self.project.pk), 'title': "Valid task"},
+            {'projectId': str(self.project.pk), 'title': "No", 'status': "NOPE"},
+            {'projectId': "999", 'title': "Missing project"},
+        ])
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(
+            sorted((error['index'], error['field']) for error in result['errors']),
+            [(1, 'status'), (1, 'title'), (2, 'projectId')]
+        )
+        self.assertEqual(self.project.tasks.count(), 1)
+    
+    def test_bulk_update(self):
+        """Test that each item only changes the fields it provides."""
+        other = Task.objects.create(project=self.project, title="Other task", status="TODO")
+        query = '''
+            mutation BulkUpdate($tasks: [BulkUpdateTaskInput!]!) {
+                bulkUpdateTasks(tasks: $tasks) { success tasks { id status title } errors { index } }
+            }
+        '''
+        result = self.execute(query, {'tasks': [
+            {'id': str(self.existing.pk), 'status': "DONE"},
+            {'id': str(other.pk), 'title': "Renamed task", 'order': 0},
+        ]})['bulkUpdateTasks']
+        
+        self.assertTrue(result['success'])
+        self.existing.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.existing.status, self.existing.title), ("DONE", "Existing task"))
+        self.assertEqual((other.status, other.title, other.order), ("TODO", "Renamed task", 0))
+    
+    def test_bulk_update_rejects_repeated_ids(self):
+        """Test that an id given twice rejects the batch instead of writing the task twice."""
+        query = '''
+            mutation BulkUpdate($tasks: [BulkUpdateTaskInput!]!) {
+                bulkUpdateTasks(tasks: $tasks) { success errors { index field } }
+            }
+        '''
+        result = self.execute(query, {'tasks': [
+            {'id': str(self.existing.pk), 'title': "First"},
+            {'id': str(self.existing.pk), 'title': "Second"},
+        ]})['bulkUpdateTasks']
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], [{'index': 1, 'field': 'id'}])
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.title, self.existing.version), ("Existing task", 1))
+    
+    def test_bulk_delete_is_all_or_nothing(self):
+        """Test that an unknown id prevents the whole deletion."""
+        query = '''
+            mutation BulkDelete($ids: [ID!]!) {
+                bulkDeleteTasks(ids: $ids) { success deletedCount errors { index } }
+            }
+        '''
+        result = self.execute(query, {'ids': [str(self.existing.pk), "999"]})['bulkDeleteTasks']
+        self.assertEqual(result['errors'], [{'index': 1}])
+        self.assertTrue(Task.objects.filter(pk=self.existing.pk).exists())
+        
+        result = self.execute(query, {'ids': [str(self.existing.pk)]})['bulkDeleteTasks']
+        self.assertEqual(result['deletedCount'], 1)
+        self.assertFalse(Task.objects.filter(pk=self.existing.pk).exists())
+
+
+class TaskRankingTest(TestCase):
+    """Test lexicographic task ranks."""
+    
+    def test_rank_between(self):
+        """Test that a rank always fits strictly between its neighbours."""
+        self.assertEqual(rank_between('a', 'b'), 'ai')
+        self.assertEqual(rank_between('a', 'a1'), 'a0i')
+        low, high = '001', '002'
+        for _ in range(50):
+            high = rank_between(low, high)
+            self.assertTrue(low < high)
+            self.assertFalse(high.endswith('0'))
+        with self.assertRaises(ValueError):
+            rank_between('b', 'a')
+    
+    def test_ranks_after_are_spaced(self):
+        """Test that appended ranks are short and leave room between them."""
+        ranks = ranks_after(None, 1000)
+        self.assertEqual(ranks, sorted(set(ranks)))
+        self.assertTrue(all(len(rank) <= 6 for rank in ranks))
+        self.assertEqual(len(rank_between(ranks[0], ranks[1])), 4)
+
+
+@override_settings(**BROADCAST_SETTINGS)
+class MoveTaskTest(TestCase):
+    """Test moving tasks by rank."""
+    
+    query = '''
+        mutation Move($id: ID!, $beforeId: ID, $afterId: ID, $status: String) {
+            moveTask(id: $id, beforeId: $beforeId, afterId: $afterId, status: $status) {
+                success task { rank status }
+            }
+        }
+    '''
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        self.tasks = [Task.objects.create(project=self.project, title=f"Task {i}") for i in range(4)]
+    
+    def move(self, task, before=None, after=None, status=None):
+        variables = {
+            'id': str(task.pk),
+            'beforeId': str(before.pk) if before else None,
+            'afterId': str(after.pk) if after else None,
+            'status': status,
+        }
+        result = schema.execute(self.query, variables=variables, context_value=RequestFactory().post('/'))
+        return result
+    
+    def board(self):
+        return list(self.project.tasks.values_list('pk', flat=True))
+    
+    def test_created_tasks_are_ranked_in_order(self):
+        """Test that new tasks are appended to the project."""
+        self.assertEqual(self.board(), [task.pk for task in self.tasks])
+    
+    def test_move_between_neighbours_updates_one_row(self):
+        """Test that a move writes only the moved task."""
+        first, second, third, fourth = self.tasks
+        with CaptureQueriesContext(connection) as queries:
+            result = self.move(fourth, before=first, after=second, status="DONE")
+        
+        self.assertIsNone(result.errors)
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(self.board(), [first.pk, fourth.pk, second.pk, third.pk])
+        self.assertEqual(Task.objects.get(pk=fourth.pk).status, "DONE")
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.done_count, 1)
+    
+    def test_move_with_one_neighbour(self):
+        """Test moving to the top, after a task, and to the end."""
+        first, second, third, fourth = self.tasks
+        self.assertIsNone(self.move(third, after=first).errors)
+        self.assertEqual(self.board(), [third.pk, first.pk, second.pk, fourth.pk])
+        
+        self.assertIsNone(self.move(fourth, before=third).errors)
+        self.assertEqual(self.board(), [third.pk, fourth.pk, first.pk, second.pk])
+        
+        self.assertIsNone(self.move(third, status="BLOCKED").errors)
+        self.assertEqual(self.board(), [fourth.pk, first.pk, second.pk, third.pk])
+    
+    @override_settings(RANK_REBALANCE_DELAY=0)
+    def test_dense_ranks_are_rebalanced(self):
+        """Test that repeated inserts into one gap trigger a rebalance."""
+        first, second, third, fourth = self.tasks
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(60):
+                mover = (third, fourth)[index % 2]
+                following = Task.objects.get(pk=self.board()[1])
+                self.assertIsNone(self.move(mover, before=first, after=following).errors)
+        
+        ranks = list(self.project.tasks.values_list('rank', flat=True))
+        self.assertTrue(all(len(rank) <= RANK_MAX_LENGTH for rank in ranks))
+        self.assertEqual(self.board(), [first.pk, fourth.pk, third.pk, second.pk])
+    
+    def test_ranks_are_picked_under_the_project_lock(self):
+        """Test that appends and moves lock the project row before reading ranks."""
+        first, second, third, fourth = self.tasks
+        with patch('tasks.models.lock_projects') as lock:
+            Task.objects.create(project=self.project, title="Appended")
+        lock.assert_called_once_with([self.project.pk])
+        
+        with patch('tasks.schema.lock_projects') as lock:
+            self.assertIsNone(self.move(fourth, before=first, after=second).errors)
+        self.assertEqual(lock.call_args_list[0].args, ([self.project.pk],))
+    
+    def test_rebalance_announces_one_resync(self):
+        """Test that a rebalance bumps versions, invalidates the project and sends one event."""
+        versions = get_versions('project', [self.project.pk])
+        with patch('config.subscriptions.group_send') as send, \
+                patch('tasks.events.send_to_stream') as stream, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(rebalance_ranks(self.project.pk, batch_size=3), 4)
+        
+        self.assertEqual(list(self.project.tasks.values_list('version', flat=True)), [2] * 4)
+        self.assertEqual(self.board(), [task.pk for task in self.tasks])
+        self.assertNotEqual(get_versions('project', [self.project.pk]), versions)
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(send.call_args.args[1]['payloads'], [{'action': 'REBALANCED', 'task_id': None}])
+        stream.assert_called_once_with(self.project.pk, 'resync_required', reason='ranks_rebalanced')
+    
+    def test_tied_neighbours_are_rebalanced(self):
+        """Test that moving between tasks sharing a rank still succeeds."""
+        first, second, third, fourth = self.tasks
+        Task.objects.filter(pk__in=[second.pk, third.pk]).update(rank=second.rank)
+        tied = self.board()[1:3]
+        
+        result = self.move(fourth, before=Task.objects.get(pk=tied[0]), after=Task.objects.get(pk=tied[1]))
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(self.board(), [first.pk, tied[0], fourth.pk, tied[1]])
+
+
+class PartialUpdateTest(TestCase):
+    """Test single-statement partial updates of tasks."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        self.task = Task.objects.create(project=self.project, title="Test Task", description="x" * 1000)
+    
+    def update_status(self, status, expected_version=None):
+        query = '''
+            mutation Update($id: ID!, $status: String!, $expectedVersion: Int) {
+                updateTaskStatus(id: $id, status: $status, expectedVersion: $expectedVersion) {
+                    task { status version updatedAt }
+                }
+            }
+        '''
+        variables = {'id': str(self.task.pk), 'status': status, 'expectedVersion': expected_version}
+        return schema.execute(query, variables=variables, context_value=RequestFactory().post('/'))
+    
+    def test_status_change_is_one_statement(self):
+        """Test that only the changed columns are written, in one query."""
+        with CaptureQueriesContext(connection) as queries:
+            result = self.update_status("IN_PROGRESS")
+        
+        self.assertIsNone(result.errors)
+        # No lock or read of the previous status: the task is still not done,
+        # so the counters are untouched.
+        self.assertEqual(len(queries.captured_queries), 1)
+        sql = queries.captured_queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        self.assertIn('RETURNING', sql)
+        self.assertNotIn('"description" =', sql)
+        self.assertEqual(result.data['updateTaskStatus']['task']['status'], "IN_PROGRESS")
+        self.assertEqual(result.data['updateTaskStatus']['task']['version'], 2)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "IN_PROGRESS")
+        self.assertEqual(self.task.description, "x" * 1000)
+    
+    def test_reopening_a_done_task_updates_the_counters(self):
+        """Test that a task leaving DONE still moves the done counter."""
+        self.assertIsNone(self.update_status("DONE").errors)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.done_count, 1)
+        
+        result = self.update_status("TODO")
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['updateTaskStatus']['task']['status'], "TODO")
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.task_count, self.project.done_count), (1, 0))
+    
+    def test_expected_version(self):
+        """Test optimistic concurrency through the version column."""
+        self.assertIsNone(self.update_status("IN_PROGRESS", expected_version=1).errors)
+        
+        result = self.update_status("DONE", expected_version=1)
+        self.assertEqual(result.errors[0].extensions['code'], 'VERSION_CONFLICT')
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), ("IN_PROGRESS", 2))
+    
+    def test_missing_task(self):
+        """Test that unknown ids are still reported as not found."""
+        pk = self.task.pk
+        Task.objects.filter(pk=pk).delete()
+        result = self.update_status("DONE", expected_version=1)
+        
+        self.assertEqual(result.errors[0].message, f"Task with id '{pk}' not found")
+
+
+class BoardQueryTest(TestCase):
+    """Test the grouped board query."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        for index in range(5):
+            Task.objects.create(project=self.project, title=f"Todo {index}", status="TODO")
+        for index in range(2):
+            Task.objects.create(project=self.project, title=f"Done {index}", status="DONE")
+    
+    def execute(self, query):
+        result = schema.execute(query, context_value=RequestFactory().get('/'))
+        self.assertIsNone(result.errors)
+        return result.data['board']
+    
+    def test_columns_in_one_query(self):
+        """Test that every column's first tasks and count come from one query."""
+        query = f'''
+            query {{
+                board(projectId: "{self.project.pk}", perColumnLimit: 3) {{
+                    status label totalCount hasMore tasks {{ title }}
+                }}
+            }}
+        '''
+        with CaptureQueriesContext(connection) as queries:
+            columns = self.execute(query)
+        
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('ROW_NUMBER', queries.captured_queries[0]['sql'])
+        self.assertNotIn('"description"', queries.captured_queries[0]['sql'])
+        self.assertEqual([column['status'] for column in columns], ['TODO', 'IN_PROGRESS', 'DONE', 'BLOCKED'])
+        todo, in_progress, done, _blocked = columns
+        self.assertEqual(todo['tasks'], [{'title': f"Todo {index}"} for index in range(3)])
+        self.assertEqual((todo['totalCount'], todo['hasMore']), (5, True))
+        self.assertEqual((done['totalCount'], done['hasMore'], len(done['tasks'])), (2, False, 2))
+        self.assertEqual((in_progress['totalCount'], in_progress['tasks']), (0, []))
+    
+    def test_counts_only(self):
+        """Test that a board without task rows only counts them."""
+        columns = self.execute(f'query {{ board(projectId: "{self.project.pk}") {{ status totalCount }} }}')
+        
+        self.assertEqual({column['status']: column['totalCount'] for column in columns}, {
+            'TODO': 5, 'IN_PROGRESS': 0, 'DONE': 2, 'BLOCKED': 0,
+        })
+    
+    def test_missing_project(self):
+        """Test that an unknown project is reported."""
+        result = schema.execute('query { board(projectId: "999") { status } }', context_value=RequestFactory().get('/'))
+        
+        self.assertEqual(result.errors[0].message, "Project with id '999' not found")
+
+
+@override_settings(SYNC_CURSOR_OVERLAP=0)
+class ProjectChangesTest(TestCase):
+    """Test the projectChanges delta sync query."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        self.tasks = [Task.objects.create(project=self.project, title=f"Task {index}") for index in range(5)]
+        self.comment = TaskComment.objects.create(task=self.tasks[0], content="Hello", author_email="a@example.com")
+        # Everything above was synced a while ago.
+        past = timezone.now() - timedelta(hours=1)
+        Task.objects.update(updated_at=past)
+        TaskComment.objects.update(updated_at=past)
+        self.cursor = encode_sync_cursor(self.project.pk, past + timedelta(minutes=1))
+    
+    def execute(self, since=None, project_id=None):
+        arguments = f'projectId: "{project_id or self.project.pk}"'
+        if since is not None:
+            arguments += f', since: "{since}"'
+        return schema.execute(
+            f'''
+                query {{
+                    projectChanges({arguments}) {{
+                        tasks {{ id title }} comments {{ id content }}
+                        deletedTaskIds deletedCommentIds cursor
+                    }}
+                }}
+            ''',
+            context_value=RequestFactory().get('/'),
+        )
+    
+    def test_full_sync(self):
+        """Test that a sync without a cursor returns every row."""
+        result = self.execute()
+        
+        self.assertIsNone(result.errors)
+        changes = result.data['projectChanges']
+        self.assertEqual(len(changes['tasks']), 5)
+        self.assertEqual([comment['id'] for comment in changes['comments']], [str(self.comment.pk)])
+        self.assertEqual((changes['deletedTaskIds'], changes['deletedCommentIds']), ([], []))
+        self.assertTrue(changes['cursor'])
+    
+    def test_changes_since_cursor(self):
+        """Test that only rows changed or deleted since the cursor are read."""
+        update = f'mutation {{ updateTask(id: "{self.tasks[1].pk}", title: "Renamed") {{ success }} }}'
+        schema.execute(update, context_value=RequestFactory().post('/'))
+        comment = TaskComment.objects.create(task=self.tasks[2], content="New", author_email="a@example.com")
+        deleted_task_id, deleted_comment_id = self.tasks[3].pk, self.comment.pk
+        self.tasks[3].delete()
+        self.comment.delete()
+        
+        with CaptureQueriesContext(connection) as queries:
+            result = self.execute(self.cursor)
+        
+        self.assertIsNone(result.errors)
+        changes = result.data['projectChanges']
+        self.assertEqual(changes['tasks'], [{'id': str(self.tasks[1].pk), 'title': "Renamed"}])
+        self.assertEqual(changes['comments'], [{'id': str(comment.pk), 'content': "New"}])
+        self.assertEqual(changes['deletedTaskIds'], [str(deleted_task_id)])
+        self.assertEqual(changes['deletedCommentIds'], [str(deleted_comment_id)])
+        self.assertEqual(len(queries.captured_queries), 5)
+        
+        # Nothing changed since the returned cursor.
+        changes = self.execute(changes['cursor']).data['projectChanges']
+        self.assertEqual((changes['tasks'], changes['comments'], changes['deletedTaskIds']), ([], [], []))
+    
+    def test_cascaded_deletes_leave_no_tombstones(self):
+        """Test that comments of a deleted task and tasks of a deleted project get no tombstones."""
+        self.tasks[0].delete()
+        self.assertEqual(list(Tombstone.objects.values_list('kind', flat=True)), [Tombstone.KIND_TASK])
+        
+        self.project.delete()
+        self.assertFalse(Tombstone.objects.exists())
+    
+    def test_invalid_and_expired_cursors(self):
+        """Test that foreign, malformed and expired cursors are rejected."""
+        other = Project.objects.create(organization=self.org, name="Other", status="ACTIVE")
+        for cursor in ('garbage', encode_sync_cursor(other.pk, timezone.now())):
+            result = self.execute(cursor)
+            self.assertEqual(result.errors[0].message, f"Invalid cursor '{cursor}'")
+        
+        result = self.execute(encode_sync_cursor(self.project.pk, timezone.now() - timedelta(days=31)))
+        self.assertEqual(result.errors[0].extensions['code'], 'SYNC_CURSOR_EXPIRED')
+        
+        result = self.execute(project_id='999')
+        self.assertEqual(result.errors[0].message, "Project with id '999' not found")
+    
+    def test_prune_tombstones(self):
+        """Test that tombstones past the retention period are pruned."""
+        expired_id = self.tasks[0].pk
+        self.tasks[0].delete()
+        self.tasks[1].delete()
+        Tombstone.objects.filter(object_id=expired_id).update(deleted_at=timezone.now() - timedelta(days=31))
+        
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertEqual(Tombstone.objects.count(), 1)
+
+
+class SearchTasksTest(TestCase):
+    """Test the searchTasks query (substring fallback outside PostgreSQL)."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        other_org = Organization.objects.create(name="Other", contact_email="other@example.com")
+        other_project = Project.objects.create(organization=other_org, name="Other Project", status="ACTIVE")
+        Task.objects.create(project=other_project, title="Fix login page")
+        self.described = Task.objects.create(project=self.project, title="Update docs", description="Explain the login flow")
+        self.titled = Task.objects.create(project=self.project, title="Fix login redirect")
+        self.commented = Task.objects.create(project=self.project, title="Polish header")
+        TaskComment.objects.create(task=self.commented, content="Also check the LOGIN button", author_email="a@example.com")
+        Task.objects.create(project=self.project, title="Unrelated")
+    
+    def search(self, query, after=None, first=10):
+        arguments = f'organizationSlug: "{self.org.slug}", query: "{query}", first: {first}'
+        if after:
+            arguments += f', after: "{after}"'
+        return schema.execute(
+            f'query {{ searchTasks({arguments}) {{ edges {{ node {{ id title }} }} pageInfo {{ hasNextPage endCursor }} }} }}',
+            context_value=RequestFactory().get('/'),
+        )
+    
+    def test_matches_title_description_and_comments(self):
+        """Test that title matches rank first and other organizations are excluded."""
+        result = self.search("login")
+        
+        self.assertIsNone(result.errors)
+        ids = [edge['node']['id'] for edge in result.data['searchTasks']['edges']]
+        self.assertEqual(ids, [str(self.titled.pk), str(self.commented.pk), str(self.described.pk)])
+    
+    def test_keyset_pagination(self):
+        """Test that pages continue from the rank and id of the last result."""
+        first_page = self.search("login", first=2).data['searchTasks']
+        self.assertTrue(first_page['pageInfo']['hasNextPage'])
+        
+        second_page = self.search("login", after=first_page['pageInfo']['endCursor'], first=2).data['searchTasks']
+        self.assertFalse(second_page['pageInfo']['hasNextPage'])
+        self.assertEqual([edge['node']['id'] for edge in second_page['edges']], [str(self.described.pk)])
+    
+    def test_invalid_arguments(self):
+        """Test that empty queries and unknown organizations are rejected."""
+        self.assertEqual(self.search("  ").errors[0].message, "Search query must not be empty")
+        
+        result = schema.execute(
+            'query { searchTasks(organizationSlug: "missing", query: "login") { edges { node { id } } } }',
+            context_value=RequestFactory().get('/'),
+        )
+        self.assertEqual(result.errors[0].message, "Organization with slug 'missing' not found")
+    
+    def test_admin_search_keeps_other_search_fields(self):
+        """Test that full-text admin search still matches emails, project names and task titles."""
+        request = RequestFactory().get('/admin/')
+        task_admin = TaskAdmin(Task, admin.site)
+        comment_admin = TaskCommentAdmin(TaskComment, admin.site)
+        # Stand in for the PostgreSQL index with substring matches.
+        with patch('tasks.admin.has_full_text', return_value=True), \
+                patch.object(TaskAdmin, 'full_text_search', lambda self, queryset, term: queryset.filter(title__icontains=term)), \
+                patch.object(TaskCommentAdmin, 'full_text_search', lambda self, queryset, term: queryset.filter(content__icontains=term)):
+            tasks, _ = task_admin.get_search_results(request, Task.objects.all(), "redirect")
+            self.assertEqual(list(tasks), [self.titled])
+            tasks, _ = task_admin.get_search_results(request, Task.objects.all(), "Other Project")
+            self.assertEqual([task.title for task in tasks], ["Fix login page"])
+            
+            comments, _ = comment_admin.get_search_results(request, TaskComment.objects.all(), "a@example.com")
+            self.assertEqual(comments.count(), 1)
+            comments, _ = comment_admin.get_search_results(request, TaskComment.objects.all(), "Polish")
+            self.assertEqual(comments.count(), 1)
+            comments, _ = comment_admin.get_search_results(request, TaskComment.objects.all(), "button")
+            self.assertEqual(comments.count(), 1)
+
+
+class SuggestAssigneesTest(TestCase):
+    """Test assignee suggestions (substring fallback outside PostgreSQL)."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=self.org, name="Test Project", status="ACTIVE")
+        for email in ["anna@example.com", "joanna@example.com", "ann@example.com", "anna@example.com", "bob@example.com", ""]:
+            Task.objects.create(project=project, title="Some task", assignee_email=email)
+        other_org = Organization.objects.create(name="Other", contact_email="other@example.com")
+        other_project = Project.objects.create(organization=other_org, name="Other Project", status="ACTIVE")
+        Task.objects.create(project=other_project, title="Other task", assignee_email="annika@example.com")
+    
+    def test_distinct_emails_prefix_first(self):
+        """Test that each matching email is suggested once, prefix matches first."""
+        result = schema.execute(
+            f'query {{ suggestAssignees(organizationSlug: "{self.org.slug}", query: "ann") }}',
+            context_value=RequestFactory().get('/'),
+        )
+        
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data['suggestAssignees'],
+            ["ann@example.com", "anna@example.com", "joanna@example.com"],
+        )
+    
+    def test_missing_organization(self):
+        """Test that an unknown organization is reported."""
+        result = schema.execute(
+            'query { suggestAssignees(organizationSlug: "missing", query: "ann") }',
+            context_value=RequestFactory().get('/'),
+        )
+        
+        self.assertEqual(result.errors[0].message, "Organization with slug 'missing' not found")
+
+
+class TaskCounterTest(TestCase):
+    """Test the stored project task counts and task comment counts."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.org,
+            name="Test Project",
+            status="ACTIVE"
+        )
+        self.other = Project.objects.create(
+            organization=self.org,
+            name="Other Project",
+            status="ACTIVE"
+        )
+        self.task = Task.objects.create(project=self.project, title="Test Task")
+    
+    def execute(self, query):
+        result = schema.execute(query, context_value=RequestFactory().post('/'))
+        self.assertIsNone(result.errors)
+        return result.data
+    
+    def counts(self, project=None):
+        project = Project.objects.get(pk=(project or self.project).pk)
+        return project.task_count, project.done_count
+    
+    def test_model_writes(self):
+        """Test creating, completing, moving and deleting tasks through the model."""
+        done = Task.objects.create(project=self.project, title="Done task", status="DONE")
+        self.assertEqual(self.counts(), (2, 1))
+        
+        self.task.status = "DONE"
+        self.task.save()
+        self.task.save()
+        self.assertEqual(self.counts(), (2, 2))
+        
+        done.project = self.other
+        done.save()
+        self.assertEqual((self.counts(), self.counts(self.other)), ((1, 1), (1, 1)))
+        
+        done.delete()
+        self.assertEqual(self.counts(self.other), (0, 0))
+    
+    def test_mutations(self):
+        """Test the status, bulk and delete mutations."""
+        self.execute(f'mutation {{ updateTaskStatus(id: "{self.task.pk}", status: "DONE") {{ task {{ id }} }} }}')
+        self.assertEqual(self.counts(), (1, 1))
+        
+        data = self.execute(f'''
+            mutation {{
+                bulkCreateTasks(tasks: [
+                    {{projectId: "{self.project.pk}", title: "One", status: "DONE"}},
+                    {{projectId: "{self.other.pk}", title: "Two"}}
+                ]) {{ tasks {{ id }} }}
+            }}
+        ''')
+        created = [task['id'] for task in data['bulkCreateTasks']['tasks']]
+        self.assertEqual((self.counts(), self.counts(self.other)), ((2, 2), (1, 0)))
+        
+        self.execute(f'''
+            mutation {{
+                bulkUpdateTasks(tasks: [{{id: "{created[0]}", status: "TODO"}}, {{id: "{created[1]}", status: "DONE"}}]) {{ success }}
+            }}
+        ''')
+        self.assertEqual((self.counts(), self.counts(self.other)), ((2, 1), (1, 1)))
+        
+        self.execute(f'mutation {{ bulkDeleteTasks(ids: ["{created[0]}", "{created[1]}"]) {{ deletedCount }} }}')
+        self.execute(f'mutation {{ deleteTask(id: "{self.task.pk}") {{ success }} }}')
+        self.assertEqual((self.counts(), self.counts(self.other)), ((0, 0), (0, 0)))
+    
+    def test_comment_counts(self):
+        """Test adding, moving and deleting comments."""
+        other_task = Task.objects.create(project=self.project, title="Other task")
+        comment = TaskComment.objects.create(task=self.task, content="First", author_email="test@example.com")
+        TaskComment.objects.create(task=self.task, content="Second", author_email="test@example.com")
+        
+        comment.task = other_task
+        comment.save()
+        self.task.refresh_from_db()
+        other_task.refresh_from_db()
+        self.assertEqual((self.task.comment_count, other_task.comment_count), (1, 1))
+        
+        comment.delete()
+        other_task.refresh_from_db()
+        self.assertEqual(other_task.comment_count, 0)
+        
+        # Comments deleted with their task leave the other counters alone.
+        self.task.delete()
+        self.assertEqual(self.counts(), (1, 0))
+    
+    def test_reconcile_repairs_drift(self):
+        """Test that reconcile_counters rewrites only the drifted rows."""
+        TaskComment.objects.create(task=self.task, content="Comment", author_email="test@example.com")
+        Project.objects.filter(pk=self.project.pk).update(task_count=99, done_count=7)
+        Task.objects.filter(pk=self.task.pk).update(comment_count=0)
+        
+        output = StringIO()
+        call_command('reconcile_counters', batch_size=1, stdout=output)
+        
+        self.assertIn("Repaired 1 projects and 1 tasks", output.getvalue())
+        self.assertEqual(self.counts(), (1, 0))
+        self.task.refresh_from_db()
         self.assertEqual(self.task.comment_count, 1)
+        
+        output = StringIO()
+        call_command('reconcile_counters', stdout=output)
+        self.assertIn("Repaired 0 projects and 0 tasks", output.getvalue())
+
+
+@override_settings(**BROADCAST_SETTINGS)
+class TaskSubscriptionTest(TransactionTestCase):
+    """Test GraphQL subscriptions over WebSockets."""
+    
+    TASK_CHANGED = '''
+        subscription Changed($projectId: ID!) {
+            taskChanged(projectId: $projectId) { action taskId task { title status commentCount } }
+        }
+    '''
+    
+    def setUp(self):
+        payload_cache.clear()
+        self.org = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.org, name="Test Project")
+        self.task = Task.objects.create(project=self.project, title="Task")
+    
+    async def connect(self):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), '/ws/graphql/', subprotocols=['graphql-transport-ws']
+        )
+        connected, subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, 'graphql-transport-ws')
+        await communicator.send_json_to({'type': 'connection_init'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'connection_ack'})
+        return communicator
+    
+    async def subscribe(self, communicator, subscription_id, query, variables):
+        await communicator.send_json_to({
+            'id': subscription_id, 'type': 'subscribe', 'payload': {'query': query, 'variables': variables},
+        })
+        # Wait for the subscription to be registered before writing.
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+    
+    def test_task_changed_is_shaped_by_selection_and_executed_once(self):
+        """Test that subscribers with the same document share one execution per event."""
+        variables = {'projectId': str(self.project.pk)}
+        
+        async def run():
+            first = await self.connect()
+            second = await self.connect()
+            await self.subscribe(first, '1', self.TASK_CHANGED, variables)
+            await self.subscribe(second, 'a', self.TASK_CHANGED, variables)
+            
+            with patch('config.consumers.execute_subscription', wraps=execute_subscription) as execute:
+                await database_sync_to_async(self.update_task)()
+                messages = [await first.receive_json_from(), await second.receive_json_from()]
+            
+            await first.disconnect()
+            await second.disconnect()
+            return messages, execute.call_count
+        
+        messages, executions = async_to_sync(run)()
+        payload = {'data': {'taskChanged': {
+            'action': 'UPDATED',
+            'taskId': str(self.task.pk),
+            'task': {'title': "Renamed", 'status': 'DONE', 'commentCount': 0},
+        }}}
+        self.assertEqual(messages, [
+            {'id': '1', 'type': 'next', 'payload': payload},
+            {'id': 'a', 'type': 'next', 'payload': payload},
+        ])
+        self.assertEqual(executions, 1)
+    
+    def update_task(self):
+        result = schema.execute(
+            'mutation Update($id: ID!) { updateTask(id: $id, title: "Renamed", status: "DONE") { success } }',
+            variable_values={'id': str(self.task.pk)},
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        self.assertIsNone(result.errors)
+    
+    def test_deleted_task_and_comment_added(self):
+        """Test delete events and comment subscriptions."""
+        async def run():
+            communicator = await self.connect()
+            await self.subscribe(communicator, 'changed', '''
+                subscription { taskChanged(projectId: "%s") { action taskId task { title } } }
+            ''' % self.project.pk, None)
+            await self.subscribe(communicator, 'comments', '''
+                subscription Comments($taskId: ID!) { commentAdded(taskId: $taskId) { content authorEmail } }
+            ''', {'taskId': str(self.task.pk)})
+            
+            await database_sync_to_async(TaskComment.objects.create)(
+                task=self.task, content="Hello", author_email="test@example.com"
+            )
+            comment = await communicator.receive_json_from()
+            
+            task_id = self.task.pk
+            await database_sync_to_async(self.task.delete)()
+            deleted = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return comment, deleted, task_id
+        
+        comment, deleted, task_id = async_to_sync(run)()
+        self.assertEqual(comment, {'id': 'comments', 'type': 'next', 'payload': {
+            'data': {'commentAdded': {'content': "Hello", 'authorEmail': "test@example.com"}}
+        }})
+        self.assertEqual(deleted, {'id': 'changed', 'type': 'next', 'payload': {
+            'data': {'taskChanged': {'action': 'DELETED', 'taskId': str(task_id), 'task': None}}
+        }})
+    
+    def test_batched_events_are_sent_in_order(self):
+        """Test that every event of a batched message gets its own frame."""
+        async def run():
+            communicator = await self.connect()
+            await self.subscribe(communicator, 'changed', self.TASK_CHANGED, {'projectId': str(self.project.pk)})
+            await database_sync_to_async(schema.execute)(
+                'mutation { bulkCreateTasks(tasks: [{projectId: "%s", title: "One"}, {projectId: "%s", title: "Two"}]) { success } }'
+                % (self.project.pk, self.project.pk),
+                context_value=RequestFactory().post('/graphql/'),
+            )
+            messages = [await communicator.receive_json_from() for _ in range(2)]
+            await communicator.disconnect()
+            return messages
+        
+        messages = async_to_sync(run)()
+        self.assertEqual(
+            [message['payload']['data']['taskChanged']['task']['title'] for message in messages],
+            ["One", "Two"],
+        )
+    
+    def test_invalid_subscriptions_are_rejected(self):
+        """Test that unknown targets and non-subscription operations return errors."""
+        async def run():
+            communicator = await self.connect()
+            messages = []
+            for query in [self.TASK_CHANGED, '{ tasks(projectId: "1") { id } }']:
+                await communicator.send_json_to({
+                    'id': str(len(messages)), 'type': 'subscribe',
+                    'payload': {'query': query, 'variables': {'projectId': '999'}},
+                })
+                messages.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return messages
+        
+        missing, query = async_to_sync(run)()
+        self.assertEqual(missing['type'], 'error')
+        self.assertEqual(missing['payload'][0]['message'], "Project with id '999' not found")
+        self.assertEqual(query['payload'][0]['message'], "Expected a subscription operation, got query.")
+
+
+@override_settings(**{**BROADCAST_SETTINGS, 'BROADCAST_COALESCE_WINDOW': 60})
+class TaskBroadcastTest(TransactionTestCase):
+    """Test coalesced task_update broadcasts to TaskConsumer groups."""
+    
+    def setUp(self):
+        self.org = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.org, name="Test Project")
+        self.tasks = [Task.objects.create(project=self.project, title=f"Task {index}") for index in range(3)]
+        broadcaster.flush_all()
+    
+    def receive_broadcasts(self, write):
+        """Run ``write`` while a TaskConsumer is connected and flush the window."""
+        async def run():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f'/ws/tasks/{self.project.pk}/'
+            )
+            connected, _subprotocol = await communicator.connect()
+            self.assertTrue(connected)
+            await database_sync_to_async(write)()
+            await database_sync_to_async(broadcaster.flush_all)()
+            messages = []
+            while not await communicator.receive_nothing(timeout=0.05):
+                messages.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return messages
+        
+        return async_to_sync(run)()
+    
+    def execute(self, query, variables=None):
+        result = schema.execute(query, variable_values=variables, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        return result.data
+    
+    def test_burst_is_coalesced_into_one_message(self):
+        """Test that moves, updates and creates within a window become one message."""
+        first, second, third = self.tasks
+        
+        def write():
+            self.execute('mutation($id: ID!) { moveTask(id: $id) { success } }', {'id': str(first.pk)})
+            self.execute('mutation($id: ID!) { moveTask(id: $id) { success } }', {'id': str(second.pk)})
+            self.execute(
+                'mutation($id: ID!) { updateTaskStatus(id: $id, status: "DONE") { success } }', {'id': str(first.pk)}
+            )
+            self.execute('''
+                mutation($projectId: ID!) { bulkCreateTasks(tasks: [{projectId: $projectId, title: "New"}]) { success } }
+            ''', {'projectId': str(self.project.pk)})
+            Task.objects.filter(title="New").get().delete()
+        
+        messages = self.receive_broadcasts(write)
+        
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]['type'], 'task_update')
+        data = messages[0]['data']
+        self.assertEqual(data['projectId'], str(self.project.pk))
+        changes = {change['task']['id']: change for change in data['changes']}
+        self.assertEqual(len(data['changes']), 3)
+        self.assertEqual(changes[str(first.pk)]['action'], 'UPDATED')
+        self.assertEqual(changes[str(first.pk)]['task']['status'], 'DONE')
+        self.assertEqual(changes[str(first.pk)]['task']['version'], 3)
+        self.assertEqual(changes[str(second.pk)]['task']['rank'], Task.objects.get(pk=second.pk).rank)
+        created = [change for pk, change in changes.items() if pk not in (str(first.pk), str(second.pk))]
+        self.assertEqual([change['action'] for change in created], ['DELETED'])
+        self.assertNotIn(str(third.pk), changes)
+    
+    def test_admin_edits_are_broadcast(self):
+        """Test that saves outside mutations are broadcast through model signals."""
+        task = self.tasks[0]
+        
+        def write():
+            task.title = "Edited in admin"
+            task.save()
+        
+        messages = self.receive_broadcasts(write)
+        
+        self.assertEqual([change['task']['title'] for change in messages[0]['data']['changes']], ["Edited in admin"])
+    
+    def test_rolled_back_writes_are_not_broadcast(self):
+        """Test that only committed changes are broadcast."""
+        def write():
+            with transaction.atomic():
+                Task.objects.create(project=self.project, title="Rolled back")
+                transaction.set_rollback(True)
+        
+        self.assertEqual(self.receive_broadcasts(write), [])
+    
+    def test_frames_are_encoded_once_per_broadcast(self):
+        """Test that group members send the frame encoded at publish time."""
+        async def run():
+            communicators = [
+                WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/tasks/{self.project.pk}/')
+                for _ in range(3)
+            ]
+            for communicator in communicators:
+                await communicator.connect()
+            with patch('tasks.events.dumps', wraps=dumps) as encode:
+                await communicators[0].send_json_to({'type': 'task_update', 'taskId': '1'})
+                frames = [await communicator.receive_from() for communicator in communicators]
+                encodes = encode.call_count
+                # Events published by workers without preserialized frames still work.
+                await get_channel_layer().group_send(
+                    f'tasks_{self.project.pk}', {'type': 'task_update', 'message': {'taskId': '2'}}
+                )
+                legacy = await communicators[1].receive_json_from()
+            for communicator in communicators:
+                await communicator.disconnect()
+            return frames, legacy, encodes
+        
+        frames, legacy, encodes = async_to_sync(run)()
+        self.assertEqual(len(set(frames)), 1)
+        self.assertEqual(json.loads(frames[0]), {'type': 'task_update', 'data': {'type': 'task_update', 'taskId': '1'}})
+        self.assertEqual(legacy, {'type': 'task_update', 'data': {'taskId': '2'}})
+        self.assertEqual(encodes, 1)
+
+
+@override_settings(**BROADCAST_SETTINGS)
+class OrganizationTaskConsumerTest(TransactionTestCase):
+    """Test the multiplexed per-organization task update socket."""
+    
+    def setUp(self):
+        get_cache().clear()
+        self.org = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.other_org = Organization.objects.create(name="Other Organization", contact_email="other@example.com")
+        self.projects = [Project.objects.create(organization=self.org, name=f"Project {index}") for index in range(3)]
+        self.other_project = Project.objects.create(organization=self.other_org, name="Other")
+    
+    async def connect(self, slug='test-organization'):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f'/ws/organizations/{slug}/tasks/'
+        )
+        connected, _subprotocol = await communicator.connect()
+        return communicator, connected
+    
+    def create_task(self, project):
+        return Task.objects.create(project=project, title=f"Task in {project.name}")
+    
+    def test_watched_projects_share_one_connection(self):
+        """Test subscribing, receiving and unsubscribing over one socket."""
+        first, second, unwatched = self.projects
+        
+        async def run():
+            communicator, connected = await self.connect()
+            self.assertTrue(connected)
+            await communicator.send_json_to({
+                'type': 'subscribe',
+                'projectIds': [str(first.pk), str(second.pk), str(self.other_project.pk)],
+            })
+            replies = [await communicator.receive_json_from(), await communicator.receive_json_from()]
+            
+            received = []
+            for project in (first, unwatched, second):
+                await database_sync_to_async(self.create_task)(project)
+            while not await communicator.receive_nothing(timeout=0.05):
+                received.append((await communicator.receive_json_from())['data']['projectId'])
+            
+            await communicator.send_json_to({'type': 'unsubscribe', 'projectIds': [str(first.pk)]})
+            replies.append(await communicator.receive_json_from())
+            await database_sync_to_async(self.create_task)(first)
+            silent = await communicator.receive_nothing(timeout=0.05)
+            await communicator.disconnect()
+            return replies, received, silent
+        
+        replies, received, silent = async_to_sync(run)()
+        self.assertEqual(replies, [
+            {'type': 'error', 'message': f"Project with id '{self.other_project.pk}' not found",
+             'projectId': str(self.other_project.pk)},
+            {'type': 'subscribed', 'projectIds': [str(first.pk), str(second.pk)]},
+            {'type': 'unsubscribed', 'projectIds': [str(first.pk)]},
+        ])
+        self.assertEqual(received, [str(first.pk), str(second.pk)])
+        self.assertTrue(silent)
+    
+    def test_watching_joins_project_groups(self):
+        """Test that sockets join the groups of watched projects and broadcasts are sent once."""
+        first, second, _unwatched = self.projects
+        
+        async def run():
+            communicator, _connected = await self.connect()
+            await communicator.send_json_to({'type': 'subscribe', 'projectIds': [str(first.pk), str(second.pk)]})
+            await communicator.receive_json_from()
+            await communicator.send_json_to({'type': 'unsubscribe', 'projectIds': [str(second.pk)]})
+            await communicator.receive_json_from()
+            groups = {
+                name for name, members in get_channel_layer().groups.items() if members
+            }
+            await communicator.disconnect()
+            return groups
+        
+        groups = async_to_sync(run)()
+        self.assertEqual(groups, {project_group(first.pk)})
+        self.assertFalse(any(get_channel_layer().groups.values()))
+        
+        with patch('tasks.events.group_send') as send:
+            self.create_task(first)
+        self.assertEqual([call.args[0] for call in send.call_args_list], [project_group(first.pk)])
+    
+    def test_unknown_organization_is_rejected(self):
+        """Test that connecting to an unknown organization is refused."""
+        async def run():
+            communicator, connected = await self.connect('missing')
+            return connected
+        
+        self.assertFalse(async_to_sync(run)())
 
+
+@override_settings(**BROADCAST_SETTINGS, STREAM_REPLAY_SIZE=3)
+class TaskStreamResumeTest(TransactionTestCase):
+    """Test sequence numbers and resuming TaskConsumer streams."""
+    
+    def setUp(self):
+        get_cache().clear()
+        self.org = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.org, name="Test Project")
+    
+    def create_tasks(self, count):
+        for index in range(count):
+            Task.objects.create(project=self.project, title=f"Task {index}")
+    
+    async def connect(self, query=''):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f'/ws/tasks/{self.project.pk}/{query}'
+        )
+        connected, _subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+    
+    async def receive_all(self, communicator):
+        messages = []
+        while not await communicator.receive_nothing(timeout=0.05):
+            messages.append(await communicator.receive_json_from())
+        return messages
+    
+    def test_resume_replays_only_missed_updates(self):
+        """Test that a reconnecting client gets the updates it missed, then live ones."""
+        async def run():
+            communicator = await self.connect()
+            await database_sync_to_async(self.create_tasks)(2)
+            seen = [message['data']['seq'] for message in await self.receive_all(communicator)]
+            await communicator.disconnect()
+            
+            await database_sync_to_async(self.create_tasks)(2)
+            communicator = await self.connect(f'?resume_from={seen[-1]}')
+            replayed = await self.receive_all(communicator)
+            await database_sync_to_async(self.create_tasks)(1)
+            live = await self.receive_all(communicator)
+            await communicator.disconnect()
+            return seen, replayed, live
+        
+        seen, replayed, live = async_to_sync(run)()
+        self.assertEqual(seen[1], seen[0] + 1)
+        # Replayed frames queued together are merged into the latest one.
+        self.assertEqual([message['data']['seq'] for message in replayed], [seen[1] + 2])
+        self.assertEqual(
+            [change['task']['title'] for change in replayed[0]['data']['changes']], ["Task 0", "Task 1"]
+        )
+        self.assertEqual([message['data']['seq'] for message in live], [seen[1] + 3])
+    
+    def test_large_gaps_require_resync(self):
+        """Test the resync signal for gaps beyond the replay buffer and invalid positions."""
+        async def run():
+            communicator = await self.connect()
+            await database_sync_to_async(self.create_tasks)(1)
+            first = (await communicator.receive_json_from())['data']['seq']
+            await communicator.disconnect()
+            
+            await database_sync_to_async(self.create_tasks)(4)
+            messages = []
+            for query in (f'?resume_from={first}', '?resume_from=latest'):
+                communicator = await self.connect(query)
+                messages.extend(await self.receive_all(communicator))
+                await communicator.disconnect()
+            return first, messages
+        
+        first, messages = async_to_sync(run)()
+        self.assertEqual(messages, [{'type': 'resync_required', 'seq': first + 4}] * 2)
+
+
+class TaskUpdateMergeTest(TestCase):
+    """Test merging queued task_update frames."""
+    
+    def frame(self, project_id, *changes):
+        return {'type': 'task_update', 'data': {
+            'type': 'task_update', 'projectId': project_id, 'seq': len(changes),
+            'changes': [{'action': action, 'task': {'id': task_id, 'title': title}} for task_id, action, title in changes],
+        }}
+    
+    def test_merge_keeps_latest_state_per_task(self):
+        """Test that later changes replace earlier ones for the same task."""
+        merged, size = merge_task_updates(
+            self.frame('1', ('1', 'CREATED', "New"), ('2', 'UPDATED', "Old")),
+            self.frame('1', ('1', 'UPDATED', "Renamed"), ('2', 'DELETED', None), ('3', 'UPDATED', "Other")),
+        )
+        
+        self.assertEqual(size, 3)
+        self.assertEqual(merged['data']['seq'], 3)
+        self.assertEqual(
+            [(change['task']['id'], change['action'], change['task']['title']) for change in merged['data']['changes']],
+            [('1', 'CREATED', "Renamed"), ('2', 'DELETED', None), ('3', 'UPDATED', "Other")],
+        )
+    
+    def test_frames_of_other_projects_or_relayed_messages_are_not_merged(self):
+        """Test that only server frames of the same project are merged."""
+        self.assertIsNone(merge_task_updates(self.frame('1', ('1', 'UPDATED', "A")), self.frame('2', ('2', 'UPDATED', "B"))))
+        self.assertIsNone(merge_task_updates({'type': 'task_update', 'data': {'taskId': '1'}}, self.frame('1')))